@@ -0,0 +1,320 @@
+"""
+In-memory growth analytics: every standard window at once, vectorized.
+
+The SQL growth path (queries.GROWTH / TOP_GROWTH / TOP_POPULARITY_GROWTH)
+costs one baseline index probe per artist, per window, per request.
+GrowthEngine instead loads each source's series once — the metrics_latest
+row for every (metric, artist) plus the snapshots inside the longest window —
+into columnar NumPy arrays indexed by series, and computes latest / baseline /
+absolute / percent deltas for all ANALYTICS_WINDOWS in one vectorized pass.
+
+api.py serves leaderboards and growth KPIs from the snapshot while it was
+built at the current metrics generation, and falls back to SQL otherwise
+(mid-ETL, or a window/source that isn't precomputed). The snapshot is rebuilt
+once the generation has settled for ANALYTICS_SETTLE_SECONDS (i.e. after an
+ETL run, not after every batch), and at least every ANALYTICS_MAX_AGE_SECONDS
+so window cutoffs keep moving with the clock.
+
+Results match the SQL path: latest is metrics_latest.latest_val; the baseline
+is the last snapshot at/before now() - window, else first_val; "now" is the
+time of the refresh.
+"""
+import os
+import time
+import struct
+import asyncio
+import numpy as np
+import queries
+
+ANALYTICS_WINDOWS = [
+    w.strip() for w in os.getenv("ANALYTICS_WINDOWS", "24 hours,3 days,7 days,30 days,all").split(",")
+]
+ANALYTICS_SOURCES = [s.strip() for s in os.getenv("ANALYTICS_SOURCES", "spotify").split(",")]
+ANALYTICS_SETTLE_SECONDS = float(os.getenv("ANALYTICS_SETTLE_SECONDS", "20"))
+ANALYTICS_MAX_AGE_SECONDS = float(os.getenv("ANALYTICS_MAX_AGE_SECONDS", "3600"))
+
+DISCOVERY_BAND = (5_000, 250_000)  # as in queries.TOP_GROWTH
+
+
+def normalize_period(period: str) -> str:
+    return " ".join(period.lower().split())
+
+
+# ── Binary COPY decoding ────────────────────────────────────────────────────────
+# queries.ANALYTICS_POINTS rows are (int4 seg, int8 ts_us, float8 val), none
+# NULL, so every tuple has the same 34-byte layout.
+# https://www.postgresql.org/docs/current/sql-copy.html#id-1.9.3.55.9.4
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+_POINT = np.dtype([
+    ("fields", ">i2"),
+    ("seg_len", ">i4"), ("seg", ">i4"),
+    ("ts_len", ">i4"),  ("ts", ">i8"),
+    ("val_len", ">i4"), ("val", ">f8"),
+])
+
+
+def decode_points(data: bytes) -> np.ndarray:
+    """
+    A COPY ... TO STDOUT (FORMAT binary) stream of queries.ANALYTICS_POINTS
+    → structured array with fields seg, ts, val.
+    """
+    if not data.startswith(_COPY_SIGNATURE):
+        raise ValueError("not a binary COPY stream")
+    (ext_len,) = struct.unpack_from(">i", data, len(_COPY_SIGNATURE) + 4)
+    body = data[len(_COPY_SIGNATURE) + 8 + ext_len:-2]  # minus the -1 trailer
+    return np.frombuffer(body, dtype=_POINT)
+
+
+# ── Vectorized growth ───────────────────────────────────────────────────────────
+def compute_growth(first, latest, seg, ts, val, cutoffs: dict[str, int | None]) -> dict[str, dict]:
+    """
+    Baselines and deltas for n series at once. `first`/`latest` are per
+    series; (seg, ts, val) are snapshots sorted by (seg, ts). A cutoff of None
+    (period=all) takes `first` as the baseline.
+
+    Returns {window: {"baseline", "absolute", "percent"}} of float arrays,
+    NaN where SQL would return NULL.
+    """
+    n      = len(latest)
+    starts = np.searchsorted(seg, np.arange(n))
+    result = {}
+    for window, cutoff in cutoffs.items():
+        baseline = first.copy()
+        if cutoff is not None:
+            # ts is sorted within each series, so the last snapshot at/before
+            # the cutoff sits at start + (how many are at/before it) - 1
+            before = np.bincount(seg, weights=ts <= cutoff, minlength=n).astype(np.int64)
+            found  = before > 0
+            baseline[found] = val[(starts + before - 1)[found]]
+        absolute = latest - baseline
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percent = np.where(baseline != 0, np.round(absolute / baseline * 100, 4), np.nan)
+        result[window] = {"baseline": baseline, "absolute": absolute, "percent": percent}
+    return result
+
+
+def top_indices(values: np.ndarray, limit: int, nulls_last: bool = True) -> np.ndarray:
+    """
+    Indices of the `limit` largest values, descending; NaN (NULL) sorts as
+    Postgres does for DESC NULLS LAST / DESC (nulls first).
+    """
+    key = np.where(np.isnan(values), -np.inf if nulls_last else np.inf, values)
+    if len(key) > limit:
+        candidates = np.argpartition(-key, limit - 1)[:limit]
+    else:
+        candidates = np.arange(len(key))
+    return candidates[np.argsort(-key[candidates], kind="stable")]
+
+
+def _num(x):
+    """numpy float → JSON-friendly value matching the SQL path (NULL → None, whole → int)."""
+    x = float(x)
+    if x != x:
+        return None
+    return int(x) if x.is_integer() else x
+
+
+# ── Snapshot ────────────────────────────────────────────────────────────────────
+class SourceGrowth:
+    """
+    One source's series (one per metric & artist, numbered by `seg`) and
+    their precomputed deltas for every window.
+    """
+
+    def __init__(self, latest_rows, points: np.ndarray, cutoffs: dict[str, int | None]):
+        self.ids     = np.array([r["artist_id"] for r in latest_rows], dtype=object)
+        self.names   = np.array([r["name"] for r in latest_rows], dtype=object)
+        self.metrics = np.array([r["metric"] for r in latest_rows], dtype=object)
+        self.first   = np.array([r["first_val"] for r in latest_rows], dtype=np.float64)
+        self.latest  = np.array([r["latest_val"] for r in latest_rows], dtype=np.float64)
+        self.by_artist: dict[str, list[int]] = {}
+        for i, aid in enumerate(self.ids):
+            self.by_artist.setdefault(aid, []).append(i)
+        self.points  = len(points)
+        # Series for artists missing from `artists` aren't ranked, as in the SQL
+        # join; an artist that is listed but has no name still is
+        listed = np.array([r["listed"] for r in latest_rows], dtype=bool)
+        self.ranked = {
+            metric: np.flatnonzero((self.metrics == metric) & listed)
+            for metric in set(self.metrics.tolist())
+        }
+        self.growth = compute_growth(
+            self.first,
+            self.latest,
+            points["seg"].astype(np.int64),
+            points["ts"].astype(np.int64),
+            points["val"].astype(np.float64),
+            cutoffs,
+        )
+
+    def top_growth(self, window: str, limit: int, sort_by: str, discovery: bool) -> list[dict]:
+        segs = self.ranked.get("followers", np.array([], dtype=np.int64))
+        if discovery:
+            lo, hi = DISCOVERY_BAND
+            latest = self.latest[segs]
+            segs   = segs[(latest >= lo) & (latest <= hi)]
+        g     = self.growth[window]
+        order = segs[top_indices(g[sort_by][segs], limit)]
+        return [
+            {
+                "id":             self.ids[i],
+                "name":           self.names[i],
+                "latest_value":   _num(self.latest[i]),
+                "baseline_value": _num(g["baseline"][i]),
+                "absolute_delta": _num(g["absolute"][i]),
+                "percent_delta":  _num(g["percent"][i]),
+            }
+            for i in order
+        ]
+
+    def top_popularity_growth(self, window: str, limit: int) -> list[dict]:
+        segs  = self.ranked.get("popularity", np.array([], dtype=np.int64))
+        g     = self.growth[window]
+        order = segs[top_indices(g["absolute"][segs], limit, nulls_last=False)]
+        return [
+            {
+                "id":                  self.ids[i],
+                "name":                self.names[i],
+                "earliest_popularity": _num(g["baseline"][i]),
+                "latest_popularity":   _num(self.latest[i]),
+                "delta":               _num(g["absolute"][i]),
+            }
+            for i in order
+        ]
+
+    def growth_for(self, window: str, ids: list[str]) -> dict[str, dict]:
+        g = self.growth[window]
+        return {
+            aid: {
+                self.metrics[i]: {
+                    "latest_value":   _num(self.latest[i]),
+                    "baseline_value": _num(g["baseline"][i]),
+                    "absolute_delta": _num(g["absolute"][i]),
+                    "percent_delta":  _num(g["percent"][i]),
+                }
+                for i in self.by_artist.get(aid, ())
+            }
+            for aid in ids
+        }
+
+
+async def load_source(conn, source: str, windows: list[str]) -> SourceGrowth:
+    """
+    Read one source's snapshot on `conn` (inside the caller's transaction).
+    """
+    finite  = [w for w in windows if w != "all"]
+    cutoffs = {w: None for w in windows}
+    rows    = await conn.fetch(queries.ANALYTICS_CUTOFFS, finite) if finite else []
+    cutoffs.update({r["period"]: r["cutoff_us"] for r in rows})
+
+    latest_rows = await conn.fetch(queries.ANALYTICS_LATEST, source)
+    chunks = []
+    if finite:
+        longest = min(rows, key=lambda r: r["cutoff_us"])["period"]
+
+        async def sink(data):
+            chunks.append(data)
+
+        await conn.copy_from_query(queries.ANALYTICS_POINTS, source, longest, output=sink, format="binary")
+    points = decode_points(b"".join(chunks)) if chunks else np.empty(0, dtype=_POINT)
+    return SourceGrowth(latest_rows, points, cutoffs)
+
+
+class GrowthEngine:
+    """
+    The current analytics snapshot for ANALYTICS_SOURCES, plus the refresh
+    policy. Lookups return None when the snapshot can't answer exactly (stale
+    generation, unknown window or source) so the caller falls back to SQL.
+    """
+
+    def __init__(self, windows=ANALYTICS_WINDOWS, sources=ANALYTICS_SOURCES):
+        self.windows    = [normalize_period(w) for w in windows]
+        self.sources    = list(sources)
+        self.generation = None
+        self.built_at   = 0.0
+        self.build_seconds = None
+        self.refreshes  = 0
+        self.hits       = 0
+        self.misses     = 0
+        self._sources: dict[str, SourceGrowth] = {}
+        self._observed    = None
+        self._observed_at = 0.0
+        self._task: asyncio.Task | None = None
+
+    # ── Refresh ──
+    async def refresh(self, pool):
+        """
+        Rebuild every source's snapshot from one consistent read and swap it in.
+        """
+        start = time.perf_counter()
+        async with pool.acquire() as conn:
+            async with conn.transaction(isolation="repeatable_read", readonly=True):
+                generation = await conn.fetchval(queries.CURRENT_GENERATION)
+                built = {s: await load_source(conn, s, self.windows) for s in self.sources}
+        self._sources   = built
+        self.generation = generation
+        self.built_at   = time.monotonic()
+        self.build_seconds = time.perf_counter() - start
+        self.refreshes += 1
+        series = sum(len(s.latest) for s in built.values())
+        points = sum(s.points for s in built.values())
+        print(f"[ANALYTICS] generation {generation}: {series} series, {points} snapshots, "
+              f"{len(self.windows)} windows in {self.build_seconds:.2f}s")
+
+    def maybe_refresh(self, pool, generation):
+        """
+        Called on every generation poll/notify: start a background refresh once
+        `generation` has been stable for ANALYTICS_SETTLE_SECONDS (or right
+        away for the first build), or when the snapshot is older than
+        ANALYTICS_MAX_AGE_SECONDS.
+        """
+        now = time.monotonic()
+        if generation != self._observed:
+            self._observed, self._observed_at = generation, now
+        if self._task is not None and not self._task.done():
+            return
+        behind = generation != self.generation and (
+            self.generation is None or now - self._observed_at >= ANALYTICS_SETTLE_SECONDS
+        )
+        if behind or now - self.built_at >= ANALYTICS_MAX_AGE_SECONDS:
+            self._task = asyncio.get_running_loop().create_task(self._refresh_logged(pool))
+
+    async def _refresh_logged(self, pool):
+        try:
+            await self.refresh(pool)
+        except Exception as e:
+            print(f"[ANALYTICS] refresh failed: {e}")
+
+    # ── Lookups ──
+    def _snapshot(self, source: str, period: str, generation) -> tuple[SourceGrowth, str] | None:
+        window = normalize_period(period)
+        snap   = self._sources.get(source)
+        if generation is None or generation != self.generation or snap is None or window not in snap.growth:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return snap, window
+
+    def top_growth(self, source, period, limit, sort_by, discovery, generation) -> list[dict] | None:
+        found = self._snapshot(source, period, generation)
+        return found and found[0].top_growth(found[1], limit, sort_by, discovery)
+
+    def top_popularity_growth(self, source, period, limit, generation) -> list[dict] | None:
+        found = self._snapshot(source, period, generation)
+        return found and found[0].top_popularity_growth(found[1], limit)
+
+    def growth(self, source, period, ids, generation) -> dict[str, dict] | None:
+        found = self._snapshot(source, period, generation)
+        return found and found[0].growth_for(found[1], ids)
+
+    def stats(self) -> dict:
+        return {
+            "generation":    self.generation,
+            "sources":       {s: len(g.latest) for s, g in self._sources.items()},
+            "windows":       self.windows,
+            "refreshes":     self.refreshes,
+            "build_seconds": self.build_seconds,
+            "age_seconds":   time.monotonic() - self.built_at if self.refreshes else None,
+            "hits":          self.hits,
+            "misses":        self.misses,
+        }
@@ -1,13 +1,245 @@
 import os
 import re
+import time
 import asyncio
+import json
+import hashlib
+from collections import OrderedDict
+from urllib.parse import quote
+from datetime import date, datetime, timedelta, timezone
+from typing import Annotated
 import asyncpg
-from fastapi import FastAPI, WebSocket, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+import queries
+import analytics
 
 app = FastAPI()
 
+# ─── Database URL ───────────────────────────────────────────────────────────────
+DATABASE_URL = os.getenv("DATABASE_URL")
+if not DATABASE_URL:
+    raise RuntimeError("Set the DATABASE_URL env var before running")
+
+# ─── Shared connection pool ──────────────────────────────────────────────────
+# Neon's default pooler endpoint runs pgbouncer in transaction-pooling mode,
+# which doesn't support asyncpg's per-connection prepared statement cache.
+# Set DATABASE_DIRECT=1 when DATABASE_URL points at a direct (non-pooled)
+# endpoint to keep that cache on: every statement in queries.py has a fixed
+# text, so each connection prepares each shape once and reuses its plan.
+DATABASE_DIRECT      = os.getenv("DATABASE_DIRECT", "0") == "1"
+STATEMENT_CACHE_SIZE = 256 if DATABASE_DIRECT else 0
+
+pool: asyncpg.Pool | None = None
+
+# ─── Leaderboard result cache ───────────────────────────────────────────────────
+# The leaderboards only change when etl.py lands a new batch, yet the UI polls
+# them on a timer from every open tab. Results (rows, leaderboard version) are
+# memoized per (endpoint, period, limit, sort_by, mode, source) with LRU
+# eviction and a TTL, and the whole cache is dropped as soon as the metrics
+# generation moves.
+LEADERBOARD_CACHE_SIZE  = int(os.getenv("LEADERBOARD_CACHE_SIZE", "256"))
+LEADERBOARD_CACHE_TTL   = float(os.getenv("LEADERBOARD_CACHE_TTL", "300"))
+GENERATION_POLL_SECONDS = float(os.getenv("GENERATION_POLL_SECONDS", "30"))
+
+class TTLCache:
+    """
+    Bounded LRU mapping whose entries also expire `ttl` seconds after insert.
+    Tracks hit/miss counters for /cache/stats.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl     = ttl
+        self.hits    = 0
+        self.misses  = 0
+        self._data: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._data.pop(key, None)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits":    self.hits,
+            "misses":  self.misses,
+            "size":    len(self._data),
+            "maxsize": self.maxsize,
+            "ttl":     self.ttl,
+        }
+
+leaderboard_cache = TTLCache(LEADERBOARD_CACHE_SIZE, LEADERBOARD_CACHE_TTL)
+
+# ─── In-memory growth analytics ─────────────────────────────────────────────────
+# Leaderboards and growth KPIs for the standard windows are answered from
+# analytics.GrowthEngine's NumPy snapshot while it matches the current
+# generation; anything else (mid-ETL, other windows/sources) uses SQL.
+growth_engine = analytics.GrowthEngine()
+
+# ─── Precomputed leaderboards ───────────────────────────────────────────────────
+# leaderboards.py stores the top 100 (the largest `limit`) of every standard
+# leaderboard right after each ETL run. While a snapshot matches the current
+# generation and is at most SNAPSHOT_MAX_AGE_SECONDS old (rolling windows are
+# relative to now(), so an old one would freeze them at ETL time), the
+# endpoint is one primary-key read sliced to `limit`, and the response carries
+# X-Leaderboard-Version: the generation at which that ranking last changed.
+# Only snapshot hits carry it, since the engine/SQL paths below (mid-ETL,
+# stale snapshots, non-standard parameters) don't track ranking history; a
+# response without the header has an unknown version.
+LEADERBOARD_VERSION_HEADER = "X-Leaderboard-Version"
+SNAPSHOT_MAX_AGE_SECONDS   = float(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", str(analytics.ANALYTICS_MAX_AGE_SECONDS)))
+
+snapshot_stats = {"hits": 0, "misses": 0}
+
+async def _leaderboard_snapshot(
+    endpoint: str, period: str, limit: int, sort_by: str, mode: str, source: str
+) -> tuple[list[dict], int] | None:
+    if generation is None:
+        return None
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(
+            queries.LEADERBOARD_SNAPSHOT, endpoint, analytics.normalize_period(period), sort_by, mode, source
+        )
+    if (
+        row is None
+        or row["generation"] != generation
+        or datetime.now(timezone.utc) - row["computed_at"] > timedelta(seconds=SNAPSHOT_MAX_AGE_SECONDS)
+    ):
+        snapshot_stats["misses"] += 1
+        return None
+    snapshot_stats["hits"] += 1
+    return json.loads(row["rows"])[:limit], row["version"]
+
+def _with_version(response: Response | None, rows: list[dict], version: int | None) -> list[dict]:
+    if response is not None and version is not None:
+        response.headers[LEADERBOARD_VERSION_HEADER] = str(version)
+    return rows
+
+# ─── Metrics generation watcher ─────────────────────────────────────────────────
+# etl.py bumps metrics_generation.generation in the same transaction as every
+# batch it inserts (see rollups.py). Polling that single row is far cheaper
+# than re-running the leaderboard queries, and tells us when to invalidate.
+#
+# The ETL also issues NOTIFY metrics_updated on commit. LISTEN needs a session
+# connection, which Neon's transaction pooler can't provide, so it is only used
+# when DATABASE_LISTEN_URL points at a direct (non-pooled) endpoint; the poll
+# stays on as a fallback.
+DATABASE_LISTEN_URL = os.getenv("DATABASE_LISTEN_URL")
+NOTIFY_CHANNEL      = "metrics_updated"
+
+generation: int | None = None
+_generation_task: asyncio.Task | None = None
+_listen_conn: asyncpg.Connection | None = None
+
+async def refresh_generation():
+    global generation
+    async with pool.acquire() as conn:
+        current = await conn.fetchval(queries.CURRENT_GENERATION)
+    if current != generation:
+        if generation is not None:
+            print(f"[CACHE] metrics generation {generation} → {current}; invalidating")
+        generation = current
+        leaderboard_cache.clear()
+        await artist_hub.refresh()
+        await leaderboard_hub.refresh()
+    growth_engine.maybe_refresh(pool, current)
+
+def _on_metrics_notify(conn, pid, channel, payload):
+    asyncio.get_running_loop().create_task(refresh_generation())
+
+async def _watch_generation():
+    while True:
+        try:
+            await refresh_generation()
+        except Exception as e:
+            print(f"[CACHE] generation poll failed: {e}")
+        await asyncio.sleep(GENERATION_POLL_SECONDS)
+
+# ─── Conditional GET (ETag / Cache-Control) ─────────────────────────────────────
+# Every metrics read endpoint is a function of (metrics generation, path, query
+# string) and, for rolling windows (`period` other than all, /latest) or date
+# ranges without `to`, of the clock too: those ETags also carry the current
+# ETAG_CLOCK_SECONDS bucket (default: the leaderboard cache TTL, which bounds
+# how fresh those answers are anyway). So a strong ETag can be computed before
+# touching Postgres, and a matching If-None-Match short-circuits to 304.
+# max-age stays short: the ETL cron often starts late, and a body cached until
+# the *scheduled* run would outlive the data it describes; once it expires,
+# revalidation is a cheap 304. The roster routes (/artists, /artist/{aid}) are
+# left out, since roster_refresh.py / seed.py write artists without bumping
+# the generation.
+CACHE_MAX_AGE_SECONDS = int(os.getenv("CACHE_MAX_AGE_SECONDS", str(int(GENERATION_POLL_SECONDS))))
+ETAG_CLOCK_SECONDS    = float(os.getenv("ETAG_CLOCK_SECONDS", str(LEADERBOARD_CACHE_TTL)))
+
+_CONDITIONAL_PATHS = re.compile(
+    r"^/(?:artists/batch|artists/top-growth|artists/top-popularity-growth"
+    r"|artist/[^/]+/(?:latest|metrics|growth))$"
+)
+
+def _follows_clock(request: Request) -> bool:
+    """Whether the response depends on now() as well as the generation."""
+    params = request.query_params
+    if request.url.path.endswith("/latest"):
+        return True
+    if "from" in params:
+        return "to" not in params
+    if params.get("mode") == "breakout":
+        return False  # ranked from metrics_stats; period is ignored
+    # every route's default period is a rolling window
+    return analytics.normalize_period(params.get("period", "")) != "all"
+
+def _etag_for(request: Request) -> str:
+    query  = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    clock  = int(time.time() // ETAG_CLOCK_SECONDS) if _follows_clock(request) else ""
+    digest = hashlib.sha1(f"{generation}|{clock}|{request.url.path}|{query}".encode()).hexdigest()
+    return f'"{digest}"'
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    if (
+        request.method != "GET"
+        or generation is None
+        or not _CONDITIONAL_PATHS.match(request.url.path)
+    ):
+        return await call_next(request)
+
+    etag    = _etag_for(request)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CACHE_MAX_AGE_SECONDS}",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
+
 # ─── CORS setup ────────────────────────────────────────────────────────────────
+# Registered after the middleware above so it stays outermost and 304s carry
+# CORS headers too.
 origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
 
 app.add_middleware(
@@ -16,53 +248,178 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-After", LEADERBOARD_VERSION_HEADER],
 )
 
-# ─── Database URL ───────────────────────────────────────────────────────────────
-DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    raise RuntimeError("Set the DATABASE_URL env var before running")
-
-# ─── Shared connection pool ──────────────────────────────────────────────────
-pool: asyncpg.Pool | None = None
-
 @app.on_event("startup")
 async def startup():
-    global pool
-    # statement_cache_size=0: required for Neon's pgbouncer pooler endpoint,
-    # which runs in transaction-pooling mode and doesn't support asyncpg's
-    # per-connection prepared statement cache.
+    global pool, _generation_task, _listen_conn
     pool = await asyncpg.create_pool(
-        DATABASE_URL, statement_cache_size=0, min_size=1, max_size=10
+        DATABASE_URL, statement_cache_size=STATEMENT_CACHE_SIZE, min_size=1, max_size=10
     )
-    print(f"[STARTUP] Using DATABASE_URL = {DATABASE_URL}")
+    print(f"[STARTUP] Using DATABASE_URL = {DATABASE_URL} (statement cache: {STATEMENT_CACHE_SIZE})")
+    _generation_task = asyncio.create_task(_watch_generation())
+    if DATABASE_LISTEN_URL:
+        _listen_conn = await asyncpg.connect(DATABASE_LISTEN_URL)
+        await _listen_conn.add_listener(NOTIFY_CHANNEL, _on_metrics_notify)
+        print(f"[STARTUP] Listening for NOTIFY {NOTIFY_CHANNEL}")
 
 @app.on_event("shutdown")
 async def shutdown():
+    if _generation_task:
+        _generation_task.cancel()
+    if _listen_conn:
+        await _listen_conn.close()
     await pool.close()
 
 # ─── Helper: fetch last 24h of metrics for an artist ────────────────────────────
 async def fetch_latest(aid: str):
     async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            SELECT metric, val, ts
-              FROM metrics
-             WHERE artist_id = $1
-               AND ts > now() - INTERVAL '24 hours'
-             ORDER BY ts
-            """,
-            aid,
-        )
+        rows = await conn.fetch(queries.LATEST_24H, aid)
     return [dict(r) for r in rows]
 
+# ─── Subscription hub ───────────────────────────────────────────────────────────
+# Push channels share one load per distinct key instead of one per socket: the
+# first subscriber to a key triggers a load, later subscribers get the cached
+# payload, and refresh() — run whenever the metrics generation moves — reloads
+# each live key once and pushes to its subscribers only if the payload changed.
+class SubscriptionHub:
+    def __init__(self, name: str, loader):
+        self.name    = name
+        self.loader  = loader      # async (key) -> payload
+        self._subs: dict = {}      # key -> set[asyncio.Queue]
+        self._last: dict = {}      # key -> last payload pushed
+
+    async def subscribe(self, key) -> asyncio.Queue:
+        # maxsize=1: a slow consumer only ever sees the newest payload
+        queue = asyncio.Queue(maxsize=1)
+        self._subs.setdefault(key, set()).add(queue)
+        if key not in self._last:
+            try:
+                self._last[key] = await self.loader(key)
+            except Exception:
+                self.unsubscribe(key, queue)
+                raise
+        queue.put_nowait(self._last[key])
+        return queue
+
+    def unsubscribe(self, key, queue: asyncio.Queue):
+        subs = self._subs.get(key)
+        if subs is None:
+            return
+        subs.discard(queue)
+        if not subs:
+            del self._subs[key]
+            self._last.pop(key, None)
+
+    async def refresh(self):
+        for key in list(self._subs):
+            try:
+                payload = await self.loader(key)
+            except Exception as e:
+                print(f"[HUB:{self.name}] reload of {key!r} failed: {e}")
+                continue
+            if payload == self._last.get(key):
+                continue
+            self._last[key] = payload
+            for queue in self._subs.get(key, ()):
+                self._offer(queue, payload)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, payload):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(payload)
+
+    def stats(self) -> dict:
+        return {
+            "topics":        len(self._subs),
+            "subscriptions": sum(len(s) for s in self._subs.values()),
+        }
+
+artist_hub = SubscriptionHub("artist", fetch_latest)
+
+# ────────────────────────────────────────────────────────────────────────────────
+# Leaderboard cache counters
+@app.get("/cache/stats")
+async def cache_stats():
+    return {
+        **leaderboard_cache.stats(),
+        "generation": generation,
+        "snapshots":  snapshot_stats,
+        "analytics":  growth_engine.stats(),
+    }
+
+# ────────────────────────────────────────────────────────────────────────────────
+# Push channel counters
+_ws_connections = 0
+_sse_streams    = 0
+
+@app.get("/realtime/stats")
+async def realtime_stats():
+    return {
+        "websocket_connections": _ws_connections,
+        "sse_streams":           _sse_streams,
+        "artist":                artist_hub.stats(),
+        "leaderboard":           leaderboard_hub.stats(),
+    }
+
 # ────────────────────────────────────────────────────────────────────────────────
 # Existing endpoint: list all artists
+#    - GET /artists                          full roster, ordered by name
+#    - GET /artists?limit=100                first page; the response carries an
+#                                            X-Next-After header (percent-encoded,
+#                                            use verbatim as ?after=) when more remain
+#    - GET /artists?after=<name,id>&limit=   keyset pagination from that cursor
+#    - GET /artists?format=ndjson            one JSON object per line, streamed
+#                                            from a server-side cursor
+MAX_ARTISTS_PAGE   = 1000
+ARTIST_STREAM_ROWS = 500
+
+def _parse_after(after: str | None) -> tuple[str, str] | None:
+    if after is None:
+        return None
+    name, sep, aid = after.rpartition(",")
+    if not sep or not aid:
+        raise HTTPException(status_code=400, detail="after must be '<name>,<id>'")
+    return name, aid
+
 @app.get("/artists")
-async def list_artists():
+async def list_artists(after: str | None = None, limit: int | None = None, format: str = "json"):
+    if limit is not None and not 1 <= limit <= MAX_ARTISTS_PAGE:
+        raise HTTPException(status_code=400, detail=f"limit must be 1–{MAX_ARTISTS_PAGE}")
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+    cursor = _parse_after(after)
+
+    args = (*(cursor or (None, None)), limit)
+
+    if format == "ndjson":
+        async def stream():
+            async with pool.acquire() as conn:
+                async with conn.transaction():
+                    async for r in conn.cursor(queries.ARTISTS_PAGE, *args, prefetch=ARTIST_STREAM_ROWS):
+                        yield json.dumps(dict(r)) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
     async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT id, name FROM artists ORDER BY name")
-    return [dict(r) for r in rows]
+        rows = await conn.fetch(queries.ARTISTS_PAGE, *args)
+
+    headers = {}
+    if limit is not None and len(rows) == limit:
+        headers["X-Next-After"] = quote(f"{rows[-1]['name'] or ''},{rows[-1]['id']}", safe="")
+    return JSONResponse([dict(r) for r in rows], headers=headers)
+
+# ────────────────────────────────────────────────────────────────────────────────
+# NEW: single artist lookup, so clients don't need the whole roster for one name
+@app.get("/artist/{aid}")
+async def get_artist(aid: str):
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(queries.ARTIST_BY_ID, aid)
+    if row is None:
+        raise HTTPException(status_code=404, detail="artist not found")
+    return dict(row)
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Existing endpoint: latest 24h metrics for one artist
@@ -71,377 +428,507 @@ async def latest(aid: str):
     data = await fetch_latest(aid)
     return data or []
 
+# ────────────────────────────────────────────────────────────────────────────────
+# Follower series shared by /artist/{aid}/metrics and /artists/batch.
+#    Raw snapshots by default (one per day from metrics_daily for period=all,
+#    since older raw history is compacted — see compact.py). With
+#    `max_points`, each artist's series is split
+#    into at most that many equal-width time buckets; with `resolution`, into
+#    calendar buckets (date_trunc). A bucket reports its last value & timestamp
+#    plus the min/max seen inside it, so spikes survive the downsampling.
+_PERIOD_RE = re.compile(r"^(?:all|\d+\s+(?:second|minute|hour|day|week|month|year)s?)$", re.IGNORECASE)
+
+def _validate_period(period: str):
+    if not _PERIOD_RE.match(period):
+        raise HTTPException(status_code=400, detail="invalid period")
+
+def _interval_arg(period: str) -> str | None:
+    """Bind value for a validated period: the interval text, or None for 'all'."""
+    return None if period.lower() == "all" else period
+
+_SOURCE_RE = re.compile(r"^[a-z0-9_]{1,32}$")
+
+def _validate_source(source: str):
+    # Any collector name (see collectors/); unknown sources simply have no rows
+    if not _SOURCE_RE.match(source):
+        raise HTTPException(status_code=400, detail="source must be a collector name, e.g. 'spotify'")
+
+# Date ranges: `from`/`to` (YYYY-MM-DD, UTC, both inclusive; `to` defaults to
+# today) replace `period` with growth between two calendar days, served from
+# the metrics_daily rollup (see queries.GROWTH_RANGE). `compare_to` adds a
+# second range of the same length to set it against: `previous` for the one
+# right before it ("this week vs last week"), or the day it starts on.
+FromParam = Annotated[str | None, Query(alias="from")]
+
+def _parse_day(value: str, name: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be a date (YYYY-MM-DD)")
+
+def _range_args(
+    from_: str | None, to: str | None, compare_to: str | None
+) -> tuple[date, date, date | None, date | None] | None:
+    """
+    Bind values (from, to, compare from, compare to) for a validated date
+    range, or None when no `from` was given and `period` applies.
+    """
+    if from_ is None:
+        if to is not None or compare_to is not None:
+            raise HTTPException(status_code=400, detail="to and compare_to need a from date")
+        return None
+    start = _parse_day(from_, "from")
+    end   = _parse_day(to, "to") if to is not None else datetime.now(timezone.utc).date()
+    if start > end:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    if compare_to is None:
+        return start, end, None, None
+    length = end - start
+    if compare_to == "previous":
+        compare_end = start - timedelta(days=1)
+        return start, end, compare_end - length, compare_end
+    compare_start = _parse_day(compare_to, "compare_to")
+    return start, end, compare_start, compare_start + length
+
+_RESOLUTIONS = ("hour", "day", "week", "month")
+MAX_SERIES_POINTS = 5000
+
+def _validate_series_params(period: str, max_points: int | None, resolution: str | None, source: str):
+    _validate_period(period)
+    _validate_source(source)
+    if max_points is not None and resolution is not None:
+        raise HTTPException(status_code=400, detail="use either max_points or resolution, not both")
+    if max_points is not None and not 2 <= max_points <= MAX_SERIES_POINTS:
+        raise HTTPException(status_code=400, detail=f"max_points must be 2–{MAX_SERIES_POINTS}")
+    if resolution is not None and resolution not in _RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"resolution must be one of {', '.join(_RESOLUTIONS)}")
+
+async def _fetch_series(
+    conn,
+    ids: list[str],
+    period: str,
+    max_points: int | None = None,
+    resolution: str | None = None,
+    source: str = "spotify",
+) -> dict[str, list[dict]]:
+    interval = _interval_arg(period)
+    if interval is None:
+        # period=all is served from the daily rollup rather than raw history
+        raw, by_points, by_resolution = (
+            queries.SERIES_ALL_RAW, queries.SERIES_ALL_MAX_POINTS, queries.SERIES_ALL_RESOLUTION
+        )
+    else:
+        raw, by_points, by_resolution = (
+            queries.SERIES_RAW, queries.SERIES_MAX_POINTS, queries.SERIES_RESOLUTION
+        )
+
+    if max_points is not None:
+        rows = await conn.fetch(by_points, ids, interval, source, max_points)
+    elif resolution is not None:
+        rows = await conn.fetch(by_resolution, ids, interval, source, resolution)
+    else:
+        rows = await conn.fetch(raw, ids, interval, source)
+
+    result: dict[str, list[dict]] = {aid: [] for aid in ids}
+    for r in rows:
+        point = dict(r)
+        result[point.pop("artist_id")].append(point)
+    return result
+
 # ────────────────────────────────────────────────────────────────────────────────
 # NEW: “metrics over arbitrary period” endpoint
 #    - e.g. GET /artist/{aid}/metrics?period=7 days     OR
-#            GET /artist/{aid}/metrics?period=all
+#            GET /artist/{aid}/metrics?period=all&max_points=200
 #
 #    Query parameters:
 #      * period = "24 hours" (default)   OR
 #      * period = "3 days", "7 days", "30 days", ..., "all"
+#      * max_points = N           (optional) at most N buckets, each {metric, val, ts, min, max}
+#      * resolution = hour|day|week|month   (optional) calendar buckets instead
 #
 @app.get("/artist/{aid}/metrics")
-async def metrics(aid: str, period: str = "24 hours"):
+async def metrics(
+    aid: str,
+    period: str = "24 hours",
+    max_points: int | None = None,
+    resolution: str | None = None,
+    source: str = "spotify",
+):
+    _validate_series_params(period, max_points, resolution, source)
+
     async with pool.acquire() as conn:
-        # If the user wants “all time,” don’t filter by ts
-        if period.lower() == "all":
-            rows = await conn.fetch(
-                """
-                SELECT metric, val, ts
-                  FROM metrics
-                 WHERE artist_id = $1
-                   AND source = 'spotify'
-                   AND metric = 'followers'
-                 ORDER BY ts
-                """,
-                aid,
-            )
-        else:
-            # Otherwise subtract “period” from now()
-            # (e.g. INTERVAL '7 days', INTERVAL '24 hours', INTERVAL '30 days')
-            query = f"""
-            SELECT metric, val, ts
-              FROM metrics
-             WHERE artist_id = $1
-               AND source = 'spotify'
-               AND metric = 'followers'
-               AND ts >= now() - INTERVAL '{period}'
-             ORDER BY ts
-            """
-            rows = await conn.fetch(query, aid)
+        series = await _fetch_series(conn, [aid], period, max_points, resolution, source)
 
-    return [dict(r) for r in rows]
+    return series[aid]
 
 # ────────────────────────────────────────────────────────────────────────────────
 # NEW: per-artist growth summary, for KPI cards on the Artist Detail page
 #    - GET /artist/{aid}/growth?period=24 hours   (default)
-#    - returns one entry per metric present for this artist under source='spotify'
+#    - returns one entry per metric present for this artist under `source`
+#      (default 'spotify')
 #      (e.g. "followers", "popularity", ...), each shaped like:
 #        {"latest_value": ..., "baseline_value": ..., "absolute_delta": ..., "percent_delta": ...}
-_PERIOD_RE = re.compile(r"^(?:all|\d+\s+(?:second|minute|hour|day|week|month|year)s?)$", re.IGNORECASE)
+#    - ?from=2026-03-01&to=2026-03-31 measures between two days instead; with
+#      compare_to, entries also carry "compare": {same fields, for that range}
 
-@app.get("/artist/{aid}/growth")
-async def artist_growth(aid: str, period: str = "24 hours"):
-    if not _PERIOD_RE.match(period):
-        raise HTTPException(status_code=400, detail="invalid period")
+async def _fetch_growth(conn, ids: list[str], period: str, source: str = "spotify") -> dict[str, dict]:
+    """
+    Growth KPIs for every artist in `ids` with one `artist_id = ANY($1)`
+    query, shaped {artist_id: {metric: {latest_value, baseline_value, ...}}}.
+    See queries.GROWTH for how latest & baseline are resolved.
+    """
+    served = growth_engine.growth(source, period, ids, generation)
+    if served is not None:
+        return served
 
-    if period.lower() == "all":
-        query = """
-        WITH windowed AS (
-          SELECT
-            artist_id,
-            metric,
-            val,
-            ts,
-            ROW_NUMBER() OVER (
-              PARTITION BY artist_id, metric
-              ORDER BY ts ASC
-            ) AS rn_asc,
-            ROW_NUMBER() OVER (
-              PARTITION BY artist_id, metric
-              ORDER BY ts DESC
-            ) AS rn_desc
-          FROM metrics
-          WHERE artist_id = $1
-            AND source = 'spotify'
-        )
-        SELECT
-          w_max.metric,
-          w_max.val AS latest_value,
-          w_min.val AS baseline_value,
-          (w_max.val - w_min.val) AS absolute_delta,
-          CASE WHEN w_min.val = 0 THEN NULL
-               ELSE ROUND((w_max.val - w_min.val) / w_min.val::numeric * 100, 4)
-          END AS percent_delta
-        FROM windowed w_min
-        JOIN windowed w_max
-          ON w_min.artist_id = w_max.artist_id
-         AND w_min.metric = w_max.metric
-        WHERE w_min.rn_asc = 1
-          AND w_max.rn_desc = 1;
-        """
-    else:
-        query = f"""
-        WITH latest AS (
-          SELECT
-            artist_id,
-            metric,
-            val,
-            ROW_NUMBER() OVER (
-              PARTITION BY artist_id, metric
-              ORDER BY ts DESC
-            ) AS rn
-          FROM metrics
-          WHERE artist_id = $1
-            AND source = 'spotify'
-        ),
-        baseline AS (
-          SELECT
-            artist_id,
-            metric,
-            val,
-            ROW_NUMBER() OVER (
-              PARTITION BY artist_id, metric
-              ORDER BY
-                (ts <= now() - INTERVAL '{period}') DESC,
-                CASE WHEN ts <= now() - INTERVAL '{period}' THEN ts END DESC,
-                ts ASC
-            ) AS rn
-          FROM metrics
-          WHERE artist_id = $1
-            AND source = 'spotify'
-        )
-        SELECT
-          latest.metric,
-          latest.val AS latest_value,
-          baseline.val AS baseline_value,
-          (latest.val - baseline.val) AS absolute_delta,
-          CASE WHEN baseline.val = 0 THEN NULL
-               ELSE ROUND((latest.val - baseline.val) / baseline.val::numeric * 100, 4)
-          END AS percent_delta
-        FROM latest
-        JOIN baseline
-          ON latest.artist_id = baseline.artist_id
-         AND latest.metric = baseline.metric
-        WHERE latest.rn = 1
-          AND baseline.rn = 1;
-        """
+    rows = await conn.fetch(queries.GROWTH, ids, _interval_arg(period), source)
 
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(query, aid)
+    growth: dict[str, dict] = {aid: {} for aid in ids}
+    for row in rows:
+        growth[row["artist_id"]][row["metric"]] = {
+            "latest_value": row["latest_value"],
+            "baseline_value": row["baseline_value"],
+            "absolute_delta": row["absolute_delta"],
+            "percent_delta": row["percent_delta"],
+        }
+    return growth
 
-    return {
-        row["metric"]: {
+async def _fetch_growth_range(conn, ids: list[str], bounds: tuple, source: str = "spotify") -> dict[str, dict]:
+    """
+    As _fetch_growth, between the days in `bounds` (see _range_args); each
+    entry gains a "compare" dict when a comparison range was given.
+    """
+    rows = await conn.fetch(queries.GROWTH_RANGE, ids, bounds[0], bounds[1], source, bounds[2], bounds[3])
+
+    growth: dict[str, dict] = {aid: {} for aid in ids}
+    for row in rows:
+        entry = {
             "latest_value": row["latest_value"],
             "baseline_value": row["baseline_value"],
             "absolute_delta": row["absolute_delta"],
             "percent_delta": row["percent_delta"],
         }
-        for row in rows
+        if bounds[2] is not None:
+            entry["compare"] = {
+                "latest_value": row["compare_latest_value"],
+                "baseline_value": row["compare_baseline_value"],
+                "absolute_delta": row["compare_absolute_delta"],
+                "percent_delta": row["compare_percent_delta"],
+            }
+        growth[row["artist_id"]][row["metric"]] = entry
+    return growth
+
+@app.get("/artist/{aid}/growth")
+async def artist_growth(
+    aid: str,
+    period: str = "24 hours",
+    source: str = "spotify",
+    from_: FromParam = None,
+    to: str | None = None,
+    compare_to: str | None = None,
+):
+    _validate_period(period)
+    _validate_source(source)
+    bounds = _range_args(from_, to, compare_to)
+
+    async with pool.acquire() as conn:
+        if bounds is not None:
+            growth = await _fetch_growth_range(conn, [aid], bounds, source)
+        else:
+            growth = await _fetch_growth(conn, [aid], period, source)
+
+    return growth[aid]
+
+# ────────────────────────────────────────────────────────────────────────────────
+# NEW: batched artist detail, replacing the per-artist round trips from the
+# Artist Detail page (roster lookup + metrics + growth)
+#    - GET /artists/batch?ids=<id>,<id>,...&period=7 days[&max_points=200]
+#      (max_points / resolution downsample the series as for /artist/{aid}/metrics)
+#    - returns {id: {"name": ..., "metrics": [{metric, val, ts}, ...], "growth": {...}}}
+#      for every requested id that exists; unknown ids are omitted
+MAX_BATCH_IDS = 50
+
+@app.get("/artists/batch")
+async def artists_batch(
+    ids: str,
+    period: str = "24 hours",
+    max_points: int | None = None,
+    resolution: str | None = None,
+    source: str = "spotify",
+):
+    _validate_series_params(period, max_points, resolution, source)
+    id_list = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if not id_list:
+        raise HTTPException(status_code=400, detail="ids must list at least one artist id")
+    if len(id_list) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"at most {MAX_BATCH_IDS} ids per request")
+
+    async with pool.acquire() as conn:
+        names  = await conn.fetch(queries.ARTIST_NAMES, id_list)
+        series = await _fetch_series(conn, id_list, period, max_points, resolution, source)
+        growth = await _fetch_growth(conn, id_list, period, source)
+
+    return {
+        r["id"]: {
+            "name": r["name"],
+            "metrics": series[r["id"]],
+            "growth": growth[r["id"]],
+        }
+        for r in names
     }
 
 # ────────────────────────────────────────────────────────────────────────────────
-# Existing: Top‐growth endpoint (unchanged)
-@app.get("/artists/top-growth")
-async def top_growth(period: str = "7 days", limit: int = 10, sort_by: str = "absolute", mode: str = "all"):
+# Existing: Top‐growth endpoint
+#    Reads one metrics_latest row per artist plus one baseline probe, so the
+#    cost is O(artists) rather than O(artists × history).
+#    mode=breakout instead ranks by the incremental velocity / acceleration /
+#    z-score state in metrics_stats (see queries.TOP_BREAKOUT); rows then carry
+#    velocity, acceleration, zscore and observations, and period is ignored.
+#    from/to[/compare_to] rank growth between two days instead (see
+#    queries.TOP_GROWTH_RANGE); rows then also carry compare_* deltas and
+#    delta_change, and sort_by=change ranks by the gain over the comparison.
+def _validate_limit(limit: int):
     if limit < 1 or limit > 100:
         raise HTTPException(status_code=400, detail="limit must be 1–100")
-    if mode not in ("all", "discovery"):
-        raise HTTPException(status_code=400, detail="mode must be 'all' or 'discovery'")
+
+def _top_growth_params(
+    period: str, limit: int, sort_by: str, mode: str, source: str, bounds: tuple | None = None
+) -> tuple[str, str]:
+    """
+    Validate /artists/top-growth parameters (shared with its SSE stream, which
+    must reject bad input before any response starts) and return the
+    effective (period, sort_by) for `mode`.
+    """
+    _validate_period(period)
+    _validate_source(source)
+    _validate_limit(limit)
+    if mode not in ("all", "discovery", "breakout"):
+        raise HTTPException(status_code=400, detail="mode must be 'all', 'discovery' or 'breakout'")
     if mode == "discovery":
         sort_by = "percent"
-    elif sort_by not in ("absolute", "percent"):
-        raise HTTPException(status_code=400, detail="sort_by must be 'absolute' or 'percent'")
-
-    order_by = "absolute_delta DESC" if sort_by == "absolute" else "percent_delta DESC NULLS LAST"
-    # discovery mode: filter to the 5k–250k follower band (applied in the final WHERE clause)
-    discovery_clause_windowed = "AND w_max.followers BETWEEN 5000 AND 250000" if mode == "discovery" else ""
-    discovery_clause_latest = "AND latest.followers BETWEEN 5000 AND 250000" if mode == "discovery" else ""
-
-    if period.lower() == "all":
-        query = f"""
-        WITH windowed AS (
-          SELECT
-            artist_id,
-            val AS followers,
-            ts,
-            ROW_NUMBER() OVER (
-              PARTITION BY artist_id
-              ORDER BY ts ASC
-            ) AS rn_asc,
-            ROW_NUMBER() OVER (
-              PARTITION BY artist_id
-              ORDER BY ts DESC
-            ) AS rn_desc
-          FROM metrics
-          WHERE source='spotify'
-            AND metric='followers'
-        )
-        SELECT
-          a.id,
-          a.name,
-          w_max.followers AS latest_value,
-          w_min.followers AS baseline_value,
-          (w_max.followers - w_min.followers) AS absolute_delta,
-          CASE WHEN w_min.followers = 0 THEN NULL
-               ELSE ROUND((w_max.followers - w_min.followers) / w_min.followers::numeric * 100, 4)
-          END AS percent_delta
-        FROM windowed w_min
-        JOIN windowed w_max
-          ON w_min.artist_id = w_max.artist_id
-        JOIN artists a
-          ON a.id = w_min.artist_id
-        WHERE w_min.rn_asc = 1
-          AND w_max.rn_desc = 1
-          {discovery_clause_windowed}
-        ORDER BY {order_by}
-        LIMIT $1;
-        """
-    else:
-        # "latest" = most recent snapshot per artist.
-        # "baseline" = most recent snapshot at/before `period` ago, falling
-        # back to the earliest snapshot overall if none exists yet (not
-        # enough history). delta = latest - baseline.
-        query = f"""
-        WITH latest AS (
-          SELECT
-            artist_id,
-            val AS followers,
-            ROW_NUMBER() OVER (
-              PARTITION BY artist_id
-              ORDER BY ts DESC
-            ) AS rn
-          FROM metrics
-          WHERE source='spotify'
-            AND metric='followers'
-        ),
-        baseline AS (
-          SELECT
-            artist_id,
-            val AS followers,
-            ROW_NUMBER() OVER (
-              PARTITION BY artist_id
-              ORDER BY
-                (ts <= now() - INTERVAL '{period}') DESC,
-                CASE WHEN ts <= now() - INTERVAL '{period}' THEN ts END DESC,
-                ts ASC
-            ) AS rn
-          FROM metrics
-          WHERE source='spotify'
-            AND metric='followers'
-        )
-        SELECT
-          a.id,
-          a.name,
-          latest.followers AS latest_value,
-          baseline.followers AS baseline_value,
-          (latest.followers - baseline.followers) AS absolute_delta,
-          CASE WHEN baseline.followers = 0 THEN NULL
-               ELSE ROUND((latest.followers - baseline.followers) / baseline.followers::numeric * 100, 4)
-          END AS percent_delta
-        FROM latest
-        JOIN baseline
-          ON latest.artist_id = baseline.artist_id
-        JOIN artists a
-          ON a.id = latest.artist_id
-        WHERE latest.rn = 1
-          AND baseline.rn = 1
-          {discovery_clause_latest}
-        ORDER BY {order_by}
-        LIMIT $1;
-        """
+    elif mode == "breakout":
+        if bounds is not None:
+            raise HTTPException(status_code=400, detail="from/to don't apply to mode=breakout")
+        sort_by, period = "zscore", "all"  # ranked from metrics_stats, not a window
+    elif sort_by not in ("absolute", "percent", "change"):
+        raise HTTPException(status_code=400, detail="sort_by must be 'absolute', 'percent' or 'change'")
+    if sort_by == "change" and (bounds is None or bounds[2] is None):
+        raise HTTPException(status_code=400, detail="sort_by=change needs from and compare_to")
+    return period, sort_by
 
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(query, limit)
+@app.get("/artists/top-growth")
+async def top_growth(
+    period: str = "7 days",
+    limit: int = 10,
+    sort_by: str = "absolute",
+    mode: str = "all",
+    source: str = "spotify",
+    from_: FromParam = None,
+    to: str | None = None,
+    compare_to: str | None = None,
+    response: Response = None,
+):
+    bounds = _range_args(from_, to, compare_to)
+    period, sort_by = _top_growth_params(period, limit, sort_by, mode, source, bounds)
 
-    return [dict(r) for r in rows]
+    if bounds is not None:
+        return await _top_growth_range(bounds, limit, sort_by, mode, source)
+
+    cache_key = ("top-growth", period, limit, sort_by, mode, source)
+    cached = leaderboard_cache.get(cache_key)
+    if cached is None:
+        cached = await _leaderboard_snapshot("top-growth", period, limit, sort_by, mode, source)
+        if cached is None:
+            if mode == "breakout":
+                async with pool.acquire() as conn:
+                    rows = await conn.fetch(queries.TOP_BREAKOUT, limit, source)
+                result = [dict(r) for r in rows]
+            else:
+                # discovery mode filters to the 5k–250k follower band (see queries.TOP_GROWTH)
+                result = growth_engine.top_growth(source, period, limit, sort_by, mode == "discovery", generation)
+            if result is None:
+                async with pool.acquire() as conn:
+                    rows = await conn.fetch(
+                        queries.TOP_GROWTH, limit, _interval_arg(period), sort_by, mode == "discovery", source
+                    )
+                result = [dict(r) for r in rows]
+            cached = (result, None)
+        leaderboard_cache.set(cache_key, cached)
+    return _with_version(response, *cached)
+
+async def _top_growth_range(bounds: tuple, limit: int, sort_by: str, mode: str, source: str):
+    # Not served by snapshots or growth_engine, which only hold the rolling windows
+    cache_key = ("top-growth-range", bounds, limit, sort_by, mode, source)
+    cached = leaderboard_cache.get(cache_key)
+    if cached is not None:
+        return cached[0]
+
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            queries.TOP_GROWTH_RANGE, limit, bounds[0], bounds[1], sort_by, mode == "discovery",
+            source, bounds[2], bounds[3],
+        )
+    result = [dict(r) for r in rows]
+    leaderboard_cache.set(cache_key, (result, None))
+    return result
 
 # ────────────────────────────────────────────────────────────────────────────────
 # NEW: Top popularity-growth endpoint
 @app.get("/artists/top-popularity-growth")
-async def top_popularity_growth(period: str = "7 days", limit: int = 10):
-    if limit < 1 or limit > 100:
-        raise HTTPException(status_code=400, detail="limit must be 1–100")
+async def top_popularity_growth(
+    period: str = "7 days", limit: int = 10, source: str = "spotify", response: Response = None
+):
+    _validate_period(period)
+    _validate_source(source)
+    _validate_limit(limit)
 
-    if period.lower() == "all":
-        query = """
-        WITH windowed AS (
-          SELECT
-            artist_id,
-            val AS popularity,
-            ts,
-            ROW_NUMBER() OVER (
-              PARTITION BY artist_id
-              ORDER BY ts ASC
-            ) AS rn_asc,
-            ROW_NUMBER() OVER (
-              PARTITION BY artist_id
-              ORDER BY ts DESC
-            ) AS rn_desc
-          FROM metrics
-          WHERE source='spotify'
-            AND metric='popularity'
-        )
-        SELECT
-          a.id,
-          a.name,
-          w_min.popularity AS earliest_popularity,
-          w_max.popularity AS latest_popularity,
-          (w_max.popularity - w_min.popularity) AS delta
-        FROM windowed w_min
-        JOIN windowed w_max
-          ON w_min.artist_id = w_max.artist_id
-        JOIN artists a
-          ON a.id = w_min.artist_id
-        WHERE w_min.rn_asc = 1
-          AND w_max.rn_desc = 1
-        ORDER BY delta DESC
-        LIMIT $1;
-        """
-    else:
-        # "latest" = most recent snapshot per artist.
-        # "baseline" = most recent snapshot at/before `period` ago, falling
-        # back to the earliest snapshot overall if none exists yet (not
-        # enough history). delta = latest - baseline.
-        query = f"""
-        WITH latest AS (
-          SELECT
-            artist_id,
-            val AS popularity,
-            ROW_NUMBER() OVER (
-              PARTITION BY artist_id
-              ORDER BY ts DESC
-            ) AS rn
-          FROM metrics
-          WHERE source='spotify'
-            AND metric='popularity'
-        ),
-        baseline AS (
-          SELECT
-            artist_id,
-            val AS popularity,
-            ROW_NUMBER() OVER (
-              PARTITION BY artist_id
-              ORDER BY
-                (ts <= now() - INTERVAL '{period}') DESC,
-                CASE WHEN ts <= now() - INTERVAL '{period}' THEN ts END DESC,
-                ts ASC
-            ) AS rn
-          FROM metrics
-          WHERE source='spotify'
-            AND metric='popularity'
-        )
-        SELECT
-          a.id,
-          a.name,
-          baseline.popularity AS earliest_popularity,
-          latest.popularity AS latest_popularity,
-          (latest.popularity - baseline.popularity) AS delta
-        FROM latest
-        JOIN baseline
-          ON latest.artist_id = baseline.artist_id
-        JOIN artists a
-          ON a.id = latest.artist_id
-        WHERE latest.rn = 1
-          AND baseline.rn = 1
-        ORDER BY delta DESC
-        LIMIT $1;
-        """
+    cache_key = ("top-popularity-growth", period, limit, None, None, source)
+    cached = leaderboard_cache.get(cache_key)
+    if cached is None:
+        # stored by leaderboards.py under sort_by 'delta', mode 'all'
+        cached = await _leaderboard_snapshot("top-popularity-growth", period, limit, "delta", "all", source)
+        if cached is None:
+            result = growth_engine.top_popularity_growth(source, period, limit, generation)
+            if result is None:
+                async with pool.acquire() as conn:
+                    rows = await conn.fetch(queries.TOP_POPULARITY_GROWTH, limit, _interval_arg(period), source)
+                result = [dict(r) for r in rows]
+            cached = (result, None)
+        leaderboard_cache.set(cache_key, cached)
+    return _with_version(response, *cached)
 
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(query, limit)
+# ────────────────────────────────────────────────────────────────────────────────
+# NEW: live leaderboard stream (Server-Sent Events)
+#    - GET /artists/top-growth/stream?period=7 days&limit=10&sort_by=absolute&mode=all
+#    - GET /artists/top-popularity-growth/stream?period=7 days&limit=10
+#
+#    Emits `event: snapshot` with {"rows": [...]} on connect, then `event: diff`
+#    with {"entered": [...], "exited": [ids], "moved": [{id, from, to}],
+#    "updated": [...]} whenever an ETL batch changes that leaderboard. Rows carry
+#    a 1-based "rank". The ranking is computed once per (endpoint, period, limit,
+#    sort_by, mode, source) by leaderboard_hub; only the cheap diff against what each
+#    client last saw is per-subscriber, since a slow client may skip a version.
+SSE_KEEPALIVE_SECONDS = 15
 
-    return [dict(r) for r in rows]
+async def _load_leaderboard(key):
+    endpoint, period, limit, sort_by, mode, source = key
+    if endpoint == "top-growth":
+        return await top_growth(period, limit, sort_by, mode, source)
+    return await top_popularity_growth(period, limit, source)
+
+leaderboard_hub = SubscriptionHub("leaderboard", _load_leaderboard)
+
+def _ranked(rows: list[dict]) -> dict[str, dict]:
+    return {r["id"]: {**r, "rank": i} for i, r in enumerate(rows, 1)}
+
+def _leaderboard_diff(prev: list[dict], curr: list[dict]) -> dict:
+    before, after = _ranked(prev), _ranked(curr)
+    return {
+        "entered": [row for aid, row in after.items() if aid not in before],
+        "exited":  [aid for aid in before if aid not in after],
+        "moved":   [
+            {"id": aid, "from": before[aid]["rank"], "to": row["rank"]}
+            for aid, row in after.items()
+            if aid in before and before[aid]["rank"] != row["rank"]
+        ],
+        "updated": [
+            row for aid, row in after.items()
+            if aid in before and {**before[aid], "rank": row["rank"]} != row
+        ],
+    }
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+async def _leaderboard_stream(request: Request, key) -> StreamingResponse:
+    # Callers validate `key` first: once the stream starts, the 200 headers are
+    # already out and an HTTPException can no longer become a 400.
+    # Subscribed inside the generator so the try/finally covers the stream's
+    # whole life: a client that disconnects at any point (even before the
+    # first event, or while waiting on the queue) is always unsubscribed.
+    async def events():
+        global _sse_streams
+        _sse_streams += 1
+        queue = None
+        try:
+            queue = await leaderboard_hub.subscribe(key)
+            if await request.is_disconnected():
+                return
+            prev = await queue.get()
+            yield _sse("snapshot", {"rows": list(_ranked(prev).values())})
+            while not await request.is_disconnected():
+                try:
+                    curr = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse("diff", _leaderboard_diff(prev, curr))
+                prev = curr
+        finally:
+            _sse_streams -= 1
+            if queue is not None:
+                leaderboard_hub.unsubscribe(key, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/artists/top-growth/stream")
+async def top_growth_stream(
+    request: Request,
+    period: str = "7 days",
+    limit: int = 10,
+    sort_by: str = "absolute",
+    mode: str = "all",
+    source: str = "spotify",
+):
+    period, sort_by = _top_growth_params(period, limit, sort_by, mode, source)
+    return await _leaderboard_stream(request, ("top-growth", period, limit, sort_by, mode, source))
+
+@app.get("/artists/top-popularity-growth/stream")
+async def top_popularity_growth_stream(
+    request: Request, period: str = "7 days", limit: int = 10, source: str = "spotify"
+):
+    _validate_period(period)
+    _validate_source(source)
+    _validate_limit(limit)
+    return await _leaderboard_stream(
+        request, ("top-popularity-growth", period, limit, None, None, source)
+    )
 
 # ────────────────────────────────────────────────────────────────────────────────
-# Existing: WebSocket endpoint (unchanged)
+# Existing: WebSocket endpoint
+#    Sends the latest 24h of metrics on connect, then again whenever a new ETL
+#    batch changes them. All sockets for the same artist share one query via
+#    artist_hub instead of polling the database per socket.
 @app.websocket("/ws/{aid}")
 async def ws_endpoint(websocket: WebSocket, aid: str):
+    global _ws_connections
     await websocket.accept()
-    try:
+    queue = await artist_hub.subscribe(aid)
+    _ws_connections += 1
+
+    async def push():
+        while True:
+            data = await queue.get()
+            await websocket.send_json(jsonable_encoder(data))
+
+    async def drain():
+        # Clients never send anything; receiving is how we notice a disconnect.
         while True:
-            data = await fetch_latest(aid)
-            await websocket.send_json(data)
-            await asyncio.sleep(60)
-    except Exception:
-        await websocket.close()
+            await websocket.receive_text()
+
+    tasks = [asyncio.create_task(push()), asyncio.create_task(drain())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        artist_hub.unsubscribe(aid, queue)
+        _ws_connections -= 1
+        try:
+            await websocket.close()
+        except (RuntimeError, WebSocketDisconnect):
+            pass
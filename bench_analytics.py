@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark the in-memory growth engine (analytics.py) against the SQL path
+(queries.TOP_GROWTH, one statement per window) at 1k / 10k / 100k artists.
+
+Each size gets synthetic artists with 40 days of daily followers & popularity
+snapshots under source='bench', loaded with bulk.py and deleted again
+afterwards, so point it at a Neon branch rather than production.
+
+For every window in analytics.ANALYTICS_WINDOWS it reports the SQL leaderboard
+time, then the engine's one-off build (load + vectorized pass over all
+windows) and the time to answer the same leaderboards from memory.
+
+    python bench_analytics.py                # 1k, 10k and 100k artists
+    python bench_analytics.py 5000 50000     # custom sizes
+"""
+import os
+import sys
+import time
+import asyncio
+from datetime import datetime, timedelta, timezone
+import asyncpg
+import psycopg2
+from psycopg2.extras import execute_values
+import analytics
+import queries
+from bulk import load_metrics
+from migrate import apply_migrations
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+if not DATABASE_URL:
+    raise RuntimeError("⚠️  Set the DATABASE_URL env var before running")
+
+SOURCE = "bench"
+DAYS   = 40
+LIMIT  = 10
+NOW    = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def synthetic_rows(n: int):
+    for day in range(DAYS, 0, -1):
+        ts = NOW - timedelta(days=day)
+        for k in range(n):
+            yield (f"bench-{k}", SOURCE, "followers",  ts, 1_000 + k * 7 + (DAYS - day) * (k % 97))
+            yield (f"bench-{k}", SOURCE, "popularity", ts, (k + day) % 100)
+
+
+def setup(conn, n: int):
+    with conn.cursor() as cur:
+        execute_values(
+            cur,
+            "INSERT INTO artists (id, name) VALUES %s ON CONFLICT DO NOTHING",
+            [(f"bench-{k}", f"Bench Artist {k}") for k in range(n)],
+            page_size=10_000,
+        )
+    conn.commit()
+    load_metrics(conn, synthetic_rows(n))
+    with conn.cursor() as cur:
+        cur.execute("ANALYZE metrics_latest")
+    conn.commit()
+
+
+def cleanup(conn):
+    with conn.cursor() as cur:
+        for table in ("metrics", "metrics_latest", "metrics_daily", "metrics_stats"):
+            cur.execute(f"DELETE FROM {table} WHERE source = %s", (SOURCE,))
+        cur.execute("DELETE FROM artists WHERE id LIKE 'bench-%'")
+    conn.commit()
+
+
+async def bench_sql(conn, windows) -> dict[str, float]:
+    times = {}
+    for window in windows:
+        start = time.perf_counter()
+        await conn.fetch(
+            queries.TOP_GROWTH, LIMIT, None if window == "all" else window, "absolute", False, SOURCE
+        )
+        times[window] = time.perf_counter() - start
+    return times
+
+
+async def bench_engine(conn, windows) -> tuple[float, dict[str, float], analytics.SourceGrowth]:
+    start = time.perf_counter()
+    async with conn.transaction(isolation="repeatable_read", readonly=True):
+        snap = await analytics.load_source(conn, SOURCE, windows)
+    build = time.perf_counter() - start
+
+    times = {}
+    for window in windows:
+        start = time.perf_counter()
+        snap.top_growth(window, LIMIT, "absolute", False)
+        times[window] = time.perf_counter() - start
+    return build, times, snap
+
+
+async def run(sizes):
+    windows = [analytics.normalize_period(w) for w in analytics.ANALYTICS_WINDOWS]
+    sync    = psycopg2.connect(DATABASE_URL)
+    apply_migrations(sync)
+    cleanup(sync)
+    conn = await asyncpg.connect(DATABASE_URL, statement_cache_size=0)
+
+    print("| Artists | Window | SQL | Engine lookup |")
+    print("|---:|---|---:|---:|")
+    summary = []
+    try:
+        for n in sizes:
+            setup(sync, n)
+            sql = await bench_sql(conn, windows)
+            build, mem, snap = await bench_engine(conn, windows)
+            for window in windows:
+                print(f"| {n:,} | {window} | {1000 * sql[window]:,.1f} ms | {1000 * mem[window]:,.2f} ms |")
+            summary.append((n, sum(sql.values()), build, sum(mem.values()), snap.points))
+            cleanup(sync)
+    finally:
+        cleanup(sync)
+        await conn.close()
+        sync.close()
+
+    print()
+    print(f"| Artists | SQL, all {len(windows)} windows | Engine build (snapshots) | Engine, all windows |")
+    print("|---:|---:|---:|---:|")
+    for n, sql_total, build, mem_total, points in summary:
+        print(f"| {n:,} | {1000 * sql_total:,.1f} ms | {1000 * build:,.1f} ms ({points:,}) "
+              f"| {1000 * mem_total:,.2f} ms |")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    asyncio.run(run(sizes))
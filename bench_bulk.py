@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bulk loader (bulk.py) against the ETL's execute_values path
+(etl.upsert_metrics, 100 rows per commit as in a normal run).
+
+Synthetic daily snapshots for 10,000 fake artists are written under
+source='bench' and deleted again after each run, so point it at a Neon branch
+rather than production. etl.py is imported for the baseline, so the Spotify
+env vars must be set too (they aren't used).
+
+    python bench_bulk.py                 # 10k, 100k and 1M rows
+    python bench_bulk.py 10000 50000     # custom sizes
+"""
+import sys
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+import psycopg2
+import etl
+from bulk import load_metrics
+from migrate import PARTITION_MONTHS_AHEAD
+
+logging.getLogger("etl").setLevel(logging.WARNING)
+
+ARTISTS  = 10_000
+ETL_ROWS = 100  # rows per etl.upsert_metrics call: 50 artists × 2 metrics
+# 1M rows span 100 days, ending yesterday
+BASE_TS  = (datetime.now(timezone.utc) - timedelta(days=101)).replace(
+    hour=0, minute=0, second=0, microsecond=0)
+
+
+def synthetic_rows(n: int):
+    for k in range(n):
+        yield (f"bench-{k % ARTISTS}", "bench", "followers",
+               BASE_TS + timedelta(days=k // ARTISTS), k)
+
+
+def cleanup(conn):
+    with conn.cursor() as cur:
+        for table in ("metrics", "metrics_latest", "metrics_daily", "metrics_stats"):
+            cur.execute(f"DELETE FROM {table} WHERE source = 'bench'")
+    conn.commit()
+
+
+def bench_execute_values(conn, n: int) -> float:
+    rows = list(synthetic_rows(n))
+    start = time.perf_counter()
+    for i in range(0, n, ETL_ROWS):
+        chunk = rows[i:i + ETL_ROWS]  # one snapshot ts per chunk
+        etl.upsert_metrics(conn, [(a, s, m, v) for a, s, m, _, v in chunk], chunk[0][3])
+    return time.perf_counter() - start
+
+
+def bench_copy(conn, n: int) -> float:
+    start = time.perf_counter()
+    load_metrics(conn, synthetic_rows(n))
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+
+    conn = psycopg2.connect(etl.DATABASE_URL)
+    etl.ensure_schema(conn)
+    with conn.cursor() as cur:
+        cur.execute("SELECT ensure_metrics_partitions(%s, %s)", (BASE_TS, PARTITION_MONTHS_AHEAD))
+    cleanup(conn)
+
+    print("| Rows | execute_values | COPY + merge | Speedup |")
+    print("|---:|---:|---:|---:|")
+    for n in sizes:
+        legacy = bench_execute_values(conn, n)
+        cleanup(conn)
+        copy = bench_copy(conn, n)
+        cleanup(conn)
+        print(f"| {n:,} | {legacy:.1f}s ({n / legacy:,.0f}/s) "
+              f"| {copy:.1f}s ({n / copy:,.0f}/s) | {legacy / copy:.1f}× |")
+    conn.close()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Bulk ingestion path for metrics (backfills, imports, extra sources).
+
+Rows are streamed with binary `COPY ... FROM STDIN` into an unlogged staging
+table, then merged into `metrics` with one set-based statement that also
+folds the newly inserted snapshots into the rollups (see rollups.py). Each
+merge commits after `commit_rows` staged rows, so memory and transaction
+size stay bounded however large the input is.
+
+    with BulkLoader(conn) as loader:
+        for artist_id, source, metric, ts, val in rows:
+            loader.add(artist_id, source, metric, ts, val)
+    loader.staged, loader.inserted
+"""
+import io
+import os
+import uuid
+import struct
+import logging
+from datetime import datetime, timezone
+from migrate import PARTITION_MONTHS_AHEAD
+from rollups import LATEST_UPSERT_SQL, DAILY_UPSERT_SQL, STATS_PUSH_SQL, BUMP_GENERATION_SQL
+
+logger = logging.getLogger(__name__)
+
+BULK_COMMIT_ROWS = int(os.getenv("BULK_COMMIT_ROWS", "100000"))
+
+# ── Binary COPY encoding ────────────────────────────────────────────────────────
+# https://www.postgresql.org/docs/current/sql-copy.html#id-1.9.3.55.9.4
+_COPY_HEADER  = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_COPY_TRAILER = struct.pack(">h", -1)
+_FIELD_COUNT  = struct.pack(">h", 5)
+_NULL         = struct.pack(">i", -1)
+_LEN          = struct.Struct(">i")
+_TIMESTAMP    = struct.Struct(">iq")  # length 8 + µs since 2000-01-01 UTC
+_FLOAT8       = struct.Struct(">id")  # length 8 + IEEE double
+
+_PG_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+def _text(value) -> bytes:
+    if value is None:
+        return _NULL
+    data = value.encode()
+    return _LEN.pack(len(data)) + data
+
+
+def _timestamp(ts: datetime) -> bytes:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)  # naive timestamps are taken as UTC
+    delta = ts - _PG_EPOCH
+    return _TIMESTAMP.pack(8, (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds)
+
+
+def encode_row(artist_id, source, metric, ts, val) -> bytes:
+    """
+    One COPY BINARY tuple matching the staging table's column order.
+    """
+    return b"".join((
+        _FIELD_COUNT,
+        _text(artist_id),
+        _text(source),
+        _text(metric),
+        _timestamp(ts),
+        _NULL if val is None else _FLOAT8.pack(8, float(val)),
+    ))
+
+
+# ── Merge ───────────────────────────────────────────────────────────────────────
+# Duplicates within the stage (same key twice in one file) keep the first
+# value, i.e. the lowest `seq` (staging order); rows already in metrics are
+# left alone, as in etl.upsert_metrics.
+# The rollup CTEs read only what this merge actually inserted; `stats` is a
+# plain SELECT, so the final statement reads it to make sure it runs.
+MERGE_SQL = """
+WITH inserted AS (
+  INSERT INTO metrics (artist_id, source, metric, ts, val)
+  SELECT DISTINCT ON (artist_id, source, metric, ts)
+         artist_id, source, metric, ts, val::numeric
+    FROM {stage}
+   WHERE val IS NOT NULL
+   ORDER BY artist_id, source, metric, ts, seq
+  ON CONFLICT (artist_id, source, metric, ts) DO NOTHING
+  RETURNING artist_id, source, metric, ts, val
+),
+latest AS ({latest} RETURNING 1),
+daily  AS ({daily} RETURNING 1),
+stats  AS ({stats})
+SELECT (SELECT count(*) FROM inserted) FROM stats
+"""
+
+
+class BulkLoader:
+    """
+    Buffers rows and loads them in chunks of `commit_rows`, each in its own
+    transaction. Owns a private unlogged staging table for its lifetime, so
+    concurrent loaders (and transaction poolers) don't interfere.
+    """
+
+    def __init__(self, conn, commit_rows: int = BULK_COMMIT_ROWS):
+        self.conn        = conn
+        self.commit_rows = commit_rows
+        self.stage       = f"metrics_staging_{uuid.uuid4().hex[:12]}"
+        self.staged      = 0
+        self.inserted    = 0
+        self._buf        = io.BytesIO()
+        self._pending    = 0
+        self._merge_sql  = MERGE_SQL.format(
+            stage=self.stage,
+            latest=LATEST_UPSERT_SQL.format(src="inserted"),
+            daily=DAILY_UPSERT_SQL.format(src="inserted"),
+            stats=STATS_PUSH_SQL.format(src="inserted"),
+        )
+        with conn.cursor() as cur:
+            cur.execute(f"""
+            CREATE UNLOGGED TABLE {self.stage}(
+              artist_id TEXT,
+              source    TEXT,
+              metric    TEXT,
+              ts        TIMESTAMPTZ,
+              val       DOUBLE PRECISION,
+              seq       BIGINT GENERATED ALWAYS AS IDENTITY
+            ) WITH (autovacuum_enabled = off)
+            """)
+        conn.commit()
+        self._reset()
+
+    def _reset(self):
+        self._buf = io.BytesIO()
+        self._buf.write(_COPY_HEADER)
+        self._pending = 0
+
+    def add(self, artist_id, source, metric, ts, val):
+        self._buf.write(encode_row(artist_id, source, metric, ts, val))
+        self._pending += 1
+        if self._pending >= self.commit_rows:
+            self.flush()
+
+    def extend(self, rows):
+        for row in rows:
+            self.add(*row)
+
+    def flush(self) -> int:
+        """
+        COPY the buffered rows into the stage, merge them into metrics and
+        commit. Returns how many new snapshots were inserted.
+        """
+        if not self._pending:
+            return 0
+        self._buf.write(_COPY_TRAILER)
+        self._buf.seek(0)
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(f"TRUNCATE {self.stage}")
+                cur.copy_expert(
+                    f"COPY {self.stage} (artist_id, source, metric, ts, val) FROM STDIN WITH (FORMAT binary)",
+                    self._buf,
+                )
+                # Backfills can reach months, past or future, that have no
+                # partition yet (there is no DEFAULT partition to catch them)
+                cur.execute(
+                    f"SELECT ensure_metrics_partitions((SELECT min(ts) FROM {self.stage}), %s, "
+                    f"(SELECT max(ts) FROM {self.stage}))",
+                    (PARTITION_MONTHS_AHEAD,),
+                )
+                cur.execute(self._merge_sql)
+                inserted = cur.fetchone()[0]
+                if inserted:
+                    cur.execute(BUMP_GENERATION_SQL)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.staged   += self._pending
+        self.inserted += inserted
+        self._reset()
+        return inserted
+
+    def close(self):
+        self.flush()
+        with self.conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {self.stage}")
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.conn.rollback()
+            with self.conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {self.stage}")
+            self.conn.commit()
+
+
+def load_metrics(conn, rows, commit_rows: int = BULK_COMMIT_ROWS) -> tuple[int, int]:
+    """
+    Bulk-load an iterable of (artist_id, source, metric, ts, val).
+    Returns (rows staged, snapshots inserted).
+    """
+    with BulkLoader(conn, commit_rows) as loader:
+        loader.extend(rows)
+    return loader.staged, loader.inserted
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Collect metrics from one or more sources in a single concurrent run (see
+collectors/). Each source keeps its own rate limit and batch size; all rows go
+through one bulk writer and the run is recorded in etl_runs.
+
+    python collect.py spotify                 # same data as etl.py
+    python collect.py fake fake_youtube       # local fake sources, no network
+    python collect.py --incremental spotify fake
+"""
+import os
+import logging
+import argparse
+import psycopg2
+import http_client
+from collectors import COLLECTORS, get_collector
+from collectors.scheduler import collect
+from etl import ensure_schema
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect metrics from several sources concurrently.")
+    parser.add_argument("sources", nargs="+",
+                        help=f"collectors to run: {', '.join(sorted(COLLECTORS))} or fake_<name>")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip values unchanged since each artist's latest snapshot")
+    args = parser.parse_args()
+
+    collectors = [get_collector(name) for name in dict.fromkeys(args.sources)]
+
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise RuntimeError("⚠️  Set the DATABASE_URL env var before running")
+
+    conn = psycopg2.connect(db_url)
+    ensure_schema(conn)
+    result = collect(conn, collectors, incremental=args.incremental)
+    conn.close()
+
+    for source, s in result["sources"].items():
+        qps    = s["requests"] / s["seconds"] if s["seconds"] else 0.0
+        status = f"failed: {s['error']}" if s["error"] else "ok"
+        logger.info(
+            f"📊 {source}: {s['artists']} artists, {s['written_rows']}/{s['fetched_rows']} rows written, "
+            f"{s['requests']} requests in {s['seconds']:.1f}s ({qps:.2f} req/s, "
+            f"{s['throttled']} throttled) — {status}"
+        )
+    http_client.log_stats()
+    logger.info(f"🎉 Run {result['run_id']}: {result['inserted']} new snapshots in {result['seconds']:.1f}s")
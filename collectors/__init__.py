@@ -0,0 +1,25 @@
+"""
+Metric collectors, one per source, run together by collectors.scheduler
+(see collect.py). To add a source, subclass collectors.base.Collector and
+register it in COLLECTORS.
+"""
+from collectors.base import Collector
+from collectors.fake import FakeCollector
+from collectors.spotify import SpotifyCollector
+
+COLLECTORS: dict[str, type[Collector]] = {
+    "spotify": SpotifyCollector,
+    "fake":    FakeCollector,
+}
+
+
+def get_collector(name: str) -> Collector:
+    """
+    Instantiate the collector registered as `name`; "fake_<anything>" is a
+    FakeCollector under that source name.
+    """
+    if name in COLLECTORS:
+        return COLLECTORS[name]()
+    if name.startswith("fake_"):
+        return FakeCollector(name)
+    raise ValueError(f"unknown collector {name!r} (known: {', '.join(sorted(COLLECTORS))}, fake_*)")
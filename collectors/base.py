@@ -0,0 +1,54 @@
+"""
+The collector plugin interface.
+
+A collector knows which artists it covers (`load_artists`) and how to turn one
+batch of them into normalized (artist_id, source, metric, val) rows
+(`fetch_batch`). Everything else — batching, concurrency, rate limiting,
+writing and run bookkeeping — is the scheduler's job (collectors/scheduler.py).
+
+Per-source knobs default to the class attributes and can be overridden with
+COLLECT_<SOURCE>_BATCH_SIZE, _QPS, _BURST and _CONCURRENCY env vars.
+"""
+import os
+
+
+class Collector:
+    source:         str   = ""
+    batch_size:     int   = 50
+    rate_limit_qps: float = 1.0
+    burst:          float = 1.0
+    concurrency:    int   = 1
+    http:           bool  = True  # False: fetch_batch gets client=None
+
+    def __init__(self, source: str | None = None):
+        if source:
+            self.source = source
+        if not self.source:
+            raise ValueError(f"{type(self).__name__} has no source name")
+        prefix = f"COLLECT_{self.source.upper()}_"
+        self.batch_size     = int(os.getenv(prefix + "BATCH_SIZE", self.batch_size))
+        self.rate_limit_qps = float(os.getenv(prefix + "QPS", self.rate_limit_qps))
+        self.burst          = float(os.getenv(prefix + "BURST", self.burst))
+        self.concurrency    = int(os.getenv(prefix + "CONCURRENCY", self.concurrency))
+        self.stats = {
+            "requests": 0, "throttled": 0, "batches": 0, "artists": 0,
+            "fetched_rows": 0, "written_rows": 0, "seconds": 0.0, "error": None,
+        }
+
+    def load_artists(self, conn) -> list[tuple[str, str]]:
+        """
+        [(mc_id, external_id)] for every artist this source can report on.
+        """
+        raise NotImplementedError
+
+    async def fetch_batch(self, client, bucket, batch: list[tuple[str, str]]) -> list[tuple]:
+        """
+        Fetch one batch (at most `batch_size` artists) and return
+        (artist_id, source, metric, val) rows. Every outgoing request must
+        `await bucket.acquire()` first; on a 429, `bucket.pause(retry_after)`.
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return (f"<{type(self).__name__} {self.source}: batch={self.batch_size} "
+                f"qps={self.rate_limit_qps:g} concurrency={self.concurrency}>")
@@ -0,0 +1,55 @@
+"""
+A local collector for development: deterministic synthetic followers and
+popularity for every artist, no network. Any source name starting with
+"fake" (fake, fake_youtube, ...) gets its own independent series, so several
+can run side by side to exercise the scheduler.
+
+FAKE_LATENCY_MS simulates a slow upstream (each batch sleeps ~that long).
+"""
+import os
+import time
+import random
+import asyncio
+import hashlib
+from datetime import datetime, timezone
+from collectors.base import Collector
+
+FAKE_LATENCY_MS = float(os.getenv("FAKE_LATENCY_MS", "0"))
+FAKE_EPOCH      = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+class FakeCollector(Collector):
+    source         = "fake"
+    batch_size     = 100
+    rate_limit_qps = 20.0
+    burst          = 5.0
+    concurrency    = 4
+    http           = False
+
+    def load_artists(self, conn):
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, id FROM artists ORDER BY id")
+            return cur.fetchall()
+
+    def _seed(self, artist_id: str) -> int:
+        digest = hashlib.sha256(f"{self.source}:{artist_id}".encode()).digest()
+        return int.from_bytes(digest[:8], "big")
+
+    async def fetch_batch(self, client, bucket, batch):
+        await bucket.acquire()
+        self.stats["requests"] += 1
+        if FAKE_LATENCY_MS:
+            await asyncio.sleep(FAKE_LATENCY_MS / 1000 * random.uniform(0.5, 1.5))
+
+        days = (time.time() - FAKE_EPOCH) / 86_400
+        rows = []
+        for artist_id, _ in batch:
+            seed      = self._seed(artist_id)
+            base      = 1_000 + seed % 500_000
+            per_day   = (seed >> 20) % 2_000
+            followers = base + int(per_day * days)
+            rows.extend([
+                (artist_id, self.source, "followers",  followers),
+                (artist_id, self.source, "popularity", 20 + (seed >> 40) % 60),
+            ])
+        return rows
@@ -0,0 +1,131 @@
+"""
+Run several collectors in one pass, concurrently.
+
+Each collector gets its own token bucket (rate_limit_qps / burst), its own
+batch size and `concurrency` fetchers, and its own HTTP client; every batch
+lands on one shared queue drained by a single writer, which stamps rows with
+the run's snapshot_ts and loads them through bulk.BulkLoader (COPY + merge)
+in a worker thread. A collector that fails is logged and dropped without
+stopping the others; the run is recorded in etl_runs with the sources that
+completed, and the leaderboards of those sources are precomputed
+(leaderboards.py).
+"""
+import os
+import time
+import asyncio
+import logging
+import httpx
+import http_client
+from bulk import BulkLoader
+from etl import start_run, finish_run, load_last_known, drop_unchanged, in_thread
+from leaderboards import refresh_leaderboards
+from ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+COLLECT_COMMIT_ROWS = int(os.getenv("COLLECT_COMMIT_ROWS", "5000"))
+WRITE_QUEUE_BATCHES = int(os.getenv("WRITE_QUEUE_BATCHES", "32"))
+
+
+async def _run_collector(collector, artists, written, last_known):
+    """
+    Fetch every batch of `artists` with collector.concurrency workers and put
+    the normalized rows on `written`.
+    """
+    stats   = collector.stats
+    batches = [artists[i:i + collector.batch_size] for i in range(0, len(artists), collector.batch_size)]
+    pending = asyncio.Queue()
+    for batch in batches:
+        pending.put_nowait(batch)
+    bucket = TokenBucket(collector.rate_limit_qps, collector.burst)
+
+    async def fetcher(client):
+        while True:
+            try:
+                batch = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            rows = drop_unchanged(await collector.fetch_batch(client, bucket, batch), last_known, stats)
+            await written.put(rows)
+            stats["batches"] += 1
+            stats["artists"] += len(batch)
+            logger.info(f"✔️  [{collector.source}] {len(rows)} rows (batch {stats['batches']}/{len(batches)})")
+
+    start = time.perf_counter()
+    try:
+        if collector.http:
+            limits = httpx.Limits(max_connections=collector.concurrency,
+                                  max_keepalive_connections=collector.concurrency)
+            async with http_client.async_client(limits=limits, timeout=10) as client:
+                async with asyncio.TaskGroup() as tg:
+                    for _ in range(min(collector.concurrency, len(batches))):
+                        tg.create_task(fetcher(client))
+        else:
+            async with asyncio.TaskGroup() as tg:
+                for _ in range(min(collector.concurrency, len(batches))):
+                    tg.create_task(fetcher(None))
+    except Exception as e:
+        stats["error"] = repr(e.exceptions[0] if isinstance(e, ExceptionGroup) else e)
+        logger.error(f"⚠️  [{collector.source}] failed after {stats['batches']}/{len(batches)} batches: {stats['error']}")
+    stats["seconds"] = time.perf_counter() - start
+
+
+async def _run(conn, work, snapshot_ts, commit_rows):
+    # Bounded, so fast collectors can't run arbitrarily far ahead of the database
+    written = asyncio.Queue(maxsize=WRITE_QUEUE_BATCHES)
+
+    # in_thread: a cancelled writer waits for its COPY/merge to return, so the
+    # rollback in loader.__exit__ below never races it on `conn`
+    async def writer(loader):
+        while (rows := await written.get()) is not None:
+            await in_thread(
+                loader.extend, ((a, s, m, snapshot_ts, v) for a, s, m, v in rows)
+            )
+
+    loader = await asyncio.to_thread(BulkLoader, conn, commit_rows)
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(writer(loader))
+            async with asyncio.TaskGroup() as collectors:
+                for collector, artists, last_known in work:
+                    collectors.create_task(_run_collector(collector, artists, written, last_known))
+            await written.put(None)
+    except BaseException:
+        await asyncio.to_thread(loader.__exit__, Exception, None, None)
+        raise
+    await asyncio.to_thread(loader.close)
+    return loader.inserted
+
+
+def collect(conn, collectors, incremental=False, commit_rows=COLLECT_COMMIT_ROWS) -> dict:
+    """
+    Run `collectors` as one recorded run. With `incremental`, unchanged values
+    are skipped as in `etl.py --incremental`. Returns
+    {"run_id", "inserted", "seconds", "sources": {source: collector.stats}}.
+    """
+    work = []
+    for collector in collectors:
+        artists    = collector.load_artists(conn)
+        last_known = load_last_known(conn, collector.source) if incremental else None
+        logger.info(f"{collector!r}: {len(artists)} artists")
+        work.append((collector, artists, last_known))
+
+    sources = [c.source for c in collectors]
+    run_id, snapshot_ts, _ = start_run(conn, sum(len(a) for _, a, _ in work), sources=sources)
+    start = time.perf_counter()
+    try:
+        inserted = asyncio.run(_run(conn, work, snapshot_ts, commit_rows))
+    except BaseException:
+        finish_run(conn, run_id, "failed")
+        raise
+
+    done = [c.source for c in collectors if c.stats["error"] is None]
+    finish_run(conn, run_id, "complete" if done else "failed", done)
+    if done:
+        refresh_leaderboards(conn, done)
+    return {
+        "run_id":   run_id,
+        "inserted": inserted,
+        "seconds":  time.perf_counter() - start,
+        "sources":  {c.source: c.stats for c in collectors},
+    }
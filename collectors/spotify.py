@@ -0,0 +1,26 @@
+"""
+Spotify followers & popularity via the batch-artists endpoint — the same
+requests etl.py makes, as a collector.
+"""
+import asyncio
+import etl
+from http_client import get_token
+from collectors.base import Collector
+
+
+class SpotifyCollector(Collector):
+    source         = "spotify"
+    batch_size     = etl.BATCH_SIZE
+    rate_limit_qps = etl.RATE_LIMIT_QPS
+    burst          = etl.RATE_LIMIT_BURST
+    concurrency    = etl.ETL_CONCURRENCY
+
+    def load_artists(self, conn):
+        return etl.fetch_artists(conn)
+
+    async def fetch_batch(self, client, bucket, batch):
+        token = await asyncio.to_thread(get_token)  # cached; refreshed near expiry
+        artists_data = await etl.fetch_spotify_batch_async(
+            client, bucket, token, [sp for _, sp in batch], self.stats
+        )
+        return etl.build_metric_rows(batch, artists_data)
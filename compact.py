@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Retention compaction for the raw metrics history.
+
+Snapshots older than COMPACT_DAILY_AFTER_DAYS are reduced to the last
+snapshot per (artist, source, metric, UTC day) — i.e. exactly the rows held in
+metrics_daily — and snapshots older than COMPACT_WEEKLY_AFTER_DAYS to the last
+snapshot per ISO week. metrics_latest & metrics_daily are left intact, so
+period=all charts (served from metrics_daily) and first/latest values don't
+change (rollups.rebuild_rollups upserts rather than truncates them for the same
+reason). Work is done one monthly partition at a time, each in its own
+transaction.
+
+    python compact.py
+"""
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+import psycopg2
+from migrate import apply_migrations, ensure_partitions
+from rollups import DAILY_UPSERT_SQL
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+COMPACT_DAILY_AFTER_DAYS  = int(os.getenv("COMPACT_DAILY_AFTER_DAYS", "90"))
+COMPACT_WEEKLY_AFTER_DAYS = int(os.getenv("COMPACT_WEEKLY_AFTER_DAYS", "365"))
+
+# Refresh metrics_daily for the window first, so it is guaranteed to hold the
+# rows the daily pass keeps.
+_WINDOW_SRC = """(
+  SELECT artist_id, source, metric, ts, val
+    FROM metrics
+   WHERE ts >= %(lo)s AND ts < %(hi)s
+) AS w"""
+
+DELETE_INTRADAY_SQL = """
+DELETE FROM metrics m
+ WHERE m.ts >= %(lo)s AND m.ts < %(hi)s
+   AND NOT EXISTS (
+     SELECT 1
+       FROM metrics_daily d
+      WHERE d.artist_id = m.artist_id
+        AND d.source    = m.source
+        AND d.metric    = m.metric
+        AND d.day       = (m.ts AT TIME ZONE 'UTC')::date
+        AND d.ts        = m.ts
+   )
+"""
+
+DELETE_INTRAWEEK_SQL = """
+DELETE FROM metrics m
+ WHERE m.ts >= %(lo)s AND m.ts < %(hi)s
+   AND EXISTS (
+     SELECT 1
+       FROM metrics n
+      WHERE n.artist_id = m.artist_id
+        AND n.source    = m.source
+        AND n.metric    = m.metric
+        AND n.ts        > m.ts
+        AND date_trunc('week', n.ts AT TIME ZONE 'UTC')
+          = date_trunc('week', m.ts AT TIME ZONE 'UTC')
+   )
+"""
+
+
+def _month_windows(conn, until: datetime) -> list[tuple[datetime, datetime]]:
+    """
+    [lo, hi) windows, one per calendar month, from the oldest snapshot up to `until`.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT min(ts) FROM metrics WHERE ts < %s", (until,))
+        oldest = cur.fetchone()[0]
+    if oldest is None:
+        return []
+
+    oldest  = oldest.astimezone(timezone.utc)
+    lo      = oldest.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    windows = []
+    while lo < until:
+        hi = (lo + timedelta(days=32)).replace(day=1)
+        windows.append((lo, min(hi, until)))
+        lo = hi
+    return windows
+
+
+def compact(conn, daily_after_days: int, weekly_after_days: int) -> dict[str, int]:
+    now          = datetime.now(timezone.utc)
+    daily_until  = now - timedelta(days=daily_after_days)
+    weekly_until = now - timedelta(days=weekly_after_days)
+    deleted      = {"intraday": 0, "intraweek": 0}
+
+    for lo, hi in _month_windows(conn, daily_until):
+        params = {"lo": lo, "hi": hi}
+        with conn.cursor() as cur:
+            cur.execute(DAILY_UPSERT_SQL.format(src=_WINDOW_SRC), params)
+            cur.execute(DELETE_INTRADAY_SQL, params)
+            deleted["intraday"] += cur.rowcount
+            if lo < weekly_until:
+                cur.execute(DELETE_INTRAWEEK_SQL, {"lo": lo, "hi": min(hi, weekly_until)})
+                deleted["intraweek"] += cur.rowcount
+        conn.commit()
+        logger.info(f"✔️  Compacted {lo:%Y-%m}")
+
+    return deleted
+
+
+if __name__ == "__main__":
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise RuntimeError("⚠️  Set the DATABASE_URL env var before running")
+
+    conn = psycopg2.connect(db_url)
+    apply_migrations(conn)
+    ensure_partitions(conn)
+    deleted = compact(conn, COMPACT_DAILY_AFTER_DAYS, COMPACT_WEEKLY_AFTER_DAYS)
+    conn.close()
+    logger.info(
+        f"🎉 Compaction complete: removed {deleted['intraday']} intra-day and "
+        f"{deleted['intraweek']} intra-week snapshots."
+    )
@@ -5,17 +5,25 @@ Connects to Postgres, ensures schema, and batch-fetches Spotify metrics,
 upserting into the metrics table using Monstercat artist IDs.
 """
 import os
+import sys
 import time
 import math
+import asyncio
 import logging
-import requests
+import httpx
 import psycopg2
 from psycopg2.extras import execute_values
-from spotify_helper import get_token
+import http_client
+from http_client import get_token
+from migrate import apply_migrations, ensure_partitions
+from rollups import update_rollups
+from leaderboards import refresh_leaderboards
+from ratelimit import TokenBucket
 
 # ── Logging ─────────────────────────────────────────────────────────────────────
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)  # no per-request lines
 
 # ── Configuration ────────────────────────────────────────────────────────────────
 DATABASE_URL   = os.getenv("DATABASE_URL")
@@ -25,48 +33,160 @@ if not DATABASE_URL:
 RATE_LIMIT_QPS = float(os.getenv("RATE_LIMIT_QPS", "1"))
 BATCH_SIZE     = int(os.getenv("BATCH_SIZE", "50"))
 
+# --async mode only
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "1"))
+ETL_CONCURRENCY  = int(os.getenv("ETL_CONCURRENCY", "4"))
+ETL_MAX_RETRIES  = int(os.getenv("ETL_MAX_RETRIES", "5"))
+
+# --resume picks up the latest unfinished run only if it started this recently
+ETL_RESUME_WINDOW_HOURS = float(os.getenv("ETL_RESUME_WINDOW_HOURS", "20"))
+
+ARTISTS_URL = "https://api.spotify.com/v1/artists"
+
 # ── Helpers ─────────────────────────────────────────────────────────────────────
 def ensure_schema(conn):
     """
-    Create artists & metrics tables if they don't exist.
+    Bring the schema up to date by applying any pending migrations/, and make
+    sure the metrics partitions this run (and the next few months) write to exist.
+    """
+    apply_migrations(conn)
+    ensure_partitions(conn)
+
+def upsert_metrics(conn, rows, snapshot_ts=None, checkpoint=None):
+    """
+    Bulk upsert a list of (artist_id, source, metric, val) into metrics and
+    fold the inserted snapshots into the rollup tables in the same transaction.
+
+    Rows are stamped with `snapshot_ts` (the run's timestamp) or now(). If
+    `checkpoint` is given as (run_id, artist_ids), those artists are recorded
+    as captured for the run in the same transaction.
     """
     with conn.cursor() as cur:
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS artists(
-          id           TEXT PRIMARY KEY,
-          name         TEXT,
-          uri          TEXT,
-          spotify_id   TEXT
-        );
-        CREATE TABLE IF NOT EXISTS metrics(
-          artist_id TEXT,
-          source    TEXT,
-          metric    TEXT,
-          ts        TIMESTAMPTZ DEFAULT now(),
-          val       NUMERIC,
-          PRIMARY KEY (artist_id, source, metric, ts)
-        );
-        """)
+        if rows:
+            inserted = execute_values(
+                cur,
+                """
+                INSERT INTO metrics (artist_id, source, metric, val, ts)
+                VALUES %s
+                ON CONFLICT (artist_id, source, metric, ts) DO NOTHING
+                RETURNING artist_id, source, metric, ts, val
+                """,
+                [row + (snapshot_ts,) for row in rows],
+                template="(%s, %s, %s, %s, COALESCE(%s::timestamptz, now()))",
+                fetch=True,
+            )
+            update_rollups(cur, inserted)
+        if checkpoint:
+            run_id, artist_ids = checkpoint
+            execute_values(
+                cur,
+                "INSERT INTO etl_checkpoints (run_id, artist_id) VALUES %s ON CONFLICT DO NOTHING",
+                [(run_id, aid) for aid in artist_ids],
+            )
+            cur.execute(
+                "UPDATE etl_runs SET batches_done = batches_done + 1 WHERE id = %s", (run_id,)
+            )
     conn.commit()
 
-def upsert_metrics(conn, rows):
+def start_run(conn, artists_total, resume=False, sources=("spotify",)):
     """
-    Bulk upsert a list of (artist_id, source, metric, val) into metrics.
+    Return (run_id, snapshot_ts, resumed). With `resume`, reuse the latest
+    unfinished run over the same `sources` from the last
+    ETL_RESUME_WINDOW_HOURS if there is one; otherwise open a new run stamped
+    now().
     """
-    if not rows:
-        return
+    sources = sorted(sources)
     with conn.cursor() as cur:
-        execute_values(
-            cur,
+        if resume:
+            cur.execute(
+                """
+                SELECT id, snapshot_ts
+                  FROM etl_runs
+                 WHERE status <> 'complete'
+                   AND sources = %s::text[]
+                   AND started_at > now() - %s * INTERVAL '1 hour'
+                 ORDER BY id DESC
+                 LIMIT 1
+                """,
+                (sources, ETL_RESUME_WINDOW_HOURS),
+            )
+            row = cur.fetchone()
+            if row:
+                cur.execute(
+                    "UPDATE etl_runs SET status = 'running', artists_total = %s WHERE id = %s",
+                    (artists_total, row[0]),
+                )
+                conn.commit()
+                return row[0], row[1], True
+        cur.execute(
+            "INSERT INTO etl_runs (artists_total, sources) VALUES (%s, %s) RETURNING id, snapshot_ts",
+            (artists_total, sources),
+        )
+        run_id, snapshot_ts = cur.fetchone()
+    conn.commit()
+    return run_id, snapshot_ts, False
+
+def captured_artists(conn, run_id):
+    """
+    Return the set of artist IDs already checkpointed for `run_id`.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT artist_id FROM etl_checkpoints WHERE run_id = %s", (run_id,))
+        return {row[0] for row in cur.fetchall()}
+
+def finish_run(conn, run_id, status, sources=None):
+    """
+    Close the run. `sources` narrows etl_runs.sources to what was actually
+    captured (e.g. when one collector of several failed).
+    """
+    with conn.cursor() as cur:
+        cur.execute(
             """
-            INSERT INTO metrics (artist_id, source, metric, val)
-            VALUES %s
-            ON CONFLICT (artist_id, source, metric, ts) DO NOTHING
+            UPDATE etl_runs
+               SET status = %s, finished_at = now(), sources = COALESCE(%s::text[], sources)
+             WHERE id = %s
             """,
-            rows
+            (status, sorted(sources) if sources is not None else None, run_id),
         )
     conn.commit()
 
+def load_last_known(conn, source="spotify"):
+    """
+    Return {(artist_id, metric): latest value} for `source`, read once per run
+    from the metrics_latest rollup.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT artist_id, metric, latest_val FROM metrics_latest WHERE source = %s",
+            (source,),
+        )
+        return {(aid, metric): val for aid, metric, val in cur.fetchall()}
+
+def drop_unchanged(rows, last_known, stats):
+    """
+    With a last-known map (--incremental), keep only rows whose value differs
+    from the artist's latest stored snapshot. The API carries the previous
+    value forward, so skipped rows cost nothing in charts or growth.
+    """
+    stats["fetched_rows"] += len(rows)
+    if last_known is not None:
+        rows = [row for row in rows if last_known.get((row[0], row[2])) != row[3]]
+    stats["written_rows"] += len(rows)
+    return rows
+
+def avg_metrics_row_bytes(conn):
+    """
+    Average on-disk bytes per metrics row (heap + indexes, from planner stats).
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+        SELECT sum(pg_total_relation_size(c.oid)) / NULLIF(sum(GREATEST(c.reltuples, 0)), 0)
+          FROM pg_inherits i
+          JOIN pg_class c ON c.oid = i.inhrelid
+         WHERE i.inhparent = 'metrics'::regclass
+        """)
+        return float(cur.fetchone()[0] or 0)
+
 def fetch_artists(conn):
     """
     Return list of (mc_id, spotify_id) for all artists mapped to Spotify.
@@ -83,32 +203,150 @@ def fetch_spotify_batch(token, spotify_ids):
     Returns list of artist dicts (or None for unknown IDs), in the same order.
     """
     headers = {"Authorization": f"Bearer {token}"}
-    url     = "https://api.spotify.com/v1/artists"
     params  = {"ids": ",".join(spotify_ids)}
-    resp    = requests.get(url, headers=headers, params=params)
-    resp.raise_for_status()
+    resp    = http_client.get(ARTISTS_URL, headers=headers, params=params)
     return resp.json().get("artists", [])
 
-# ── Main ETL ────────────────────────────────────────────────────────────────────
-def main():
-    # 1) Connect to Postgres and ensure tables exist
-    conn = psycopg2.connect(DATABASE_URL)
-    ensure_schema(conn)
+def build_metric_rows(batch, artists_data):
+    """
+    Turn one batch of (mc_id, spotify_id) plus Spotify's response for it into
+    (artist_id, source, metric, val) rows for upsert_metrics.
+    """
+    id_map = {sp: mc for mc, sp in batch}
 
-    # 2) Fetch all artists with a Spotify ID
-    artist_rows = fetch_artists(conn)  # List of (mc_id, sp_id)
-    total       = len(artist_rows)
-    batches     = math.ceil(total / BATCH_SIZE)
-    logger.info(f"Will process {total} artists in {batches} batches of up to {BATCH_SIZE}")
+    metrics_to_insert = []
+    # Zip so we know which ID gave us None
+    for (_, requested_id), sp_artist in zip(batch, artists_data):
+        if sp_artist is None:
+            logger.warning(f"⚠️  Spotify returned null for ID {requested_id}; skipping.")
+            continue
 
-    if total == 0:
-        logger.info("No artists to process. Have you seeded and mapped Spotify IDs?")
-        return
+        spid = sp_artist.get("id")
+        if spid != requested_id:
+            logger.warning(f"⚠️  Spotify returned unexpected ID {spid} vs requested {requested_id}")
 
-    # 3) Get a fresh Spotify token
-    token = get_token()
+        mc_id = id_map.get(requested_id)
+        if not mc_id:
+            logger.error(f"⚠️  No MC mapping found for {requested_id}; skipping.")
+            continue
+
+        followers  = sp_artist["followers"]["total"]
+        popularity = sp_artist.get("popularity", 0)
+
+        metrics_to_insert.extend([
+            (mc_id, "spotify", "followers",  followers),
+            (mc_id, "spotify", "popularity", popularity),
+        ])
+    return metrics_to_insert
+
+# ── Async ETL ───────────────────────────────────────────────────────────────────
+async def in_thread(func, *args):
+    """
+    asyncio.to_thread for calls that drive the database connection. A thread
+    can't be stopped, so if the awaiting task is cancelled this still waits
+    for the call to return before re-raising: by the time cancellation
+    reaches the caller (which then rolls `conn` back), nothing else is using
+    the connection.
+    """
+    call = asyncio.ensure_future(asyncio.to_thread(func, *args))
+    try:
+        return await asyncio.shield(call)
+    except asyncio.CancelledError:
+        await asyncio.wait([call])
+        raise
+
+async def fetch_spotify_batch_async(client, bucket, token, spotify_ids, stats):
+    """
+    Async fetch_spotify_batch over a shared httpx client. Every attempt takes a
+    token from `bucket` first; a 429 pauses the whole bucket for Retry-After,
+    and 5xx / transport errors back off with http_client's jittered backoff,
+    up to ETL_MAX_RETRIES. Attempts are recorded in http_client's stats.
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    params  = {"ids": ",".join(spotify_ids)}
+    label   = http_client.endpoint_label("GET", ARTISTS_URL)
+    for attempt in range(ETL_MAX_RETRIES + 1):
+        await bucket.acquire()
+        stats["requests"] += 1
+        start = time.perf_counter()
+        try:
+            resp = await client.get(ARTISTS_URL, headers=headers, params=params)
+        except httpx.TransportError as e:
+            http_client.record(label, time.perf_counter() - start, None, retried=True)
+            if attempt == ETL_MAX_RETRIES:
+                raise
+            delay = http_client.backoff(attempt)
+            logger.warning(f"⚠️  {e!r}; retrying in {delay:.1f}s…")
+            await asyncio.sleep(delay)
+            continue
+
+        retry = resp.status_code in http_client.RETRY_STATUSES and attempt < ETL_MAX_RETRIES
+        http_client.record(label, time.perf_counter() - start, resp.status_code, retried=retry)
+        if retry and resp.status_code == 429:
+            delay = http_client.retry_after(resp)
+            stats["throttled"] += 1
+            logger.warning(f"Rate limited; pausing all requests for {delay}s…")
+            bucket.pause(delay)
+            continue
+        if retry:
+            delay = http_client.backoff(attempt)
+            logger.warning(f"⚠️  Spotify returned {resp.status_code}; retrying in {delay:.1f}s…")
+            await asyncio.sleep(delay)
+            continue
+        resp.raise_for_status()
+        return resp.json().get("artists", [])
+
+async def run_async(conn, artist_rows, token, stats, run_id, snapshot_ts, last_known=None):
+    """
+    Fetch all batches with ETL_CONCURRENCY workers sharing one connection
+    pool and one token bucket, while a single writer upserts (and
+    checkpoints) finished batches on `conn` in a worker thread — so fetching
+    and writing overlap.
+    """
+    batches = [artist_rows[i:i + BATCH_SIZE] for i in range(0, len(artist_rows), BATCH_SIZE)]
+    pending = asyncio.Queue()
+    for batch_num, batch in enumerate(batches):
+        pending.put_nowait((batch_num, batch))
+    # Bounded, so fetchers can't run arbitrarily far ahead of a slow database
+    fetched = asyncio.Queue(maxsize=ETL_CONCURRENCY * 2)
+    bucket  = TokenBucket(RATE_LIMIT_QPS, RATE_LIMIT_BURST)
+
+    async def fetcher(client):
+        while True:
+            try:
+                batch_num, batch = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            artists_data = await fetch_spotify_batch_async(
+                client, bucket, token, [sp for _, sp in batch], stats
+            )
+            rows = drop_unchanged(build_metric_rows(batch, artists_data), last_known, stats)
+            await fetched.put((batch_num, batch, rows))
+
+    async def writer():
+        while (item := await fetched.get()) is not None:
+            batch_num, batch, metrics_to_insert = item
+            await in_thread(
+                upsert_metrics, conn, metrics_to_insert, snapshot_ts, (run_id, [mc for mc, _ in batch])
+            )
+            logger.info(f"✔️  Captured {len(batch)} artists, {len(metrics_to_insert)} new snapshots (batch {batch_num+1}/{len(batches)})")
+
+    limits = httpx.Limits(max_connections=ETL_CONCURRENCY, max_keepalive_connections=ETL_CONCURRENCY)
+    async with http_client.async_client(limits=limits, timeout=10) as client:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(writer())
+            async with asyncio.TaskGroup() as fetchers:
+                for _ in range(min(ETL_CONCURRENCY, len(batches))):
+                    fetchers.create_task(fetcher(client))
+            stats["fetch_seconds"] = time.perf_counter() - stats["started"]
+            await fetched.put(None)
 
-    # 4) Process in batches
+def run_sync(conn, artist_rows, token, stats, run_id, snapshot_ts, last_known=None):
+    """
+    Fetch and upsert one batch at a time, sleeping 1/RATE_LIMIT_QPS between
+    requests.
+    """
+    batches = math.ceil(len(artist_rows) / BATCH_SIZE)
     for batch_num in range(batches):
         start = batch_num * BATCH_SIZE
         end   = start + BATCH_SIZE
@@ -117,43 +355,90 @@ def main():
 
         # Fetch the batch
         artists_data = fetch_spotify_batch(token, spotify_ids)
+        stats["requests"] += 1
+        metrics_to_insert = drop_unchanged(build_metric_rows(batch, artists_data), last_known, stats)
+
+        # Upsert into Postgres
+        upsert_metrics(conn, metrics_to_insert, snapshot_ts, (run_id, [mc for mc, _ in batch]))
+        logger.info(f"✔️  Captured {len(batch)} artists, {len(metrics_to_insert)} new snapshots (batch {batch_num+1}/{batches})")
 
-        # Build a map back to your MC IDs
-        id_map = {sp: mc for mc, sp in batch}
+        # Rate-limit to ~1 request/sec
+        time.sleep(1 / RATE_LIMIT_QPS)
+    stats["fetch_seconds"] = time.perf_counter() - stats["started"]
+
+# ── Main ETL ────────────────────────────────────────────────────────────────────
+def main(use_async=False, resume=False, incremental=False):
+    # 1) Connect to Postgres and ensure tables exist
+    conn = psycopg2.connect(DATABASE_URL)
+    ensure_schema(conn)
 
-        metrics_to_insert = []
-        # Zip so we know which ID gave us None
-        for requested_id, sp_artist in zip(spotify_ids, artists_data):
-            if sp_artist is None:
-                logger.warning(f"⚠️  Spotify returned null for ID {requested_id}; skipping.")
-                continue
+    # 2) Fetch all artists with a Spotify ID
+    artist_rows = fetch_artists(conn)  # List of (mc_id, sp_id)
+    if not artist_rows:
+        logger.info("No artists to process. Have you seeded and mapped Spotify IDs?")
+        return
 
-            spid = sp_artist.get("id")
-            if spid != requested_id:
-                logger.warning(f"⚠️  Spotify returned unexpected ID {spid} vs requested {requested_id}")
+    # 3) Open (or resume) a run; every snapshot it writes is stamped snapshot_ts
+    run_id, snapshot_ts, resumed = start_run(conn, len(artist_rows), resume)
+    if resumed:
+        done        = captured_artists(conn, run_id)
+        artist_rows = [row for row in artist_rows if row[0] not in done]
+        logger.info(f"↩️  Resuming run {run_id} (snapshot {snapshot_ts.isoformat()}): "
+                    f"{len(done)} artists already captured")
+    else:
+        logger.info(f"Starting run {run_id} (snapshot {snapshot_ts.isoformat()})")
 
-            mc_id = id_map.get(requested_id)
-            if not mc_id:
-                logger.error(f"⚠️  No MC mapping found for {requested_id}; skipping.")
-                continue
+    total       = len(artist_rows)
+    batches     = math.ceil(total / BATCH_SIZE)
+    logger.info(f"Will process {total} artists in {batches} batches of up to {BATCH_SIZE}")
 
-            followers  = sp_artist["followers"]["total"]
-            popularity = sp_artist.get("popularity", 0)
+    # 4) Get a fresh Spotify token
+    token = get_token()
+    stats = {"started": time.perf_counter(), "requests": 0, "throttled": 0,
+             "fetched_rows": 0, "written_rows": 0}
 
-            metrics_to_insert.extend([
-                (mc_id, "spotify", "followers",  followers),
-                (mc_id, "spotify", "popularity", popularity),
-            ])
+    # Incremental mode writes only values that changed since the last snapshot
+    last_known = load_last_known(conn) if incremental else None
+    if incremental:
+        logger.info(f"Incremental mode: loaded {len(last_known)} last-known values")
 
-        # Upsert into Postgres
-        upsert_metrics(conn, metrics_to_insert)
-        logger.info(f"✔️  Inserted metrics for {len(metrics_to_insert)//2} artists (batch {batch_num+1}/{batches})")
+    # 5) Process in batches, checkpointing each one as it commits
+    try:
+        if use_async:
+            logger.info(f"Async mode: {ETL_CONCURRENCY} concurrent requests, {RATE_LIMIT_QPS} req/s (burst {RATE_LIMIT_BURST:g})")
+            asyncio.run(run_async(conn, artist_rows, token, stats, run_id, snapshot_ts, last_known))
+        else:
+            run_sync(conn, artist_rows, token, stats, run_id, snapshot_ts, last_known)
+    except BaseException:
+        try:
+            conn.rollback()
+            finish_run(conn, run_id, "failed")
+        except psycopg2.Error:
+            pass  # connection is gone; the run still reads as unfinished
+        logger.error(f"⚠️  Run {run_id} failed; rerun with --resume to fetch only the remaining artists")
+        raise
+    finish_run(conn, run_id, "complete")
+    refresh_leaderboards(conn)
 
-        # Rate-limit to ~1 request/sec
-        time.sleep(1 / RATE_LIMIT_QPS)
+    if incremental:
+        skipped = stats["fetched_rows"] - stats["written_rows"]
+        pct     = 100 * skipped / stats["fetched_rows"] if stats["fetched_rows"] else 0.0
+        saved   = skipped * avg_metrics_row_bytes(conn) / 1024 ** 2
+        logger.info(f"💾 Skipped {skipped} of {stats['fetched_rows']} unchanged snapshots "
+                    f"({pct:.1f}%), ~{saved:.2f} MB of metrics storage saved")
 
     conn.close()
-    logger.info("🎉 ETL complete!")
+    wall = time.perf_counter() - stats["started"]
+    qps  = stats["requests"] / stats["fetch_seconds"] if stats["fetch_seconds"] else 0.0
+    logger.info(
+        f"🎉 ETL complete! {stats['requests']} Spotify requests "
+        f"({stats['throttled']} rate-limited) at {qps:.2f} req/s; wall time {wall:.1f}s"
+    )
+    http_client.log_stats()
 
 if __name__ == "__main__":
-    main()
+    main(
+        use_async="--async" in sys.argv[1:],
+        resume="--resume" in sys.argv[1:],
+        incremental="--incremental" in sys.argv[1:],
+    )
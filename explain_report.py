@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN ANALYZE report for every API endpoint's statement (queries.py).
+
+Each statement is explained twice: "before", inside a transaction that drops
+the access-path indexes added by the migrations in INDEX_MIGRATIONS and is
+then rolled back, and "after", with the indexes in place. The report is
+Markdown:
+
+    python explain_report.py > explain_report.md
+
+Note: DROP INDEX takes an exclusive lock on the table until the rollback, so
+run this against a branch/replica or outside the ETL window.
+
+Scope: only indexes can be toggled. Monthly partitioning (0004) can't be
+undone in a transaction, so its effect shows only in the "after" plans, as
+the partitions each windowed scan is pruned to. Table layouts such as the
+rollups and leaderboard_snapshots are compared by their own statements, not
+against a before state.
+"""
+import os
+import re
+import asyncio
+from datetime import date, timedelta
+import asyncpg
+import queries
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+if not DATABASE_URL:
+    raise RuntimeError("⚠️  Set the DATABASE_URL env var before running")
+
+MIGRATIONS_DIR   = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+INDEX_MIGRATIONS = (
+    "0003_metrics_access_indexes.sql",    # metrics & metrics_latest access paths
+    "0008_metrics_daily_range_index.sql", # from/to range probes
+    "0010_artists_name_index.sql",        # /artists keyset pages
+)
+
+
+def _index_names() -> list[str]:
+    names = []
+    for fname in INDEX_MIGRATIONS:
+        with open(os.path.join(MIGRATIONS_DIR, fname)) as f:
+            names += re.findall(r"CREATE INDEX IF NOT EXISTS (\w+)", f.read())
+    return names
+
+
+def _cases(aid: str) -> list[tuple[str, str, tuple]]:
+    """(label, statement, args) for each endpoint, using `aid` as the sample artist."""
+    today = date.today()
+    week, last_week = today - timedelta(days=6), today - timedelta(days=13)
+    return [
+        ("GET /artists",                         queries.ARTISTS_PAGE, (None, None, None)),
+        ("GET /artist/{aid}",                    queries.ARTIST_BY_ID, (aid,)),
+        ("GET /artist/{aid}/latest",             queries.LATEST_24H, (aid,)),
+        ("GET /artist/{aid}/metrics?period=7 days", queries.SERIES_RAW, ([aid], "7 days", "spotify")),
+        ("GET /artist/{aid}/metrics?period=all&max_points=200",
+                                                 queries.SERIES_ALL_MAX_POINTS, ([aid], None, "spotify", 200)),
+        ("GET /artist/{aid}/growth?period=7 days", queries.GROWTH, ([aid], "7 days", "spotify")),
+        ("GET /artist/{aid}/growth?from=…&compare_to=previous",
+                                                 queries.GROWTH_RANGE,
+                                                 ([aid], week, today, "spotify", last_week, week - timedelta(days=1))),
+        ("GET /artists/top-growth?period=7 days",
+                                                 queries.TOP_GROWTH, (10, "7 days", "absolute", False, "spotify")),
+        ("GET /artists/top-growth?period=30 days&mode=discovery",
+                                                 queries.TOP_GROWTH, (10, "30 days", "percent", True, "spotify")),
+        ("GET /artists/top-growth?period=all",   queries.TOP_GROWTH, (10, None, "absolute", False, "spotify")),
+        ("GET /artists/top-growth?mode=breakout", queries.TOP_BREAKOUT, (10, "spotify")),
+        ("GET /artists/top-growth?from=…&compare_to=previous&sort_by=change",
+                                                 queries.TOP_GROWTH_RANGE,
+                                                 (10, week, today, "change", False, "spotify",
+                                                  last_week, week - timedelta(days=1))),
+        ("GET /artists/top-popularity-growth?period=7 days",
+                                                 queries.TOP_POPULARITY_GROWTH, (10, "7 days", "spotify")),
+    ]
+
+
+async def _explain(conn, sql: str, args: tuple) -> str:
+    rows = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) {sql}", *args)
+    return "\n".join(r[0] for r in rows)
+
+
+def _execution_time(plan: str) -> str:
+    m = re.search(r"Execution Time: ([\d.]+ ms)", plan)
+    return m.group(1) if m else "?"
+
+
+async def main():
+    conn = await asyncpg.connect(DATABASE_URL, statement_cache_size=0)
+    aid  = await conn.fetchval(
+        "SELECT artist_id FROM metrics_latest "
+        "WHERE source = 'spotify' AND metric = 'followers' "
+        "ORDER BY latest_val DESC LIMIT 1"
+    )
+    if aid is None:
+        raise RuntimeError("No metrics yet — run etl.py first.")
+    indexes = _index_names()
+
+    print("# EXPLAIN ANALYZE report\n")
+    print(f"Sample artist: `{aid}`. \"Before\" drops {', '.join(f'`{i}`' for i in indexes)} "
+          "inside a rolled-back transaction.\n")
+    print("| Endpoint | Before | After |")
+    print("|---|---|---|")
+
+    sections = []
+    for label, sql, args in _cases(aid):
+        tx = conn.transaction()
+        await tx.start()
+        try:
+            for name in indexes:
+                await conn.execute(f"DROP INDEX IF EXISTS {name}")
+            before = await _explain(conn, sql, args)
+        finally:
+            await tx.rollback()
+        after = await _explain(conn, sql, args)
+
+        print(f"| `{label}` | {_execution_time(before)} | {_execution_time(after)} |")
+        sections.append(
+            f"## {label}\n\n### Before\n\n```\n{before}\n```\n\n### After\n\n```\n{after}\n```\n"
+        )
+
+    print()
+    print("\n".join(sections))
+    await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,187 @@
+"""
+Shared HTTP client for every script that talks to Spotify or Monstercat.
+
+  * One keep-alive `requests.Session` per process, with a connection pool
+    sized by HTTP_POOL_SIZE, so repeated calls reuse TCP+TLS connections.
+  * The same retry policy everywhere: 429s wait for Retry-After; 5xx
+    responses, timeouts and connection errors back off exponentially with
+    full jitter; up to HTTP_MAX_RETRIES retries, then the error is raised.
+  * A process-wide Spotify client-credentials token (`get_token`).
+  * Per-endpoint request counts and latency (`stats`, `log_stats`).
+
+The async ETL uses `async_client()`, an httpx client that speaks HTTP/2 when
+the `h2` package is installed.
+"""
+import os
+import re
+import time
+import random
+import logging
+import threading
+from urllib.parse import urlsplit
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import h2  # noqa: F401  (enables httpx's HTTP/2 support)
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_SIZE    = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_MAX_RETRIES  = int(os.getenv("HTTP_MAX_RETRIES", "5"))
+HTTP_TIMEOUT      = float(os.getenv("HTTP_TIMEOUT", "10"))
+BACKOFF_BASE      = 0.5   # seconds
+BACKOFF_CAP       = 30.0  # seconds
+RETRY_STATUSES    = {429, 500, 502, 503, 504}
+
+TOKEN_URL = "https://accounts.spotify.com/api/token"
+
+# ── Session ─────────────────────────────────────────────────────────────────────
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+
+def backoff(attempt: int) -> float:
+    """
+    Full-jitter exponential backoff for retry number `attempt` (0-based).
+    """
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def retry_after(resp) -> float:
+    try:
+        return max(0.0, float(resp.headers.get("Retry-After", "1")))
+    except ValueError:
+        return 1.0
+
+
+# ── Stats ───────────────────────────────────────────────────────────────────────
+_ID_SEGMENT = re.compile(r"^(?:[A-Za-z0-9]{22}|\d+|[0-9a-f-]{36})$")
+_stats: dict[str, dict] = {}
+_stats_lock = threading.Lock()
+
+
+def endpoint_label(method: str, url: str) -> str:
+    """
+    "GET api.spotify.com/v1/artists/{id}/albums": IDs collapsed so calls to
+    the same endpoint aggregate together.
+    """
+    parts = urlsplit(url)
+    path  = "/".join("{id}" if _ID_SEGMENT.match(seg) else seg for seg in parts.path.split("/"))
+    return f"{method} {parts.netloc}{path}"
+
+
+def record(label: str, seconds: float, status: int | None, retried: bool = False):
+    with _stats_lock:
+        s = _stats.setdefault(label, {
+            "requests": 0, "errors": 0, "retries": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+        })
+        s["requests"]      += 1
+        s["total_seconds"] += seconds
+        s["max_seconds"]    = max(s["max_seconds"], seconds)
+        if status is None or status >= 400:
+            s["errors"] += 1
+        if retried:
+            s["retries"] += 1
+
+
+def stats() -> dict[str, dict]:
+    with _stats_lock:
+        return {label: dict(s) for label, s in _stats.items()}
+
+
+def log_stats(emit=logger.info):
+    """
+    One line per endpoint: request count, mean/max latency, retries, errors.
+    """
+    for label, s in sorted(stats().items(), key=lambda kv: -kv[1]["requests"]):
+        avg_ms = 1000 * s["total_seconds"] / s["requests"]
+        emit(f"📊 {label}: {s['requests']} requests, avg {avg_ms:.0f} ms, "
+             f"max {1000 * s['max_seconds']:.0f} ms, {s['retries']} retried, {s['errors']} errors")
+
+
+# ── Requests ────────────────────────────────────────────────────────────────────
+def request(method: str, url: str, *, timeout: float = HTTP_TIMEOUT, **kwargs) -> requests.Response:
+    """
+    `requests.request` over the shared session with the shared retry policy.
+    Returns the response once it is 2xx/3xx; raises HTTPError (or the
+    connection error) when retries are exhausted or on any other 4xx.
+    """
+    label = endpoint_label(method, url)
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        last  = attempt == HTTP_MAX_RETRIES
+        start = time.perf_counter()
+        try:
+            resp = _session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            record(label, time.perf_counter() - start, None, retried=not last)
+            if last:
+                raise
+            delay = backoff(attempt)
+            logger.warning(f"⚠️  {label}: {e.__class__.__name__}; retrying in {delay:.1f}s…")
+            time.sleep(delay)
+            continue
+
+        retry = resp.status_code in RETRY_STATUSES and not last
+        record(label, time.perf_counter() - start, resp.status_code, retried=retry)
+        if retry:
+            delay = retry_after(resp) if resp.status_code == 429 else backoff(attempt)
+            logger.warning(f"⚠️  {label}: HTTP {resp.status_code}; retrying in {delay:.1f}s…")
+            time.sleep(delay)
+            continue
+        resp.raise_for_status()
+        return resp
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def async_client(**kwargs) -> httpx.AsyncClient:
+    """
+    httpx.AsyncClient for concurrent callers, on HTTP/2 when available.
+    """
+    return httpx.AsyncClient(http2=HTTP2, **kwargs)
+
+
+# ── Spotify token ───────────────────────────────────────────────────────────────
+_token            = None
+_token_expires_at = 0.0
+_token_lock       = threading.Lock()
+
+
+def get_token(force_refresh: bool = False) -> str:
+    """
+    Process-wide Spotify client-credentials token, refreshed a minute
+    before it expires (or on demand, e.g. after a 401).
+    """
+    global _token, _token_expires_at
+    with _token_lock:
+        if _token and not force_refresh and time.time() < _token_expires_at:
+            return _token
+
+        client_id     = os.getenv("SPOTIPY_CLIENT_ID")
+        client_secret = os.getenv("SPOTIPY_CLIENT_SECRET")
+        if not client_id or not client_secret:
+            raise RuntimeError("⚠️  Set SPOTIPY_CLIENT_ID and SPOTIPY_CLIENT_SECRET env vars.")
+
+        resp = post(
+            TOKEN_URL,
+            data={"grant_type": "client_credentials"},
+            auth=(client_id, client_secret),
+            timeout=5,
+        )
+        data = resp.json()
+        _token = data["access_token"]
+        _token_expires_at = time.time() + data.get("expires_in", 3600) - 60
+        return _token
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Import historical metric snapshots from CSV, NDJSON or Parquet exports.
+
+Each record needs an artist key, a timestamp and a value; `source` and
+`metric` may come from the file or from --source/--metric:
+
+    artist_id,source,metric,ts,val
+    0f3c…,spotify,followers,2021-03-01T00:00:00Z,15234
+
+Files are streamed (Parquet in record batches, `.gz` transparently) and loaded
+through bulk.BulkLoader, so memory stays bounded by --chunk-rows. Artist keys
+are checked against an in-memory set of `artists` (or mapped from Spotify IDs
+with --key spotify_id); timestamps are kept as given. Snapshots that already
+exist are skipped, so re-running an import is harmless.
+
+    python import_history.py exports/followers_2019_2023.csv.gz
+    python import_history.py --key spotify_id --metric followers dump.parquet
+"""
+import os
+import re
+import csv
+import gzip
+import json
+import math
+import time
+import logging
+import argparse
+from collections import Counter
+from datetime import datetime, timezone
+import psycopg2
+from bulk import BulkLoader, BULK_COMMIT_ROWS
+from migrate import apply_migrations
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # only needed for .parquet inputs
+    pq = None
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+PARQUET_BATCH_ROWS = 65_536
+PROGRESS_EVERY     = 1_000_000
+
+
+# ── Readers ─────────────────────────────────────────────────────────────────────
+def _open_text(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="")
+    return open(path, newline="")
+
+
+def read_csv(path):
+    with _open_text(path) as f:
+        yield from csv.DictReader(f)
+
+
+def read_ndjson(path):
+    with _open_text(path) as f:
+        for line in f:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    yield None
+
+
+def read_parquet(path):
+    if pq is None:
+        raise RuntimeError("⚠️  Install pyarrow to import Parquet files (pip install pyarrow)")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=PARQUET_BATCH_ROWS):
+        yield from batch.to_pylist()
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson, "parquet": read_parquet}
+
+
+def detect_format(path) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    ext  = os.path.splitext(name)[1].lstrip(".").lower()
+    fmt  = {"jsonl": "ndjson", "json": "ndjson", "pq": "parquet"}.get(ext, ext)
+    if fmt not in READERS:
+        raise RuntimeError(f"⚠️  Can't tell the format of {path}; pass --format")
+    return fmt
+
+
+# ── Validation ──────────────────────────────────────────────────────────────────
+# Epoch seconds written as text need at least 9 integer digits (1973 onwards),
+# so a year ("2021") or a basic ISO date ("20210301") is never read as one.
+_EPOCH_TEXT_RE = re.compile(r"^\d{9,}(?:\.\d+)?$")
+
+
+def parse_ts(value) -> datetime:
+    """
+    ISO-8601 string, epoch seconds (a number, or text of 9+ digits), or a
+    datetime (Parquet). Naive values are UTC.
+    """
+    if isinstance(value, datetime):
+        ts = value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        ts = datetime.fromtimestamp(value, timezone.utc)
+    else:
+        text = str(value).strip()
+        if _EPOCH_TEXT_RE.match(text):
+            ts = datetime.fromtimestamp(float(text), timezone.utc)
+        else:
+            ts = datetime.fromisoformat(text)
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def load_artist_keys(conn, key: str) -> dict[str, str]:
+    """
+    Map of accepted artist key → artists.id (identity for --key id).
+    """
+    column = {"id": "id", "spotify_id": "spotify_id"}[key]
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT {column}, id FROM artists WHERE {column} IS NOT NULL")
+        return dict(cur.fetchall())
+
+
+def normalize(record, artist_ids, args):
+    """
+    Return (artist_id, source, metric, ts, val), or a rejection reason string.
+    """
+    if not isinstance(record, dict):
+        return "malformed"
+    artist_id = artist_ids.get(str(record.get(args.artist_column) or "").strip())
+    if artist_id is None:
+        return "unknown_artist"
+    source = record.get("source") or args.source
+    metric = record.get("metric") or args.metric
+    if not source or not metric:
+        return "missing_metric"
+    try:
+        ts = parse_ts(record[args.ts_column])
+    except (KeyError, TypeError, ValueError, OverflowError, OSError):
+        return "bad_ts"
+    try:
+        val = float(record[args.val_column])
+    except (KeyError, TypeError, ValueError):
+        return "bad_val"
+    # float() accepts "nan" / "inf", which would poison the rollups & stats
+    if not math.isfinite(val):
+        return "bad_val"
+    return artist_id, source, metric, ts, val
+
+
+# ── Import ──────────────────────────────────────────────────────────────────────
+def import_file(conn, path, args) -> dict:
+    artist_ids = load_artist_keys(conn, args.key)
+    logger.info(f"Loaded {len(artist_ids)} artist keys ({args.key})")
+
+    reader   = READERS[args.format or detect_format(path)]
+    rejected = Counter()
+    read     = 0
+    start    = time.perf_counter()
+    with BulkLoader(conn, args.chunk_rows) as loader:
+        for record in reader(path):
+            read += 1
+            row = normalize(record, artist_ids, args)
+            if isinstance(row, str):
+                rejected[row] += 1
+            else:
+                loader.add(*row)
+            if read % PROGRESS_EVERY == 0:
+                logger.info(f"✔️  {read:,} rows read ({read / (time.perf_counter() - start):,.0f}/s)")
+
+    elapsed = time.perf_counter() - start
+    return {
+        "read":     read,
+        "loaded":   loader.staged,
+        "inserted": loader.inserted,
+        "rejected": rejected,
+        "seconds":  elapsed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import historical metrics snapshots.")
+    parser.add_argument("paths", nargs="+", help="CSV / NDJSON / Parquet files (optionally .gz)")
+    parser.add_argument("--format", choices=sorted(READERS), help="default: from the file extension")
+    parser.add_argument("--key", choices=["id", "spotify_id"], default="id",
+                        help="what the artist column holds (default: Monstercat artist id)")
+    parser.add_argument("--artist-column", default="artist_id")
+    parser.add_argument("--ts-column", default="ts")
+    parser.add_argument("--val-column", default="val")
+    parser.add_argument("--source", default="spotify", help="used when a record has no source")
+    parser.add_argument("--metric", help="used when a record has no metric")
+    parser.add_argument("--chunk-rows", type=int, default=BULK_COMMIT_ROWS,
+                        help="rows per COPY + merge + commit")
+    args = parser.parse_args()
+
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise RuntimeError("⚠️  Set the DATABASE_URL env var before running")
+
+    conn = psycopg2.connect(db_url)
+    apply_migrations(conn)
+    for path in args.paths:
+        result = import_file(conn, path, args)
+        rejected = sum(result["rejected"].values())
+        reasons  = ", ".join(f"{k}={v}" for k, v in result["rejected"].most_common()) or "none"
+        logger.info(
+            f"🎉 {os.path.basename(path)}: {result['read']:,} rows in {result['seconds']:.1f}s "
+            f"({result['read'] / max(result['seconds'], 1e-9):,.0f} rows/s) — "
+            f"{result['inserted']:,} new snapshots, "
+            f"{result['loaded'] - result['inserted']:,} already present, "
+            f"{rejected:,} rejected ({reasons})"
+        )
+    conn.close()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Precomputed leaderboards (schema in migrations/0009_leaderboard_snapshots.sql).
+
+Right after each ETL run, `refresh_leaderboards` ranks the top
+LEADERBOARD_SIZE artists for every combination the UI asks for — each period
+in LEADERBOARD_PERIODS by absolute and percent growth, discovery mode and
+popularity growth, plus breakout — and stores each ranking as one
+leaderboard_snapshots row. It runs the same statements as api.py (queries.py),
+so a snapshot is exactly what the endpoint would have returned at that
+generation. /artists/top-growth and /artists/top-popularity-growth then read
+one row by primary key and slice it to `limit`.
+
+Run it directly to refresh by hand, e.g. after `python rollups.py`:
+
+    python leaderboards.py                 # spotify
+    python leaderboards.py spotify fake
+"""
+import os
+import re
+import sys
+import json
+import logging
+import psycopg2
+from psycopg2.extras import execute_values
+from fastapi.encoders import jsonable_encoder
+import queries
+from analytics import normalize_period
+from migrate import apply_migrations
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_PERIODS = [
+    normalize_period(p)
+    for p in os.getenv("LEADERBOARD_PERIODS", "24 hours,3 days,7 days,30 days,all").split(",")
+    if p.strip()
+]
+LEADERBOARD_SIZE = 100  # api.py's largest `limit`, so any request is a slice
+
+# The version only moves when the ranked ids do, not when values alone change.
+SNAPSHOT_UPSERT_SQL = """
+INSERT INTO leaderboard_snapshots AS s
+  (endpoint, period, sort_by, mode, source, generation, version, ids, rows, computed_at)
+VALUES %s
+ON CONFLICT (endpoint, period, sort_by, mode, source) DO UPDATE SET
+  generation  = EXCLUDED.generation,
+  version     = CASE WHEN s.ids = EXCLUDED.ids THEN s.version ELSE EXCLUDED.version END,
+  ids         = EXCLUDED.ids,
+  rows        = EXCLUDED.rows,
+  computed_at = EXCLUDED.computed_at
+"""
+_SNAPSHOT_TEMPLATE = "(%s, %s, %s, %s, %s, %s, %s, %s, %s::json, now())"
+
+
+def _pyformat(sql: str) -> str:
+    """
+    A queries.py statement ($1, $2, ...) with psycopg2 placeholders instead.
+    """
+    return re.sub(r"\$(\d+)", r"%(p\1)s", sql.replace("%", "%%"))
+
+
+def _combinations():
+    """
+    ((endpoint, period, sort_by, mode), statement, args without source) for
+    every stored leaderboard. Source is the last parameter of each statement.
+    """
+    for period in LEADERBOARD_PERIODS:
+        interval = None if period == "all" else period
+        for sort_by, mode in (("absolute", "all"), ("percent", "all"), ("percent", "discovery")):
+            yield (("top-growth", period, sort_by, mode), queries.TOP_GROWTH,
+                   (LEADERBOARD_SIZE, interval, sort_by, mode == "discovery"))
+        yield (("top-popularity-growth", period, "delta", "all"), queries.TOP_POPULARITY_GROWTH,
+               (LEADERBOARD_SIZE, interval))
+    # Period-independent; api.py files mode=breakout under period 'all'
+    yield ("top-growth", "all", "zscore", "breakout"), queries.TOP_BREAKOUT, (LEADERBOARD_SIZE,)
+
+
+def refresh_leaderboards(conn, sources=("spotify",)) -> int:
+    """
+    Recompute and store every leaderboard for `sources` in one REPEATABLE READ
+    transaction, so all of them and the recorded generation describe the same
+    instant. Call it between transactions (e.g. after etl.finish_run). A
+    failure is logged and rolled back rather than raised: the API then keeps
+    computing rankings itself. Returns how many snapshots were stored.
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            cur.execute(queries.CURRENT_GENERATION)
+            generation = cur.fetchone()[0]
+
+            snapshots = []
+            for source in sources:
+                for key, statement, args in _combinations():
+                    cur.execute(_pyformat(statement),
+                                {f"p{i}": a for i, a in enumerate((*args, source), 1)})
+                    names = [c.name for c in cur.description]
+                    rows  = [dict(zip(names, r)) for r in cur.fetchall()]
+                    # Encoded as FastAPI encodes the live response (whole
+                    # Decimals → int), so a snapshot serves the same bytes
+                    snapshots.append((
+                        *key, source, generation, generation, [r["id"] for r in rows],
+                        json.dumps(jsonable_encoder(rows)),
+                    ))
+            execute_values(cur, SNAPSHOT_UPSERT_SQL, snapshots, template=_SNAPSHOT_TEMPLATE)
+        conn.commit()
+    except psycopg2.Error as e:
+        conn.rollback()
+        logger.error(f"⚠️  Leaderboard snapshots not refreshed: {e}")
+        return 0
+
+    logger.info(f"🏆 Stored {len(snapshots)} leaderboard snapshots for {', '.join(sources)} "
+                f"(generation {generation})")
+    return len(snapshots)
+
+
+if __name__ == "__main__":
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise RuntimeError("⚠️  Set the DATABASE_URL env var before running")
+
+    conn = psycopg2.connect(db_url)
+    apply_migrations(conn)
+    refresh_leaderboards(conn, sys.argv[1:] or ("spotify",))
+    conn.close()
@@ -4,8 +4,10 @@ import sys
 import csv
 import json
 import logging
-from sqlalchemy import create_engine, MetaData, Table, select, update
-from spotify_helper import search_artist_exact, fetch_monstercat_spotify_links
+import psycopg2
+import http_client
+from mapping import resolve_artists, log_tier_stats
+from spotify_helper import fetch_monstercat_spotify_links
 
 # ─── Config & Logging ─────────────────────────────────────────────────────────
 logging.basicConfig(level=logging.INFO, format="%(message)s")
@@ -38,59 +40,36 @@ def main():
     mc_links = fetch_monstercat_spotify_links()
     logger.info(f"Found {len(mc_links)} Monstercat artists with a valid direct Spotify link.")
 
-    # 3) connect & reflect
-    engine   = create_engine(DATABASE_URL, future=True)
-    metadata = MetaData()
-    artists  = Table("artists", metadata, autoload_with=engine)
-
-    # 4) pull all artists needing a spotify_id
-    with engine.begin() as conn:
-        to_map = conn.execute(
-            select(artists.c.id, artists.c.name)
-            .where(artists.c.spotify_id.is_(None))
-        ).all()
+    # 3) pull all artists needing a spotify_id
+    conn = psycopg2.connect(DATABASE_URL)
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, name FROM artists WHERE spotify_id IS NULL")
+        to_map = cur.fetchall()
+    conn.commit()
 
     total = len(to_map)
     logger.info(f"Mapping {total} artists → Spotify…")
 
+    # 4) resolve all tiers (Tier 3 searches run in parallel); matches are
+    #    written as each phase completes
+    matches, tier_stats, updated = resolve_artists(conn, to_map, overrides, mc_links)
+    conn.close()
+
     tier_counts  = {"manual": 0, "links": 0, "search": 0, "unresolved": 0}
     skipped_rows = []
-
-    # 5) iterate & upsert
     for idx, (db_id, name) in enumerate(to_map, 1):
-        key  = str(db_id)
-        sid  = None
-        tier = None
-
-        # 5a) Tier 1: manual override by DB id
-        if key in overrides:
-            sid, tier = overrides[key], "manual"
-
-        # 5b) Tier 2: Monstercat profile Spotify link
-        elif key in mc_links:
-            sid, tier = mc_links[key], "links"
-
-        # 5c) Tier 3: Spotify search fallback
-        else:
-            candidate = search_artist_exact(name)
-            if candidate:
-                sid, tier = candidate, "search"
-
-        if sid:
+        if db_id in matches:
+            sid, tier = matches[db_id]
             tier_counts[tier] += 1
             logger.info(f"[{idx}/{total}] '{name}' (#{db_id}) -> {sid} (tier={tier})")
-            with engine.begin() as conn:
-                conn.execute(
-                    update(artists)
-                    .where(artists.c.id == db_id)
-                    .values(spotify_id=sid)
-                )
         else:
             tier_counts["unresolved"] += 1
             logger.warning(f"[{idx}/{total}] ⚠️ No Spotify match for '{name}' (#{db_id}), skipping")
             skipped_rows.append({"db_id": db_id, "name": name})
 
-    # 6) write skipped artists for visibility (only if non-empty)
+    logger.info(f"Updated spotify_id for {updated} artists")
+
+    # 5) write skipped artists for visibility (only if non-empty)
     if skipped_rows:
         with open(SKIPPED_CSV, "w", newline="") as f:
             writer = csv.DictWriter(f, fieldnames=["db_id", "name"])
@@ -105,6 +84,8 @@ def main():
         f"unresolved={tier_counts['unresolved']} "
         f"(total={total})"
     )
+    log_tier_stats(tier_stats)
+    http_client.log_stats()
 
 if __name__ == "__main__":
     main()
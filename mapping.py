@@ -0,0 +1,129 @@
+"""
+3-tier Monstercat → Spotify mapping pipeline shared by map_spotify.py and
+roster_refresh.py.
+
+  1. manual overrides and 2. Monstercat profile links are resolved in memory
+     for every artist at once;
+  3. the remaining artists are searched on Spotify (search_artist_exact)
+     over a pool of MAPPING_WORKERS threads, all paced by spotify_helper's
+     shared SyncTokenBucket (SPOTIFY_QPS).
+
+Tier 1/2 matches are written back (one `UPDATE ... FROM (VALUES ...)`) before
+the search starts, so a failed or interrupted search never loses them; a
+search that raises is logged and its artist left unresolved. Tier 3 matches
+are written the same way once the pool finishes, and each tier's throughput
+is reported.
+"""
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+MAPPING_WORKERS = int(os.getenv("MAPPING_WORKERS", "4"))
+
+TIERS = ("manual", "links", "search")
+
+
+def _tier_stats() -> dict[str, dict]:
+    return {tier: {"attempted": 0, "matched": 0, "seconds": 0.0} for tier in TIERS}
+
+
+def _search(name: str) -> str | None:
+    """search_artist_exact that logs and skips a failure instead of raising."""
+    from spotify_helper import search_artist_exact
+
+    try:
+        return search_artist_exact(name)
+    except Exception as e:
+        logger.warning(f"⚠️ Spotify search for '{name}' failed, skipping: {e}")
+        return None
+
+
+def resolve_artists(
+    conn,
+    artists: list[tuple[str, str]],
+    overrides: dict[str, str],
+    mc_links: dict[str, str],
+    workers: int = MAPPING_WORKERS,
+) -> tuple[dict[str, tuple[str, str]], dict[str, dict], int]:
+    """
+    Resolve each (artist_id, name) through the three tiers, writing matches
+    to artists.spotify_id as each phase completes (see write_matches).
+    Returns ({artist_id: (spotify_id, tier)} for every match, per-tier stats,
+    rows updated).
+    """
+    stats   = _tier_stats()
+    matches = {}
+    pending = list(artists)
+
+    for tier, source in (("manual", overrides), ("links", mc_links)):
+        start = time.perf_counter()
+        stats[tier]["attempted"] = len(pending)
+        remaining = []
+        for artist_id, name in pending:
+            sid = source.get(str(artist_id))
+            if sid:
+                matches[artist_id] = (sid, tier)
+            else:
+                remaining.append((artist_id, name))
+        stats[tier]["matched"] = len(pending) - len(remaining)
+        stats[tier]["seconds"] = time.perf_counter() - start
+        pending = remaining
+
+    updated = write_matches(conn, matches)
+    # Also ends any read transaction the caller left open, so the connection
+    # doesn't sit idle in transaction through the network-bound search.
+    conn.commit()
+
+    if pending:
+        start = time.perf_counter()
+        stats["search"]["attempted"] = len(pending)
+        searched = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            found = pool.map(_search, [name for _, name in pending])
+            for (artist_id, _), sid in zip(pending, found):
+                if sid:
+                    searched[artist_id] = (sid, "search")
+        stats["search"]["matched"] = len(searched)
+        stats["search"]["seconds"] = time.perf_counter() - start
+        updated += write_matches(conn, searched)
+        matches.update(searched)
+
+    return matches, stats, updated
+
+
+def write_matches(conn, matches: dict[str, tuple[str, str]]) -> int:
+    """
+    Set artists.spotify_id for every match in one statement (artists that
+    already have a spotify_id are left untouched). Returns rows updated.
+    """
+    if not matches:
+        return 0
+    rows = [(artist_id, sid) for artist_id, (sid, _) in matches.items()]
+    with conn.cursor() as cur:
+        execute_values(
+            cur,
+            """
+            UPDATE artists AS a
+               SET spotify_id = v.spotify_id
+              FROM (VALUES %s) AS v(id, spotify_id)
+             WHERE a.id = v.id
+               AND a.spotify_id IS NULL
+            """,
+            rows,
+            page_size=len(rows),
+        )
+        updated = cur.rowcount
+    conn.commit()
+    return updated
+
+
+def log_tier_stats(stats: dict[str, dict], emit=logger.info):
+    for tier in TIERS:
+        s    = stats[tier]
+        rate = s["attempted"] / s["seconds"] if s["seconds"] else 0.0
+        emit(f"  tier={tier:<6} {s['matched']:>5}/{s['attempted']:<5} matched "
+             f"in {s['seconds']:.2f}s ({rate:,.1f} artists/s)")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations.
+
+Each file in migrations/ named <version>_<description>.sql is applied once, in
+version order, inside its own transaction, and recorded in schema_migrations.
+etl.py runs this on every start, so a fresh database and an existing one both
+converge on the same schema. To apply or inspect by hand:
+
+    python migrate.py            # apply anything pending
+    python migrate.py --status   # list applied / pending versions
+"""
+import os
+import sys
+import logging
+import psycopg2
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Arbitrary constant; serializes concurrent runners (e.g. overlapping ETL jobs).
+MIGRATION_LOCK_KEY = 7_201_405
+
+# How many months of empty metrics partitions to keep ready ahead of now.
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "2"))
+
+
+def list_migrations() -> list[tuple[str, str]]:
+    """
+    Return [(version, path)] for every migration file, sorted by version.
+    """
+    found = []
+    for fname in sorted(os.listdir(MIGRATIONS_DIR)):
+        if fname.endswith(".sql"):
+            found.append((fname.split("_", 1)[0], os.path.join(MIGRATIONS_DIR, fname)))
+    return found
+
+
+def applied_versions(conn) -> set[str]:
+    with conn.cursor() as cur:
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations(
+          version    TEXT PRIMARY KEY,
+          applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """)
+        cur.execute("SELECT version FROM schema_migrations")
+        versions = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return versions
+
+
+def apply_migrations(conn) -> list[str]:
+    """
+    Apply all pending migrations. Returns the versions applied by this call.
+    """
+    done    = applied_versions(conn)
+    applied = []
+    for version, path in list_migrations():
+        if version in done:
+            continue
+        with open(path) as f:
+            sql = f.read()
+        try:
+            with conn.cursor() as cur:
+                # Transaction-scoped lock: safe behind a transaction pooler,
+                # where a session lock could outlive us on a shared backend.
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_KEY,))
+                cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (version,))
+                if cur.fetchone():
+                    conn.commit()  # applied by a concurrent runner meanwhile
+                    continue
+                cur.execute(sql)
+                cur.execute(
+                    "INSERT INTO schema_migrations (version) VALUES (%s)", (version,)
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+        logger.info(f"✔️  Applied migration {os.path.basename(path)}")
+    return applied
+
+
+def ensure_partitions(conn, months_ahead: int = PARTITION_MONTHS_AHEAD) -> int:
+    """
+    Create any missing monthly metrics partitions from the current month
+    through `months_ahead` months out (see 0004_partition_metrics.sql).
+    Returns how many were created.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT ensure_metrics_partitions(now(), %s)", (months_ahead,))
+        created = cur.fetchone()[0]
+    conn.commit()
+    if created:
+        logger.info(f"✔️  Created {created} metrics partition(s)")
+    return created
+
+
+def print_status(conn):
+    done = applied_versions(conn)
+    for version, path in list_migrations():
+        state = "applied" if version in done else "pending"
+        print(f"  {state:<8} {os.path.basename(path)}")
+
+
+if __name__ == "__main__":
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise RuntimeError("⚠️  Set the DATABASE_URL env var before running")
+
+    conn = psycopg2.connect(db_url)
+    if "--status" in sys.argv[1:]:
+        print_status(conn)
+    else:
+        applied = apply_migrations(conn)
+        ensure_partitions(conn)
+        logger.info(f"🎉 Schema up to date ({len(applied)} migration(s) applied).")
+    conn.close()
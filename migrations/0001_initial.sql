@@ -0,0 +1,16 @@
+-- Core tables: the Monstercat roster and raw metric snapshots.
+CREATE TABLE IF NOT EXISTS artists(
+  id         TEXT PRIMARY KEY,
+  name       TEXT,
+  uri        TEXT,
+  spotify_id TEXT
+);
+
+CREATE TABLE IF NOT EXISTS metrics(
+  artist_id TEXT,
+  source    TEXT,
+  metric    TEXT,
+  ts        TIMESTAMPTZ DEFAULT now(),
+  val       NUMERIC,
+  PRIMARY KEY (artist_id, source, metric, ts)
+);
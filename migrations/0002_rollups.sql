@@ -0,0 +1,57 @@
+-- Rollups maintained by etl.py (see rollups.py; `python rollups.py` rebuilds them).
+CREATE TABLE IF NOT EXISTS metrics_latest(
+  artist_id  TEXT,
+  source     TEXT,
+  metric     TEXT,
+  first_ts   TIMESTAMPTZ NOT NULL,
+  first_val  NUMERIC,
+  latest_ts  TIMESTAMPTZ NOT NULL,
+  latest_val NUMERIC,
+  PRIMARY KEY (artist_id, source, metric)
+);
+
+CREATE TABLE IF NOT EXISTS metrics_daily(
+  artist_id TEXT,
+  source    TEXT,
+  metric    TEXT,
+  day       DATE,
+  ts        TIMESTAMPTZ NOT NULL,
+  val       NUMERIC,
+  PRIMARY KEY (artist_id, source, metric, day)
+);
+
+-- Seed both rollups from the existing history, so an existing deployment
+-- serves leaderboards & period=all series (and etl.py --incremental sees its
+-- last-known values) right away. Same statements as rollups.py's rebuild.
+INSERT INTO metrics_latest
+  (artist_id, source, metric, first_ts, first_val, latest_ts, latest_val)
+SELECT
+  artist_id,
+  source,
+  metric,
+  min(ts),
+  (array_agg(val ORDER BY ts ASC))[1],
+  max(ts),
+  (array_agg(val ORDER BY ts DESC))[1]
+FROM metrics
+GROUP BY artist_id, source, metric
+ON CONFLICT DO NOTHING;
+
+INSERT INTO metrics_daily
+  (artist_id, source, metric, day, ts, val)
+SELECT DISTINCT ON (artist_id, source, metric, day)
+  artist_id, source, metric, day, ts, val
+FROM (
+  SELECT artist_id, source, metric, (ts AT TIME ZONE 'UTC')::date AS day, ts, val
+  FROM metrics
+) s
+ORDER BY artist_id, source, metric, day, ts DESC
+ON CONFLICT DO NOTHING;
+
+-- Bumped by every ETL batch; the API uses it to invalidate caches & ETags.
+CREATE TABLE IF NOT EXISTS metrics_generation(
+  id         BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  generation BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+INSERT INTO metrics_generation (id) VALUES (TRUE) ON CONFLICT DO NOTHING;
@@ -0,0 +1,21 @@
+-- Indexes for the API's real access paths (see explain_report.py).
+
+-- Per-source/metric scans across all artists, newest first, answerable from
+-- the index alone (val is carried as a non-key column).
+CREATE INDEX IF NOT EXISTS metrics_source_metric_artist_ts_idx
+  ON metrics (source, metric, artist_id, ts DESC) INCLUDE (val);
+
+-- Follower series & baseline probes for one artist: the hottest path, kept
+-- small by covering only spotify followers.
+CREATE INDEX IF NOT EXISTS metrics_spotify_followers_artist_ts_idx
+  ON metrics (artist_id, ts DESC) INCLUDE (val)
+  WHERE source = 'spotify' AND metric = 'followers';
+
+-- Snapshots arrive in time order, so a BRIN index serves ts-range scans
+-- (retention, compaction, backfill checks) for a few pages of storage.
+CREATE INDEX IF NOT EXISTS metrics_ts_brin
+  ON metrics USING brin (ts);
+
+-- Leaderboards filter metrics_latest by (source, metric) across all artists.
+CREATE INDEX IF NOT EXISTS metrics_latest_source_metric_idx
+  ON metrics_latest (source, metric) INCLUDE (artist_id, latest_val, first_val);
@@ -0,0 +1,68 @@
+-- Monthly range partitions for metrics, keyed on ts.
+--
+-- Period queries (`ts >= now() - interval`) prune to the partitions they
+-- touch, and retention/compaction (compact.py) works one month at a time.
+-- New partitions are created ahead of time by ensure_metrics_partitions(),
+-- which etl.py calls on every run; metrics_default only catches strays.
+
+-- 1) Move the existing heap aside, freeing its constraint/index names.
+ALTER TABLE metrics RENAME TO metrics_unpartitioned;
+ALTER TABLE metrics_unpartitioned RENAME CONSTRAINT metrics_pkey TO metrics_unpartitioned_pkey;
+DROP INDEX IF EXISTS metrics_source_metric_artist_ts_idx;
+DROP INDEX IF EXISTS metrics_spotify_followers_artist_ts_idx;
+DROP INDEX IF EXISTS metrics_ts_brin;
+
+-- 2) Partitioned replacement.
+CREATE TABLE metrics(
+  artist_id TEXT,
+  source    TEXT,
+  metric    TEXT,
+  ts        TIMESTAMPTZ DEFAULT now(),
+  val       NUMERIC,
+  PRIMARY KEY (artist_id, source, metric, ts)
+) PARTITION BY RANGE (ts);
+
+CREATE TABLE metrics_default PARTITION OF metrics DEFAULT;
+
+-- Create monthly partitions (metrics_YYYY_MM, UTC months) from the month of
+-- `since` through `months_ahead` months past now. Returns how many it created.
+CREATE OR REPLACE FUNCTION ensure_metrics_partitions(since TIMESTAMPTZ, months_ahead INT)
+RETURNS INT LANGUAGE plpgsql AS $$
+DECLARE
+  month_start DATE := date_trunc('month', COALESCE(since, now()) AT TIME ZONE 'UTC')::date;
+  last_month  DATE := date_trunc('month', (now() AT TIME ZONE 'UTC')
+                                          + make_interval(months => months_ahead))::date;
+  part_name   TEXT;
+  created     INT := 0;
+BEGIN
+  WHILE month_start <= last_month LOOP
+    part_name := format('metrics_%s', to_char(month_start, 'YYYY_MM'));
+    IF to_regclass(part_name) IS NULL THEN
+      EXECUTE format(
+        'CREATE TABLE %I PARTITION OF metrics FOR VALUES FROM (%L) TO (%L)',
+        part_name,
+        month_start::timestamp AT TIME ZONE 'UTC',
+        (month_start + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC'
+      );
+      created := created + 1;
+    END IF;
+    month_start := (month_start + INTERVAL '1 month')::date;
+  END LOOP;
+  RETURN created;
+END $$;
+
+-- 3) Copy history into its partitions and drop the old heap.
+SELECT ensure_metrics_partitions((SELECT min(ts) FROM metrics_unpartitioned), 2);
+INSERT INTO metrics (artist_id, source, metric, ts, val)
+SELECT artist_id, source, metric, ts, val FROM metrics_unpartitioned;
+DROP TABLE metrics_unpartitioned;
+
+-- 4) Re-create the access-path indexes from 0003 on the partitioned parent
+--    (they cascade to every current and future partition).
+CREATE INDEX metrics_source_metric_artist_ts_idx
+  ON metrics (source, metric, artist_id, ts DESC) INCLUDE (val);
+CREATE INDEX metrics_spotify_followers_artist_ts_idx
+  ON metrics (artist_id, ts DESC) INCLUDE (val)
+  WHERE source = 'spotify' AND metric = 'followers';
+CREATE INDEX metrics_ts_brin
+  ON metrics USING brin (ts);
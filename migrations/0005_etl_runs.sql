@@ -0,0 +1,22 @@
+-- ETL run bookkeeping, so an interrupted run can be resumed (etl.py --resume).
+--
+-- Every snapshot written by a run carries the run's snapshot_ts, so re-fetching
+-- an artist within the same run collides on the metrics primary key instead
+-- of adding a second snapshot. etl_checkpoints records each artist once its
+-- batch has committed (in the same transaction as the metrics rows).
+CREATE TABLE IF NOT EXISTS etl_runs(
+  id            BIGSERIAL PRIMARY KEY,
+  snapshot_ts   TIMESTAMPTZ NOT NULL DEFAULT now(),
+  started_at    TIMESTAMPTZ NOT NULL DEFAULT now(),
+  finished_at   TIMESTAMPTZ,
+  status        TEXT NOT NULL DEFAULT 'running',  -- running | failed | complete
+  artists_total INT,
+  batches_done  INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS etl_checkpoints(
+  run_id      BIGINT REFERENCES etl_runs(id) ON DELETE CASCADE,
+  artist_id   TEXT,
+  captured_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (run_id, artist_id)
+);
@@ -0,0 +1,3 @@
+-- Which metric sources each ETL / collector run captured, so readers can find
+-- the last complete run for a given source (queries._CARRY_TO_LAST_RUN).
+ALTER TABLE etl_runs ADD COLUMN IF NOT EXISTS sources TEXT[] NOT NULL DEFAULT '{spotify}';
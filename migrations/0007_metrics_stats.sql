@@ -0,0 +1,127 @@
+-- Incremental growth statistics, one row per series (artist, source, metric),
+-- maintained next to the rollups (see rollups.py). Each new snapshot updates
+-- its row in O(1) from the previous state; history is never re-read.
+--
+--   rate          growth per day since the previous snapshot
+--   velocity      exponential moving average of rate (half-life 7 days)
+--   acceleration  moving average of the change in velocity per day (half-life 7 days)
+--   rate_mean,    exponentially weighted running mean & variance of rate
+--   rate_var        (half-life 30 days): the series' own recent normal
+--   zscore        how unusual the latest rate is against that normal, taken
+--                 before the rate is folded in; the std is floored at
+--                 max(1/day, 10% of the mean rate) so very steady series
+--                 don't turn small wobbles into huge scores
+--   observations  rates folded in so far
+--
+-- Weights scale with the gap between snapshots, so runs skipped by
+-- etl.py --incremental (unchanged values) are accounted for. Snapshots older
+-- than last_ts (backfills) are ignored; `python rollups.py` rebuilds the
+-- table from the full history.
+CREATE TABLE IF NOT EXISTS metrics_stats(
+  artist_id    TEXT,
+  source       TEXT,
+  metric       TEXT,
+  last_ts      TIMESTAMPTZ NOT NULL,
+  last_val     DOUBLE PRECISION NOT NULL,
+  observations INT NOT NULL DEFAULT 0,
+  rate         DOUBLE PRECISION,
+  velocity     DOUBLE PRECISION,
+  acceleration DOUBLE PRECISION,
+  rate_mean    DOUBLE PRECISION,
+  rate_var     DOUBLE PRECISION,
+  zscore       DOUBLE PRECISION,
+  PRIMARY KEY (artist_id, source, metric)
+);
+
+-- mode=breakout reads the top of this per source & metric
+CREATE INDEX IF NOT EXISTS metrics_stats_breakout_idx
+  ON metrics_stats (source, metric, zscore DESC NULLS LAST);
+
+-- Fold one snapshot into its series' stats. Returns whether it was applied.
+CREATE OR REPLACE FUNCTION metrics_stats_push(
+  p_artist_id TEXT, p_source TEXT, p_metric TEXT, p_ts TIMESTAMPTZ, p_val DOUBLE PRECISION
+) RETURNS BOOLEAN LANGUAGE plpgsql AS $$
+DECLARE
+  s        metrics_stats%ROWTYPE;
+  dt       DOUBLE PRECISION;  -- days since the previous snapshot
+  r        DOUBLE PRECISION;
+  a_v      DOUBLE PRECISION;
+  a_z      DOUBLE PRECISION;
+  v        DOUBLE PRECISION;
+  diff     DOUBLE PRECISION;
+BEGIN
+  IF p_val IS NULL THEN
+    RETURN FALSE;
+  END IF;
+
+  SELECT * INTO s
+    FROM metrics_stats
+   WHERE artist_id = p_artist_id AND source = p_source AND metric = p_metric
+     FOR UPDATE;
+  IF NOT FOUND THEN
+    INSERT INTO metrics_stats (artist_id, source, metric, last_ts, last_val)
+    VALUES (p_artist_id, p_source, p_metric, p_ts, p_val)
+    ON CONFLICT DO NOTHING;
+    RETURN TRUE;
+  END IF;
+
+  dt := extract(epoch FROM p_ts - s.last_ts) / 86400;
+  IF dt <= 0 THEN
+    RETURN FALSE;
+  END IF;
+
+  r    := (p_val - s.last_val) / dt;
+  a_v  := 1 - exp(-ln(2) * dt / 7);
+  a_z  := 1 - exp(-ln(2) * dt / 30);
+  v    := COALESCE(s.velocity + a_v * (r - s.velocity), r);
+  diff := r - s.rate_mean;
+
+  UPDATE metrics_stats SET
+    last_ts      = p_ts,
+    last_val     = p_val,
+    observations = s.observations + 1,
+    rate         = r,
+    velocity     = v,
+    acceleration = CASE
+                     WHEN s.velocity IS NULL     THEN NULL
+                     WHEN s.acceleration IS NULL THEN (v - s.velocity) / dt
+                     ELSE s.acceleration + a_v * ((v - s.velocity) / dt - s.acceleration)
+                   END,
+    zscore       = diff / GREATEST(sqrt(s.rate_var), 1, 0.1 * abs(s.rate_mean)),
+    rate_mean    = COALESCE(s.rate_mean + a_z * diff, r),
+    rate_var     = COALESCE((1 - a_z) * (s.rate_var + diff * a_z * diff), 0)
+   WHERE artist_id = p_artist_id AND source = p_source AND metric = p_metric;
+  RETURN TRUE;
+END $$;
+
+-- Fold a batch of snapshots in, in (ts, series) order. Returns how many applied.
+CREATE OR REPLACE FUNCTION metrics_stats_push_batch(
+  p_artist_ids TEXT[], p_sources TEXT[], p_metrics TEXT[], p_ts TIMESTAMPTZ[], p_vals DOUBLE PRECISION[]
+) RETURNS INT LANGUAGE plpgsql AS $$
+DECLARE
+  snap    RECORD;
+  applied INT := 0;
+BEGIN
+  FOR snap IN
+    SELECT * FROM unnest(p_artist_ids, p_sources, p_metrics, p_ts, p_vals)
+      AS u(artist_id, source, metric, ts, val)
+     ORDER BY ts, artist_id, source, metric
+  LOOP
+    IF metrics_stats_push(snap.artist_id, snap.source, snap.metric, snap.ts, snap.val) THEN
+      applied := applied + 1;
+    END IF;
+  END LOOP;
+  RETURN applied;
+END $$;
+
+-- Seed from the existing history (same replay as rollups.STATS_REBUILD_SQL).
+DO $$
+DECLARE
+  snap RECORD;
+BEGIN
+  FOR snap IN
+    SELECT artist_id, source, metric, ts, val FROM metrics ORDER BY artist_id, source, metric, ts
+  LOOP
+    PERFORM metrics_stats_push(snap.artist_id, snap.source, snap.metric, snap.ts, snap.val::float8);
+  END LOOP;
+END $$;
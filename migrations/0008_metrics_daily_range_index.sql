@@ -0,0 +1,5 @@
+-- Date-range growth (from/to/compare_to, see queries.GROWTH_RANGE) probes
+-- metrics_daily backwards from a day for one series. Carrying val makes each
+-- probe answerable from the index alone.
+CREATE INDEX IF NOT EXISTS metrics_daily_artist_day_idx
+  ON metrics_daily (artist_id, source, metric, day DESC) INCLUDE (val);
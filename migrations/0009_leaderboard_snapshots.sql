@@ -0,0 +1,26 @@
+-- Leaderboards precomputed by leaderboards.py right after each ETL run: the
+-- top 100 for every (endpoint, period, sort_by, mode, source) the UI asks for,
+-- so the API answers them with one primary-key read.
+--
+--   rows        the ranked rows as the endpoint returns them (JSON array)
+--   ids         their artist ids, in rank order
+--   generation  metrics_generation the rows were computed at; the API only
+--               serves a snapshot that matches the current generation
+--   version     generation at which `ids` last changed, i.e. when the ranking
+--               itself (not just the values) last moved; sent to clients as
+--               X-Leaderboard-Version
+--
+-- top-popularity-growth rows are stored with sort_by 'delta' and mode 'all'.
+CREATE TABLE IF NOT EXISTS leaderboard_snapshots(
+  endpoint    TEXT,
+  period      TEXT,
+  sort_by     TEXT,
+  mode        TEXT,
+  source      TEXT,
+  generation  BIGINT NOT NULL,
+  version     BIGINT NOT NULL,
+  ids         TEXT[] NOT NULL,
+  rows        JSON NOT NULL,
+  computed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (endpoint, period, sort_by, mode, source)
+);
@@ -0,0 +1,4 @@
+-- Keyset pagination of /artists (queries.ARTISTS_PAGE) walks artists in
+-- (name, id) order, with a missing name sorting as ''.
+CREATE INDEX IF NOT EXISTS artists_name_id_idx
+  ON artists ((COALESCE(name, '')), id);
@@ -0,0 +1,44 @@
+-- Drop metrics_default. Any row in a DEFAULT partition makes the later
+-- CREATE TABLE ... PARTITION OF for its month fail, which breaks
+-- ensure_metrics_partitions() and with it ETL/compaction startup. Writers
+-- now create the partitions for the incoming ts range before inserting (see
+-- bulk.py), so an unexpected timestamp fails loudly instead of hiding there.
+
+-- `until` extends creation past now() + months_ahead, for backfills with
+-- future-dated rows. The two-argument form keeps working.
+DROP FUNCTION IF EXISTS ensure_metrics_partitions(TIMESTAMPTZ, INT);
+CREATE OR REPLACE FUNCTION ensure_metrics_partitions(
+  since TIMESTAMPTZ, months_ahead INT, until TIMESTAMPTZ DEFAULT NULL
+) RETURNS INT LANGUAGE plpgsql AS $$
+DECLARE
+  month_start DATE := date_trunc('month', COALESCE(since, now()) AT TIME ZONE 'UTC')::date;
+  last_month  DATE := date_trunc('month', GREATEST(
+                        (now() AT TIME ZONE 'UTC') + make_interval(months => months_ahead),
+                        until AT TIME ZONE 'UTC'))::date;
+  part_name   TEXT;
+  created     INT := 0;
+BEGIN
+  WHILE month_start <= last_month LOOP
+    part_name := format('metrics_%s', to_char(month_start, 'YYYY_MM'));
+    IF to_regclass(part_name) IS NULL THEN
+      EXECUTE format(
+        'CREATE TABLE %I PARTITION OF metrics FOR VALUES FROM (%L) TO (%L)',
+        part_name,
+        month_start::timestamp AT TIME ZONE 'UTC',
+        (month_start + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC'
+      );
+      created := created + 1;
+    END IF;
+    month_start := (month_start + INTERVAL '1 month')::date;
+  END LOOP;
+  RETURN created;
+END $$;
+
+-- Move any strays into real monthly partitions.
+CREATE TEMP TABLE metrics_strays ON COMMIT DROP AS SELECT * FROM metrics_default;
+DROP TABLE metrics_default;
+SELECT ensure_metrics_partitions(
+  (SELECT min(ts) FROM metrics_strays), 2, (SELECT max(ts) FROM metrics_strays)
+);
+INSERT INTO metrics (artist_id, source, metric, ts, val)
+SELECT artist_id, source, metric, ts, val FROM metrics_strays;
@@ -0,0 +1,464 @@
+"""
+SQL statements used by api.py.
+
+Every statement here has a fixed text: all request inputs, including the
+`period` window, are bound parameters and never interpolated. That keeps the
+set of statement shapes small, so Postgres (and asyncpg's statement cache, when
+running against a direct connection) can reuse parsed plans across requests,
+and no query-string value ever reaches the SQL text.
+
+Period convention: wherever a statement takes a period it is `$2`, bound as
+text holding a Postgres interval literal ("7 days", "24 hours", ...) and cast
+in SQL, or NULL for period=all.
+
+Source convention: statements that read one source's metrics take it as a
+text parameter (position noted per statement), e.g. 'spotify'. Note that the
+primary keys of metrics, metrics_latest and metrics_daily lead with
+artist_id, so they only serve `source` as a second column once the artists
+are fixed (per-artist probes). Scans across all artists of one source go
+through the source-leading indexes instead: metrics (source, metric,
+artist_id, ts) and metrics_latest (source, metric) from migrations/0003, and
+metrics_stats (source, metric, zscore) from 0007.
+"""
+
+# ── Generation ──────────────────────────────────────────────────────────────────
+CURRENT_GENERATION = "SELECT generation FROM metrics_generation"
+
+# ── Artists ─────────────────────────────────────────────────────────────────────
+# $1/$2 = keyset cursor (name, id) or NULLs for the first page; $3 = page size,
+# NULL for no limit. (name, id) is unique, so the row comparison resumes
+# exactly after the cursor. A missing name sorts as '' (a NULL would fail the
+# row comparison and drop out of every later page), matching the expression
+# index in migrations/0010, so each page is an index range scan.
+ARTISTS_PAGE = """
+SELECT id, name
+  FROM artists
+ WHERE $1::text IS NULL OR (COALESCE(name, ''), id) > ($1::text, $2::text)
+ ORDER BY COALESCE(name, ''), id
+ LIMIT $3::int
+"""
+
+ARTIST_BY_ID = "SELECT id, name FROM artists WHERE id = $1"
+
+ARTIST_NAMES = "SELECT id, name FROM artists WHERE id = ANY($1::text[])"
+
+# ── Series ──────────────────────────────────────────────────────────────────────
+# Carry-forward: metrics only gets a new snapshot when a value changes
+# (etl.py --incremental), so a value holds until the next snapshot. Series
+# therefore also include the value in effect at the window start (stamped
+# with the window start) and, if the latest value predates the last complete
+# ETL run, that value again at the run's snapshot time.
+_CARRY_FROM_START = """
+CROSS JOIN LATERAL (
+  SELECT m.val
+    FROM metrics m
+   WHERE m.artist_id = l.artist_id
+     AND m.source = l.source
+     AND m.metric = l.metric
+     AND m.ts < {start}
+   ORDER BY m.ts DESC
+   LIMIT 1
+) start
+"""
+
+LATEST_24H = f"""
+SELECT metric, val, ts
+  FROM (
+    SELECT metric, val, ts
+      FROM metrics
+     WHERE artist_id = $1
+       AND ts > now() - INTERVAL '24 hours'
+    UNION ALL
+    SELECT l.metric, start.val, now() - INTERVAL '24 hours'
+      FROM metrics_latest l
+      {_CARRY_FROM_START.format(start="now() - INTERVAL '24 hours'")}
+     WHERE l.artist_id = $1
+  ) s
+ ORDER BY ts
+"""
+
+_CARRY_TO_LAST_RUN = """
+  SELECT l.artist_id, l.metric, l.latest_val, r.snapshot_ts
+    FROM metrics_latest l
+   CROSS JOIN (
+     SELECT max(snapshot_ts) AS snapshot_ts
+       FROM etl_runs
+      WHERE status = 'complete' AND $3::text = ANY(sources)
+   ) r
+   WHERE l.artist_id = ANY($1::text[])
+     AND l.source = $3::text
+     AND l.metric = 'followers'
+     AND r.snapshot_ts > l.latest_ts
+"""
+
+# $1 = artist ids, $2 = period, $3 = source. Windowed series read raw
+# snapshots, which prune to the partitions covering the window.
+_SERIES = f"""
+  SELECT artist_id, metric, val, ts
+    FROM metrics
+   WHERE artist_id = ANY($1::text[])
+     AND source = $3::text
+     AND metric = 'followers'
+     AND ts >= now() - $2::text::interval
+  UNION ALL
+  SELECT l.artist_id, l.metric, start.val, now() - $2::text::interval
+    FROM metrics_latest l
+    {_CARRY_FROM_START.format(start="now() - $2::text::interval")}
+   WHERE l.artist_id = ANY($1::text[])
+     AND l.source = $3::text
+     AND l.metric = 'followers'
+  UNION ALL
+  {_CARRY_TO_LAST_RUN}
+"""
+
+# period=all reads the compact daily rollup (one row per day) instead of the
+# whole raw history. $2 is always NULL here; it is kept so every series shape
+# binds the same arguments.
+_SERIES_ALL = f"""
+  SELECT artist_id, metric, val, ts
+    FROM metrics_daily
+   WHERE artist_id = ANY($1::text[])
+     AND source = $3::text
+     AND metric = 'followers'
+     AND $2::text IS NULL
+  UNION ALL
+  {_CARRY_TO_LAST_RUN}
+"""
+
+_BUCKETED_SELECT = """
+SELECT
+  artist_id,
+  metric,
+  (array_agg(val ORDER BY ts DESC))[1] AS val,
+  max(ts) AS ts,
+  min(val) AS min,
+  max(val) AS max
+FROM bucketed
+GROUP BY artist_id, metric, bucket
+ORDER BY artist_id, ts
+"""
+
+
+def _series_shapes(series: str) -> tuple[str, str, str]:
+    """(raw, max_points, resolution) statements over the given series source."""
+    raw = f"{series} ORDER BY artist_id, ts"
+
+    # $4 = max_points: equal-width time buckets over each artist's own span
+    max_points = f"""
+    WITH series AS ({series}),
+    bounds AS (
+      SELECT artist_id, min(ts) AS lo, max(ts) AS hi
+        FROM series
+       GROUP BY artist_id
+    ),
+    bucketed AS (
+      SELECT
+        s.*,
+        CASE WHEN b.hi = b.lo THEN 0
+             ELSE LEAST(
+               floor(extract(epoch FROM s.ts - b.lo)
+                     / extract(epoch FROM b.hi - b.lo) * $4::int)::int,
+               $4::int - 1)
+        END AS bucket
+      FROM series s
+      JOIN bounds b USING (artist_id)
+    )
+    {_BUCKETED_SELECT}
+    """
+
+    # $4 = resolution: a date_trunc field ('hour', 'day', 'week', 'month')
+    resolution = f"""
+    WITH series AS ({series}),
+    bucketed AS (
+      SELECT s.*, date_trunc($4::text, s.ts) AS bucket
+        FROM series s
+    )
+    {_BUCKETED_SELECT}
+    """
+    return raw, max_points, resolution
+
+
+SERIES_RAW, SERIES_MAX_POINTS, SERIES_RESOLUTION = _series_shapes(_SERIES)
+SERIES_ALL_RAW, SERIES_ALL_MAX_POINTS, SERIES_ALL_RESOLUTION = _series_shapes(_SERIES_ALL)
+
+# ── Growth ──────────────────────────────────────────────────────────────────────
+# Latest/earliest values come from the `metrics_latest` rollup (one row per
+# artist+metric, maintained by etl.py — see rollups.py). The baseline is the
+# most recent snapshot at/before `period` ago, found with a single index probe
+# on the metrics primary key, falling back to the earliest snapshot overall if
+# none exists yet (not enough history). For period=all ($2 NULL) the probe
+# matches nothing, so the baseline is the earliest snapshot.
+# Because the probe takes the last snapshot before the window, values skipped
+# as unchanged by etl.py --incremental are carried forward automatically.
+_BASELINE_LATERAL = """
+CROSS JOIN LATERAL (
+  SELECT COALESCE(
+    (SELECT m.val
+       FROM metrics m
+      WHERE m.artist_id = l.artist_id
+        AND m.source = l.source
+        AND m.metric = l.metric
+        AND m.ts <= now() - $2::text::interval
+      ORDER BY m.ts DESC
+      LIMIT 1),
+    l.first_val
+  ) AS val
+) baseline
+"""
+
+_DELTAS = """
+  l.latest_val AS latest_value,
+  baseline.val AS baseline_value,
+  (l.latest_val - baseline.val) AS absolute_delta,
+  CASE WHEN baseline.val = 0 THEN NULL
+       ELSE ROUND((l.latest_val - baseline.val) / baseline.val::numeric * 100, 4)
+  END AS percent_delta
+"""
+
+# $1 = artist ids, $2 = period, $3 = source
+GROWTH = f"""
+SELECT
+  l.artist_id,
+  l.metric,
+  {_DELTAS}
+FROM metrics_latest l
+{_BASELINE_LATERAL}
+WHERE l.artist_id = ANY($1::text[])
+  AND l.source = $3::text
+"""
+
+# $1 = limit, $2 = period, $3 = sort_by ('absolute' | 'percent'),
+# $4 = discovery (restrict to the 5k–250k follower band), $5 = source
+TOP_GROWTH = f"""
+SELECT *
+FROM (
+  SELECT
+    a.id,
+    a.name,
+    {_DELTAS}
+  FROM metrics_latest l
+  JOIN artists a
+    ON a.id = l.artist_id
+  {_BASELINE_LATERAL}
+  WHERE l.source = $5::text
+    AND l.metric = 'followers'
+    AND (NOT $4::bool OR l.latest_val BETWEEN 5000 AND 250000)
+) g
+ORDER BY
+  CASE WHEN $3::text = 'absolute' THEN g.absolute_delta END DESC NULLS LAST,
+  CASE WHEN $3::text = 'percent'  THEN g.percent_delta  END DESC NULLS LAST
+LIMIT $1
+"""
+
+# ── Growth over a date range ────────────────────────────────────────────────────
+# from/to/compare_to: growth between two UTC calendar days (both inclusive),
+# answered from the metrics_daily rollup, which holds each series' last value
+# per day and is kept intact by compact.py. The value at the end of `to` is the
+# last daily row on or before it, the baseline the last daily row before
+# `from` (falling back to the first snapshot when the series starts inside the
+# range). Each is one backwards probe of the rollup's covering index
+# (migrations/0008), so a range costs two probes per artist however much
+# history there is; days skipped by etl.py --incremental are carried forward.
+# With a NULL bound the probes match nothing, so the optional comparison range
+# costs nothing when it isn't asked for.
+_RANGE_LATERAL = """
+CROSS JOIN LATERAL (
+  SELECT
+    (SELECT d.val
+       FROM metrics_daily d
+      WHERE d.artist_id = l.artist_id
+        AND d.source = l.source
+        AND d.metric = l.metric
+        AND d.day <= {end}::date
+      ORDER BY d.day DESC
+      LIMIT 1) AS end_val,
+    COALESCE(
+      (SELECT d.val
+         FROM metrics_daily d
+        WHERE d.artist_id = l.artist_id
+          AND d.source = l.source
+          AND d.metric = l.metric
+          AND d.day < {start}::date
+        ORDER BY d.day DESC
+        LIMIT 1),
+      CASE WHEN (l.first_ts AT TIME ZONE 'UTC')::date <= {end}::date THEN l.first_val END
+    ) AS start_val
+) {alias}
+"""
+
+_RANGE_DELTAS = """
+  {alias}.end_val AS {prefix}latest_value,
+  {alias}.start_val AS {prefix}baseline_value,
+  ({alias}.end_val - {alias}.start_val) AS {prefix}absolute_delta,
+  CASE WHEN {alias}.start_val = 0 THEN NULL
+       ELSE ROUND(({alias}.end_val - {alias}.start_val) / {alias}.start_val::numeric * 100, 4)
+  END AS {prefix}percent_delta
+"""
+
+_RANGE_COLUMNS = f"""
+  {_RANGE_DELTAS.format(alias="r", prefix="")},
+  {_RANGE_DELTAS.format(alias="c", prefix="compare_")}
+"""
+
+# $1 = artist ids, $2 = from, $3 = to, $4 = source,
+# $5 = compare from, $6 = compare to (dates; NULL for no comparison)
+GROWTH_RANGE = f"""
+SELECT
+  l.artist_id,
+  l.metric,
+  {_RANGE_COLUMNS}
+FROM metrics_latest l
+{_RANGE_LATERAL.format(alias="r", start="$2", end="$3")}
+{_RANGE_LATERAL.format(alias="c", start="$5", end="$6")}
+WHERE l.artist_id = ANY($1::text[])
+  AND l.source = $4::text
+  AND r.end_val IS NOT NULL
+"""
+
+# $1 = limit, $2 = from, $3 = to,
+# $4 = sort_by ('absolute' | 'percent' | 'change' — absolute delta minus the
+#      comparison range's), $5 = discovery (5k–250k followers at the end of
+#      the range), $6 = source, $7 = compare from, $8 = compare to
+TOP_GROWTH_RANGE = f"""
+SELECT *
+FROM (
+  SELECT
+    a.id,
+    a.name,
+    {_RANGE_COLUMNS},
+    (r.end_val - r.start_val) - (c.end_val - c.start_val) AS delta_change
+  FROM metrics_latest l
+  JOIN artists a
+    ON a.id = l.artist_id
+  {_RANGE_LATERAL.format(alias="r", start="$2", end="$3")}
+  {_RANGE_LATERAL.format(alias="c", start="$7", end="$8")}
+  WHERE l.source = $6::text
+    AND l.metric = 'followers'
+    AND r.end_val IS NOT NULL
+    AND (NOT $5::bool OR r.end_val BETWEEN 5000 AND 250000)
+) g
+ORDER BY
+  CASE WHEN $4::text = 'absolute' THEN g.absolute_delta END DESC NULLS LAST,
+  CASE WHEN $4::text = 'percent'  THEN g.percent_delta  END DESC NULLS LAST,
+  CASE WHEN $4::text = 'change'   THEN g.delta_change   END DESC NULLS LAST
+LIMIT $1
+"""
+
+# mode=breakout: ranks by metrics_stats (migrations/0007) — how unusual each
+# artist's latest follower growth is against its own recent history (zscore),
+# then by acceleration. Only series that are growing, have at least 7
+# observed rates, and were written by the last complete run (the rest have
+# held their value since, i.e. zero growth) take part. Period-independent.
+# $1 = limit, $2 = source
+TOP_BREAKOUT = """
+SELECT
+  a.id,
+  a.name,
+  s.last_val AS latest_value,
+  round(s.velocity::numeric, 2)     AS velocity,
+  round(s.acceleration::numeric, 2) AS acceleration,
+  round(s.zscore::numeric, 2)       AS zscore,
+  s.observations
+FROM metrics_stats s
+JOIN artists a
+  ON a.id = s.artist_id
+WHERE s.source = $2::text
+  AND s.metric = 'followers'
+  AND s.observations >= 7
+  AND s.velocity > 0
+  AND s.last_ts >= COALESCE(
+        (SELECT max(snapshot_ts) FROM etl_runs
+          WHERE status = 'complete' AND $2::text = ANY(sources)),
+        '-infinity')
+ORDER BY s.zscore DESC NULLS LAST, s.acceleration DESC NULLS LAST
+LIMIT $1
+"""
+
+# $1 = limit, $2 = period, $3 = source
+TOP_POPULARITY_GROWTH = f"""
+SELECT
+  a.id,
+  a.name,
+  baseline.val AS earliest_popularity,
+  l.latest_val AS latest_popularity,
+  (l.latest_val - baseline.val) AS delta
+FROM metrics_latest l
+JOIN artists a
+  ON a.id = l.artist_id
+{_BASELINE_LATERAL}
+WHERE l.source = $3::text
+  AND l.metric = 'popularity'
+ORDER BY delta DESC
+LIMIT $1
+"""
+
+# ── Precomputed leaderboards (leaderboards.py) ──────────────────────────────────
+# One primary-key read of migrations/0009; `period` is normalized as in
+# analytics.normalize_period.
+# $1 = endpoint, $2 = period, $3 = sort_by, $4 = mode, $5 = source
+LEADERBOARD_SNAPSHOT = """
+SELECT generation, version, rows, computed_at
+FROM leaderboard_snapshots
+WHERE endpoint = $1::text
+  AND period = $2::text
+  AND sort_by = $3::text
+  AND mode = $4::text
+  AND source = $5::text
+"""
+
+# ── Analytics snapshot (analytics.py) ───────────────────────────────────────────
+# Read together in one REPEATABLE READ transaction, so now(), the generation and
+# the rows all describe the same instant. `seg` numbers each (metric, artist)
+# row of metrics_latest identically in both row statements.
+
+# $1 = windows (interval texts) → cutoff per window in µs since the epoch
+ANALYTICS_CUTOFFS = """
+SELECT w AS period, (extract(epoch FROM now() - w::interval) * 1000000)::int8 AS cutoff_us
+  FROM unnest($1::text[]) AS w
+"""
+
+# $1 = source
+ANALYTICS_LATEST = """
+SELECT (row_number() OVER (ORDER BY l.metric, l.artist_id) - 1)::int4 AS seg,
+       l.artist_id, a.name, a.id IS NOT NULL AS listed, l.metric,
+       l.first_val::float8 AS first_val, l.latest_val::float8 AS latest_val
+  FROM metrics_latest l
+  LEFT JOIN artists a ON a.id = l.artist_id
+ WHERE l.source = $1::text
+ ORDER BY seg
+"""
+
+# $1 = source, $2 = longest window. Snapshots inside the window plus, per
+# series, the last one before it (the baseline for any cutoff that precedes
+# every in-window snapshot), as (seg, ts_us, val) sorted by seg, ts. Streamed
+# with binary COPY: every column is fixed-width, so rows parse straight into a
+# NumPy structured array.
+ANALYTICS_POINTS = """
+SELECT l.seg, p.ts_us, p.val
+  FROM (
+    SELECT (row_number() OVER (ORDER BY metric, artist_id) - 1)::int4 AS seg,
+           artist_id, source, metric
+      FROM metrics_latest
+     WHERE source = $1::text
+  ) l
+ CROSS JOIN LATERAL (
+    SELECT (extract(epoch FROM m.ts) * 1000000)::int8 AS ts_us, m.val::float8 AS val
+      FROM metrics m
+     WHERE m.artist_id = l.artist_id
+       AND m.source = l.source
+       AND m.metric = l.metric
+       AND m.ts >= now() - $2::text::interval
+       AND m.val IS NOT NULL
+    UNION ALL
+    (SELECT (extract(epoch FROM m.ts) * 1000000)::int8, m.val::float8
+       FROM metrics m
+      WHERE m.artist_id = l.artist_id
+        AND m.source = l.source
+        AND m.metric = l.metric
+        AND m.ts < now() - $2::text::interval
+        AND m.val IS NOT NULL
+      ORDER BY m.ts DESC
+      LIMIT 1)
+ ) p
+ ORDER BY l.seg, p.ts_us
+"""
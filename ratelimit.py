@@ -0,0 +1,96 @@
+"""
+Token-bucket rate limiters: `TokenBucket` for asyncio code (the concurrent
+ETL) and `SyncTokenBucket` for thread pools (roster.py).
+
+Tokens refill continuously at `rate` per second up to `capacity` (the burst
+size). Every outgoing request awaits `acquire()` first, so however many
+workers are in flight the overall request rate never exceeds `rate`. When the
+upstream answers 429, `pause(retry_after)` stops *all* acquirers until the
+Retry-After window has passed, instead of each worker backing off on its own.
+"""
+import time
+import asyncio
+import threading
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate     = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens  = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock    = asyncio.Lock()
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self._tokens  = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    async def acquire(self):
+        """
+        Wait until a token is available and take it. Waiters are served in
+        arrival order.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """
+        Hold every acquirer for `seconds` (e.g. a Retry-After), then resume
+        from an empty bucket so the limit isn't exceeded right after.
+        """
+        until = time.monotonic() + seconds
+        if until > self._blocked_until:
+            self._blocked_until = until
+            self._tokens  = 0.0
+            self._updated = until
+
+
+class SyncTokenBucket:
+    """
+    Thread-safe TokenBucket with the same semantics, for thread pools.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate     = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens  = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock    = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    time.sleep(self._blocked_until - now)
+                    continue
+                if now > self._updated:
+                    self._tokens  = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                time.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        until = time.monotonic() + seconds
+        if until > self._blocked_until:
+            self._blocked_until = until
+            self._tokens  = 0.0
+            self._updated = until
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Summary tables maintained alongside the raw `metrics` history (schema in
+migrations/0002_rollups.sql).
+
+  * metrics_latest — one row per (artist, source, metric) holding the first
+    and the most recent snapshot. The leaderboards read this instead of
+    window-scanning every snapshot ever taken.
+  * metrics_daily  — one row per (artist, source, metric, UTC day) holding
+    the last snapshot of that day.
+  * metrics_stats  — one row per (artist, source, metric) with running
+    growth velocity, acceleration and z-score state (migrations/0007),
+    updated in O(1) per new snapshot; read by mode=breakout.
+  * metrics_generation — a single counter bumped whenever new snapshots
+    land, so the API can tell when its cached results are stale.
+
+`update_rollups` is called by etl.upsert_metrics inside the same transaction
+as the raw insert; the migrations creating the tables seed them from the
+existing history. Run this file directly to rebuild them out of the `metrics`
+rows (metrics_latest & metrics_daily are re-upserted rather than truncated,
+since compact.py deletes raw history they still summarize):
+
+    python rollups.py
+"""
+import os
+import logging
+import psycopg2
+from psycopg2.extras import execute_values
+from migrate import apply_migrations
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+# ── Rollup statements ───────────────────────────────────────────────────────────
+# Both statements read from `{src}`, any relation shaped like
+# (artist_id, source, metric, ts, val): a VALUES list of freshly inserted
+# snapshots during ETL, or the whole metrics table during a rebuild. They are
+# idempotent, so re-applying rows that are already summarized is harmless.
+LATEST_UPSERT_SQL = """
+INSERT INTO metrics_latest AS l
+  (artist_id, source, metric, first_ts, first_val, latest_ts, latest_val)
+SELECT
+  artist_id,
+  source,
+  metric,
+  min(ts),
+  (array_agg(val ORDER BY ts ASC))[1],
+  max(ts),
+  (array_agg(val ORDER BY ts DESC))[1]
+FROM {src}
+GROUP BY artist_id, source, metric
+ON CONFLICT (artist_id, source, metric) DO UPDATE SET
+  first_ts   = CASE WHEN EXCLUDED.first_ts < l.first_ts
+                    THEN EXCLUDED.first_ts ELSE l.first_ts END,
+  first_val  = CASE WHEN EXCLUDED.first_ts < l.first_ts
+                    THEN EXCLUDED.first_val ELSE l.first_val END,
+  latest_ts  = CASE WHEN EXCLUDED.latest_ts >= l.latest_ts
+                    THEN EXCLUDED.latest_ts ELSE l.latest_ts END,
+  latest_val = CASE WHEN EXCLUDED.latest_ts >= l.latest_ts
+                    THEN EXCLUDED.latest_val ELSE l.latest_val END
+"""
+
+DAILY_UPSERT_SQL = """
+INSERT INTO metrics_daily AS d
+  (artist_id, source, metric, day, ts, val)
+SELECT DISTINCT ON (artist_id, source, metric, day)
+  artist_id, source, metric, day, ts, val
+FROM (
+  SELECT artist_id, source, metric, (ts AT TIME ZONE 'UTC')::date AS day, ts, val
+  FROM {src}
+) s
+ORDER BY artist_id, source, metric, day, ts DESC
+ON CONFLICT (artist_id, source, metric, day) DO UPDATE SET
+  ts  = EXCLUDED.ts,
+  val = EXCLUDED.val
+WHERE EXCLUDED.ts >= d.ts
+"""
+
+# Folds `{src}` into metrics_stats in timestamp order (metrics_stats_push_batch
+# sorts). Snapshots at or before a series' last_ts are skipped, so this is
+# idempotent too.
+STATS_PUSH_SQL = """
+SELECT metrics_stats_push_batch(
+  array_agg(artist_id), array_agg(source), array_agg(metric), array_agg(ts), array_agg(val::float8)
+)
+FROM {src}
+"""
+
+# Replays the whole history series by series; row-at-a-time, so it only
+# holds one snapshot in memory.
+STATS_REBUILD_SQL = """
+DO $$
+DECLARE
+  snap RECORD;
+BEGIN
+  FOR snap IN
+    SELECT artist_id, source, metric, ts, val FROM metrics ORDER BY artist_id, source, metric, ts
+  LOOP
+    PERFORM metrics_stats_push(snap.artist_id, snap.source, snap.metric, snap.ts, snap.val::float8);
+  END LOOP;
+END $$
+"""
+
+# NOTIFY is transactional: listeners (api.py) hear it only once the batch commits.
+BUMP_GENERATION_SQL = """
+UPDATE metrics_generation
+   SET generation = generation + 1,
+       updated_at = now();
+NOTIFY metrics_updated;
+"""
+
+_VALUES_SRC = "(VALUES %s) AS v(artist_id, source, metric, ts, val)"
+
+
+def update_rollups(cur, rows):
+    """
+    Fold a list of (artist_id, source, metric, ts, val) snapshots into the
+    summary tables and bump the metrics generation. Runs on the caller's
+    cursor and does not commit, so it shares the transaction of the raw insert.
+    """
+    if not rows:
+        return
+    for stmt in (LATEST_UPSERT_SQL, DAILY_UPSERT_SQL, STATS_PUSH_SQL):
+        execute_values(cur, stmt.format(src=_VALUES_SRC), rows)
+    cur.execute(BUMP_GENERATION_SQL)
+
+
+def rebuild_rollups(conn):
+    """
+    Rebuild the rollups out of `metrics`. metrics_stats is replayed from
+    scratch; metrics_latest & metrics_daily are upserted in place instead, so
+    the days and first snapshots that compact.py has already removed from the
+    raw history (and which only they still hold) survive the rebuild.
+    """
+    apply_migrations(conn)
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE metrics_stats")
+        for stmt in (LATEST_UPSERT_SQL, DAILY_UPSERT_SQL):
+            cur.execute(stmt.format(src="metrics"))
+        cur.execute(STATS_REBUILD_SQL)
+        cur.execute(BUMP_GENERATION_SQL)
+        cur.execute("SELECT count(*) FROM metrics_latest")
+        latest_count = cur.fetchone()[0]
+        cur.execute("SELECT count(*) FROM metrics_daily")
+        daily_count = cur.fetchone()[0]
+        cur.execute("SELECT count(*) FROM metrics_stats")
+        stats_count = cur.fetchone()[0]
+    conn.commit()
+    logger.info(f"✔️  Rebuilt rollups: {latest_count} latest rows, {daily_count} daily rows, "
+                f"{stats_count} stats rows")
+
+
+if __name__ == "__main__":
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise RuntimeError("⚠️  Set the DATABASE_URL env var before running")
+
+    conn = psycopg2.connect(db_url)
+    rebuild_rollups(conn)
+    conn.close()
+    logger.info("🎉 Rollup backfill complete!")
@@ -0,0 +1,157 @@
+"""
+Monstercat roster fetcher shared by seed.py, map_spotify.py and
+roster_refresh.py (via spotify_helper.fetch_monstercat_spotify_links).
+
+One pass over Monstercat's public /api/artists returns, for every artist,
+its id, name, URI and Spotify artist ID (from the profile's Links, if any).
+After a first request for the total, the remaining pages are fetched
+concurrently (ROSTER_WORKERS threads, at most ROSTER_QPS requests/sec).
+
+The result is memoized in-process and cached on disk (ROSTER_CACHE_FILE):
+within ROSTER_CACHE_TTL seconds the cached roster is used as-is; after that
+every page past the first is re-requested with its cached ETag, and pages
+that come back 304 Not Modified are reused.
+"""
+import os
+import re
+import json
+import time
+import logging
+from typing import NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+import http_client
+from ratelimit import SyncTokenBucket
+
+logger = logging.getLogger(__name__)
+
+MONSTERCAT_ARTISTS_API = "https://player.monstercat.app/api/artists"
+PAGE_LIMIT             = 100
+
+ROSTER_QPS        = float(os.getenv("ROSTER_QPS", "5"))
+ROSTER_WORKERS    = int(os.getenv("ROSTER_WORKERS", "4"))
+ROSTER_CACHE_TTL  = float(os.getenv("ROSTER_CACHE_TTL", "3600"))
+ROSTER_CACHE_FILE = os.getenv(
+    "ROSTER_CACHE_FILE", os.path.expanduser("~/.spotify_helper_cache/roster.json")
+)
+
+SPOTIFY_ID_RE = re.compile(r"^[A-Za-z0-9]{22}$")
+
+
+class RosterArtist(NamedTuple):
+    id:         str
+    name:       str
+    uri:        str
+    spotify_id: str | None
+
+
+def extract_spotify_id(url: str) -> str | None:
+    """
+    Given a Monstercat profile 'Links' URL, extract a 22-char Spotify
+    artist ID if the URL is a recognizable open.spotify.com/artist/<id>
+    link. Returns None for malformed/non-artist links.
+    """
+    url = (url or "").strip()
+    m = re.search(r"open\.spotify\.com/artist/([^/?\s]+)", url)
+    if not m:
+        return None
+    candidate = m.group(1).strip()
+    return candidate if SPOTIFY_ID_RE.match(candidate) else None
+
+
+def _spotify_link(artist: dict) -> str | None:
+    for link in artist.get("Links") or []:
+        if link.get("Platform") == "Spotify":
+            return extract_spotify_id(link.get("Url", ""))
+    return None
+
+
+# ── Cache ───────────────────────────────────────────────────────────────────────
+# {"fetched_at": epoch, "pages": {"<offset>": {"etag": str|None, "artists": [[id, name, uri, spotify_id], ...]}}}
+_memo: list[RosterArtist] | None = None
+
+
+def _load_cache() -> dict:
+    try:
+        with open(ROSTER_CACHE_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"fetched_at": 0, "pages": {}}
+
+
+def _save_cache(cache: dict):
+    os.makedirs(os.path.dirname(ROSTER_CACHE_FILE), exist_ok=True)
+    tmp = ROSTER_CACHE_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp, ROSTER_CACHE_FILE)
+
+
+def _flatten(cache: dict) -> list[RosterArtist]:
+    artists = []
+    for offset in sorted(cache["pages"], key=int):
+        artists.extend(RosterArtist(*a) for a in cache["pages"][offset]["artists"])
+    return artists
+
+
+# ── Fetch ───────────────────────────────────────────────────────────────────────
+def _fetch_page(offset: int, cached: dict | None, bucket: SyncTokenBucket) -> tuple[int, dict]:
+    """
+    Fetch one page → (Total, {"etag", "artists"}), reusing `cached` on a 304
+    (Total is then unknown: -1).
+    """
+    headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+    bucket.acquire()
+    resp = http_client.get(
+        MONSTERCAT_ARTISTS_API,
+        params={"limit": PAGE_LIMIT, "offset": offset},
+        headers=headers,
+        timeout=10,
+    )
+    if resp.status_code == 304:
+        return -1, cached
+    data = resp.json()["Artists"]
+    page = {
+        "etag": resp.headers.get("ETag"),
+        "artists": [[a["Id"], a["Name"], a["URI"], _spotify_link(a)] for a in data["Data"]],
+    }
+    return data["Total"], page
+
+
+def fetch_roster(force_refresh: bool = False) -> list[RosterArtist]:
+    """
+    The full roster as [RosterArtist(id, name, uri, spotify_id)], from the
+    in-process memo, the on-disk cache, or Monstercat (see module docstring).
+    """
+    global _memo
+    if _memo is not None and not force_refresh:
+        return _memo
+
+    cache = _load_cache()
+    if not force_refresh and cache["pages"] and time.time() - cache["fetched_at"] < ROSTER_CACHE_TTL:
+        _memo = _flatten(cache)
+        logger.info(f"Using cached Monstercat roster ({len(_memo)} artists)")
+        return _memo
+
+    bucket = SyncTokenBucket(ROSTER_QPS)
+    start  = time.perf_counter()
+
+    # The first page is always fetched in full: it carries the current Total
+    total, first = _fetch_page(0, None, bucket)
+    pages   = {"0": first}
+    offsets = range(PAGE_LIMIT, total, PAGE_LIMIT)
+    with ThreadPoolExecutor(max_workers=ROSTER_WORKERS) as pool:
+        futures = {
+            offset: pool.submit(_fetch_page, offset, cache["pages"].get(str(offset)), bucket)
+            for offset in offsets
+        }
+        for offset, future in futures.items():
+            pages[str(offset)] = future.result()[1]
+
+    cache = {"fetched_at": time.time(), "pages": pages}
+    _save_cache(cache)
+    _memo = _flatten(cache)
+    logger.info(
+        f"✔️  Fetched Monstercat roster: {len(_memo)} artists in {len(pages)} pages "
+        f"({time.perf_counter() - start:.1f}s)"
+    )
+    return _memo
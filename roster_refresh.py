@@ -12,6 +12,8 @@ import os
 
 import psycopg2
 
+import http_client
+from mapping import resolve_artists, log_tier_stats
 from seed import fetch_roster, upsert_artists
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
@@ -41,39 +43,25 @@ def map_new_artists(
     Writes spotify_id to DB for successful matches.
     Returns (mapped_names, unmapped_names).
     """
-    from spotify_helper import fetch_monstercat_spotify_links, search_artist_exact
+    from spotify_helper import fetch_monstercat_spotify_links
 
     overrides = load_manual_overrides()
     mc_links  = fetch_monstercat_spotify_links()
 
+    matches, tier_stats, _ = resolve_artists(conn, new_artists, overrides, mc_links)
+
     mapped:   list[str] = []
     unmapped: list[str] = []
-
     for artist_id, name in new_artists:
-        sid = tier = None
-
-        if artist_id in overrides:
-            sid, tier = overrides[artist_id], "manual"
-        elif artist_id in mc_links:
-            sid, tier = mc_links[artist_id], "links"
-        else:
-            candidate = search_artist_exact(name)
-            if candidate:
-                sid, tier = candidate, "search"
-
-        if sid:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "UPDATE artists SET spotify_id = %s WHERE id = %s",
-                    (sid, artist_id),
-                )
-            conn.commit()
+        if artist_id in matches:
+            sid, tier = matches[artist_id]
             logger.info(f"  ✔ {name} → {sid} ({tier})")
             mapped.append(name)
         else:
             logger.info(f"  ✘ {name} — no match found")
             unmapped.append(name)
 
+    log_tier_stats(tier_stats)
     return mapped, unmapped
 
 
@@ -120,11 +108,13 @@ def main():
     if not new_artists:
         print_summary(len(roster), [], [], [])
         conn.close()
+        http_client.log_stats()
         return
 
     mapped, unmapped = map_new_artists(conn, new_artists)
     conn.close()
     print_summary(len(roster), new_artists, mapped, unmapped)
+    http_client.log_stats()
 
 
 if __name__ == "__main__":
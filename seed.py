@@ -1,31 +1,15 @@
 import os
-import time
-import requests
 import psycopg2
 from psycopg2.extras import execute_values
-
-API   = "https://player.monstercat.app/api/artists"
-LIMIT = 100
+import http_client
+import roster
 
 
 def fetch_roster() -> list[tuple[str, str, str]]:
-    """Paginate MC /api/artists → list of (id, name, uri)."""
-    resp = requests.get(API, params={"limit": 1, "offset": 0})
-    resp.raise_for_status()
-    total = resp.json()["Artists"]["Total"]
-    print(f"Total artists to fetch: {total}")
-
-    artists = []
-    offset = 0
-    while offset < total:
-        resp = requests.get(API, params={"limit": LIMIT, "offset": offset})
-        resp.raise_for_status()
-        batch = resp.json()["Artists"]["Data"]
-        artists.extend((a["Id"], a["Name"], a["URI"]) for a in batch)
-        print(f"✔️  Fetched {len(batch)} artists (offset {offset} → {offset + len(batch)})")
-        offset += len(batch)
-        time.sleep(1)
-    return artists
+    """Full MC roster (see roster.py) → list of (id, name, uri)."""
+    artists = roster.fetch_roster()
+    print(f"✔️  Fetched {len(artists)} artists")
+    return [(a.id, a.name, a.uri) for a in artists]
 
 
 def upsert_artists(conn, artists: list[tuple]) -> list[tuple[str, str]]:
@@ -59,4 +43,5 @@ if __name__ == "__main__":
     new_rows = upsert_artists(conn, roster)
     print(f"Inserted {len(new_rows)} new artists (of {len(roster)} fetched).")
     conn.close()
+    http_client.log_stats(print)
     print("🎉 Seeding complete!")
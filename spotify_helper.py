@@ -1,10 +1,15 @@
 #!/usr/bin/env python3
 import os
-import re
 import time
 import json
+import sqlite3
 import logging
+import threading
 import requests
+import http_client
+import roster
+from ratelimit import SyncTokenBucket
+from concurrent.futures import ThreadPoolExecutor
 
 # ─── Config & Logging ─────────────────────────────────────────────────────────
 logging.basicConfig(level=logging.INFO, format="%(message)s")
@@ -28,102 +33,103 @@ try:
         _name_cache = json.load(f)
 except (FileNotFoundError, json.JSONDecodeError):
     _name_cache = {}
+_name_cache_lock = threading.Lock()
+
+# ─── Label Cache ──────────────────────────────────────────────────────────────
+# album_labels:  album id → label, kept forever (labels don't change)
+# artist_checks: artist id → has a Monstercat release; positives are kept
+#                forever, negatives re-checked after NEGATIVE_CACHE_TTL_DAYS
+LABEL_CACHE_FILE        = os.path.join(CACHE_DIR, "labels.sqlite")
+NEGATIVE_CACHE_TTL_DAYS = float(os.getenv("NEGATIVE_CACHE_TTL_DAYS", "30"))
+
+# Shared by mapping.py's worker threads; every access holds _label_lock
+_label_db   = sqlite3.connect(LABEL_CACHE_FILE, check_same_thread=False)
+_label_lock = threading.Lock()
+_label_db.executescript("""
+CREATE TABLE IF NOT EXISTS album_labels(
+  album_id   TEXT PRIMARY KEY,
+  label      TEXT NOT NULL,
+  fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artist_checks(
+  artist_id   TEXT PRIMARY KEY,
+  has_release INTEGER NOT NULL,
+  checked_at  REAL NOT NULL
+);
+""")
+
+def _cached_labels(album_ids: list[str]) -> dict[str, str]:
+    marks = ",".join("?" * len(album_ids))
+    with _label_lock:
+        rows = _label_db.execute(
+            f"SELECT album_id, label FROM album_labels WHERE album_id IN ({marks})", album_ids
+        )
+        return dict(rows.fetchall())
+
+def _store_labels(labels: dict[str, str]):
+    now = time.time()
+    with _label_lock:
+        _label_db.executemany(
+            "INSERT OR REPLACE INTO album_labels VALUES (?, ?, ?)",
+            [(aid, label, now) for aid, label in labels.items()],
+        )
+        _label_db.commit()
+
+def _cached_artist_check(artist_id: str) -> bool | None:
+    with _label_lock:
+        row = _label_db.execute(
+            "SELECT has_release, checked_at FROM artist_checks WHERE artist_id = ?", (artist_id,)
+        ).fetchone()
+    if row is None:
+        return None
+    has_release, checked_at = row
+    if has_release or time.time() - checked_at < NEGATIVE_CACHE_TTL_DAYS * 86_400:
+        return bool(has_release)
+    return None
+
+def _store_artist_check(artist_id: str, has_release: bool):
+    with _label_lock:
+        _label_db.execute(
+            "INSERT OR REPLACE INTO artist_checks VALUES (?, ?, ?)",
+            (artist_id, int(has_release), time.time()),
+        )
+        _label_db.commit()
 
 # ─── Token Management ───────────────────────────────────────────────────────────
-TOKEN_URL         = 'https://accounts.spotify.com/api/token'
-_token            = None
-_token_expires_at = 0
-
-def get_token():
-    global _token, _token_expires_at
-    if _token and time.time() < _token_expires_at:
-        return _token
-
-    resp = requests.post(
-        TOKEN_URL,
-        data={'grant_type': 'client_credentials'},
-        auth=(SPOTIPY_CLIENT_ID, SPOTIPY_CLIENT_SECRET),
-        timeout=5,
-    )
-    resp.raise_for_status()
-    data = resp.json()
-    _token = data['access_token']
-    _token_expires_at = time.time() + data.get('expires_in', 3600) - 60
-    return _token
+# Process-wide token cache lives in http_client, shared with etl.py
+get_token = http_client.get_token
 
 # ─── Spotify Endpoints ─────────────────────────────────────────────────────────
 SEARCH_URL       = 'https://api.spotify.com/v1/search'
 ARTIST_ALBUMS    = 'https://api.spotify.com/v1/artists/{id}/albums'
-ALBUM_DETAIL_URL = 'https://api.spotify.com/v1/albums/{id}'
+ALBUMS_URL       = 'https://api.spotify.com/v1/albums'
+
+ALBUMS_PER_CALL     = 20  # Spotify's max for /v1/albums?ids=
+ALBUM_FETCH_WORKERS = int(os.getenv("ALBUM_FETCH_WORKERS", "4"))
 
-# ─── Monstercat Endpoints ───────────────────────────────────────────────────────
-MONSTERCAT_ARTISTS_API = 'https://player.monstercat.app/api/artists'
-SPOTIFY_ID_RE          = re.compile(r"^[A-Za-z0-9]{22}$")
+# One bucket for every Spotify call this process makes: mapping.py's search
+# threads and each search's album-label workers all draw from it, so the
+# overall rate stays under SPOTIFY_QPS however many threads are in flight.
+SPOTIFY_QPS   = float(os.getenv("SPOTIFY_QPS", "5"))
+SPOTIFY_BURST = float(os.getenv("SPOTIFY_BURST", "5"))
+_bucket       = SyncTokenBucket(SPOTIFY_QPS, SPOTIFY_BURST)
 
 def spotify_get(url, headers, params=None, timeout=5):
     """
-    Wrap requests.get with auto-retry on 429.
+    GET through the shared http_client session (keep-alive, retry on 429
+    with Retry-After and on 5xx with jittered backoff), after taking a token
+    from the process-wide Spotify rate limiter.
     """
-    while True:
-        resp = requests.get(url, headers=headers, params=params, timeout=timeout)
-        if resp.status_code == 429:
-            retry_after = int(resp.headers.get('Retry-After', '1'))
-            logger.warning(f"Rate limited; sleeping {retry_after}s…")
-            time.sleep(retry_after)
-            continue
-        resp.raise_for_status()
-        return resp
-
-def _extract_spotify_id(url: str) -> str | None:
-    """
-    Given a Monstercat profile 'Links' URL, extract a 22-char Spotify
-    artist ID if the URL is a recognizable open.spotify.com/artist/<id>
-    link. Returns None for malformed/non-artist links.
-    """
-    url = (url or "").strip()
-    m = re.search(r"open\.spotify\.com/artist/([^/?\s]+)", url)
-    if not m:
-        return None
-    candidate = m.group(1).strip()
-    return candidate if SPOTIFY_ID_RE.match(candidate) else None
-
+    _bucket.acquire()
+    return http_client.get(url, headers=headers, params=params, timeout=timeout)
 
 def fetch_monstercat_spotify_links() -> dict[str, str]:
     """
-    Paginate Monstercat's public /api/artists endpoint (no auth) and return
-    a dict mapping {monstercat_artist_id: spotify_artist_id} for every
-    artist whose 'Links' array contains a valid Spotify artist URL.
+    Return a dict mapping {monstercat_artist_id: spotify_artist_id} for every
+    artist whose Monstercat profile 'Links' contain a valid Spotify artist
+    URL. Shares one (cached) roster download with seed.fetch_roster.
     """
-    result = {}
-    offset = 0
-    limit  = 100
-
-    while True:
-        resp = requests.get(
-            MONSTERCAT_ARTISTS_API,
-            params={"limit": limit, "offset": offset},
-            timeout=10,
-        )
-        resp.raise_for_status()
-        data  = resp.json()["Artists"]
-        batch = data["Data"]
-        if not batch:
-            break
-
-        for artist in batch:
-            for link in artist.get("Links") or []:
-                if link.get("Platform") == "Spotify":
-                    sid = _extract_spotify_id(link.get("Url", ""))
-                    if sid:
-                        result[artist["Id"]] = sid
-                    break
-
-        offset += limit
-        if offset >= data["Total"]:
-            break
-        time.sleep(0.2)
-
-    return result
+    return {a.id: a.spotify_id for a in roster.fetch_roster() if a.spotify_id}
 
 
 def search_artist_exact(name: str) -> str | None:
@@ -159,19 +165,43 @@ def search_artist_exact(name: str) -> str | None:
         artist_id = item['id']
         if has_monstercat_release(artist_id):
             # cache and persist
-            _name_cache[name] = artist_id
-            with open(NAME_CACHE_FILE, "w") as f:
-                json.dump(_name_cache, f, indent=2)
+            with _name_cache_lock:
+                _name_cache[name] = artist_id
+                with open(NAME_CACHE_FILE, "w") as f:
+                    json.dump(_name_cache, f, indent=2)
             return artist_id
 
     logger.info(f"'{name}' found ({len(items)} candidates) but none have a Monstercat release → skipping")
     return None
 
+def _fetch_album_labels(album_ids: list[str], headers) -> dict[str, str]:
+    """
+    Labels for up to ALBUMS_PER_CALL albums in one /v1/albums?ids= call.
+    """
+    resp = spotify_get(ALBUMS_URL, headers, {'ids': ",".join(album_ids), 'market': 'US'})
+    return {
+        album['id']: album.get('label') or ''
+        for album in resp.json().get('albums', [])
+        if album
+    }
+
+def _is_monstercat(label: str) -> bool:
+    return 'monstercat' in (label or '').lower()
+
 def has_monstercat_release(artist_id: str) -> bool:
     """
     Walks an artist's albums/singles pages; returns True once
     it finds any release whose 'label' field contains 'Monstercat'.
+
+    Labels come from the album_labels cache where possible; the rest of each
+    page is fetched 20 albums per call, ALBUM_FETCH_WORKERS calls at a time
+    (spotify_get is rate limited and backs off on 429). The verdict is cached per artist —
+    negatives only for NEGATIVE_CACHE_TTL_DAYS.
     """
+    cached = _cached_artist_check(artist_id)
+    if cached is not None:
+        return cached
+
     token   = get_token()
     headers = {'Authorization': f"Bearer {token}"}
     params  = {
@@ -180,30 +210,41 @@ def has_monstercat_release(artist_id: str) -> bool:
         'market':         'US',
     }
     next_url = ARTIST_ALBUMS.format(id=artist_id)
+    complete = True
 
-    while next_url:
-        try:
-            resp = spotify_get(next_url, headers, params)
-        except requests.HTTPError as e:
-            logger.warning(f"Error fetching albums for {artist_id}: {e}")
-            return False
-
-        page = resp.json()
-        for album in page.get('items', []):
+    with ThreadPoolExecutor(max_workers=ALBUM_FETCH_WORKERS) as pool:
+        while next_url:
             try:
-                alb_resp = spotify_get(
-                    ALBUM_DETAIL_URL.format(id=album['id']),
-                    headers
-                )
-            except requests.HTTPError:
-                continue
-
-            label = alb_resp.json().get('label', '') or ''
-            if 'monstercat' in label.lower():
+                resp = spotify_get(next_url, headers, params)
+            except requests.HTTPError as e:
+                logger.warning(f"Error fetching albums for {artist_id}: {e}")
+                return False  # not cached: worth retrying next run
+
+            page      = resp.json()
+            album_ids = [album['id'] for album in page.get('items', [])]
+            labels    = _cached_labels(album_ids) if album_ids else {}
+            if any(_is_monstercat(label) for label in labels.values()):
+                _store_artist_check(artist_id, True)
+                return True
+
+            missing = [aid for aid in album_ids if aid not in labels]
+            chunks  = [missing[i:i + ALBUMS_PER_CALL] for i in range(0, len(missing), ALBUMS_PER_CALL)]
+            fetched = {}
+            for chunk, future in [(c, pool.submit(_fetch_album_labels, c, headers)) for c in chunks]:
+                try:
+                    fetched.update(future.result())
+                except requests.HTTPError:
+                    complete = False
+                    logger.warning(f"Error fetching {len(chunk)} album labels for {artist_id}; skipping them")
+            _store_labels(fetched)
+            if any(_is_monstercat(label) for label in fetched.values()):
+                _store_artist_check(artist_id, True)
                 return True
 
-        # Spotify returns full next-page URL
-        next_url = page.get('next')
-        params   = None  # only needed on first page
+            # Spotify returns full next-page URL
+            next_url = page.get('next')
+            params   = None  # only needed on first page
 
+    if complete:
+        _store_artist_check(artist_id, False)
     return False
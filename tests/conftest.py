@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+# api.py and the scripts read their config at import time; the API tests never
+# start the app, so these only need to be present.
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/unused")
+os.environ.setdefault("SPOTIPY_CLIENT_ID", "unused")
+os.environ.setdefault("SPOTIPY_CLIENT_SECRET", "unused")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+# Truncated before and after every database test
+DB_TABLES = ("artists", "metrics", "metrics_latest", "metrics_daily", "metrics_stats")
+
+
+@pytest.fixture
+def db_conn():
+    """
+    A psycopg2 connection to TEST_DATABASE_URL, migrated and emptied. Tests
+    using it are skipped when that isn't set; it must be a scratch database.
+    """
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set")
+    import psycopg2
+    from migrate import apply_migrations
+
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    apply_migrations(conn)
+
+    def empty():
+        with conn.cursor() as cur:
+            cur.execute(f"TRUNCATE {', '.join(DB_TABLES)}")
+        conn.commit()
+
+    empty()
+    yield conn
+    empty()
+    conn.close()
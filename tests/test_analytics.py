@@ -0,0 +1,87 @@
+"""
+GrowthEngine must rank exactly what the SQL path (queries.TOP_GROWTH /
+TOP_POPULARITY_GROWTH) ranks, including artists listed without a name.
+"""
+import os
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+import analytics
+import queries
+
+
+def _latest(artist_id, name, listed, first, latest):
+    return {
+        "artist_id": artist_id, "name": name, "listed": listed, "metric": "followers",
+        "first_val": float(first), "latest_val": float(latest),
+    }
+
+
+def test_unnamed_artists_are_ranked_unlisted_are_not():
+    snap = analytics.SourceGrowth(
+        [
+            _latest("named", "Named", True, 100, 130),
+            _latest("unnamed", None, True, 100, 150),
+            _latest("ghost", None, False, 100, 900),
+        ],
+        np.empty(0, dtype=analytics._POINT),
+        {"all": None},
+    )
+    rows = snap.top_growth("all", 10, "absolute", False)
+    assert [(r["id"], r["name"], r["absolute_delta"]) for r in rows] == [
+        ("unnamed", None, 50),
+        ("named", "Named", 30),
+    ]
+
+
+def test_engine_matches_sql_path(db_conn):
+    import asyncpg
+    from etl import upsert_metrics
+
+    conn  = db_conn
+    now   = datetime.now(timezone.utc)
+    start = now - timedelta(days=10)
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO artists (id, name) VALUES ('named', 'Named'), ('unnamed', NULL)")
+        cur.execute("SELECT ensure_metrics_partitions(%s, 1)", (start,))
+    conn.commit()
+    # 'ghost' has metrics but no artists row, so neither path ranks it
+    for day, step in ((10, 0), (5, 1), (0, 2)):
+        upsert_metrics(
+            conn,
+            [
+                ("named",   "spotify", "followers",  1000 + 30 * step),
+                ("unnamed", "spotify", "followers",  1000 + 50 * step),
+                ("ghost",   "spotify", "followers",  1000 + 90 * step),
+                ("named",   "spotify", "popularity", 40 + 3 * step),
+                ("unnamed", "spotify", "popularity", 40 + 5 * step),
+                ("ghost",   "spotify", "popularity", 40 + 9 * step),
+            ],
+            snapshot_ts=now - timedelta(days=day),
+        )
+
+    async def both_paths():
+        pool   = await asyncpg.create_pool(os.environ["TEST_DATABASE_URL"], statement_cache_size=0, min_size=1, max_size=2)
+        engine = analytics.GrowthEngine(windows=["7 days", "all"], sources=["spotify"])
+        try:
+            await engine.refresh(pool)
+            results = []
+            async with pool.acquire() as c:
+                for period in ("7 days", "all"):
+                    interval = None if period == "all" else period
+                    for sort_by in ("absolute", "percent"):
+                        sql = await c.fetch(queries.TOP_GROWTH, 10, interval, sort_by, False, "spotify")
+                        mem = engine.top_growth("spotify", period, 10, sort_by, False, engine.generation)
+                        results.append((sql, mem))
+                    sql = await c.fetch(queries.TOP_POPULARITY_GROWTH, 10, interval, "spotify")
+                    mem = engine.top_popularity_growth("spotify", period, 10, engine.generation)
+                    results.append((sql, mem))
+        finally:
+            await pool.close()
+        return results
+
+    for sql, mem in asyncio.run(both_paths()):
+        assert [(r["id"], r["name"]) for r in sql] == [(r["id"], r["name"]) for r in mem]
+        assert [r["id"] for r in mem] == ["unnamed", "named"]
@@ -0,0 +1,50 @@
+"""
+ETags of clock-dependent responses must change as time moves on, even while
+the metrics generation stays put.
+"""
+import pytest
+from starlette.requests import Request
+
+import api
+
+
+def _request(path: str, query: str = "") -> Request:
+    return Request({"type": "http", "method": "GET", "path": path,
+                    "query_string": query.encode(), "headers": []})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(api, "generation", 7)
+    now = [1_000_000.0]
+    monkeypatch.setattr(api.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.mark.parametrize("path, query", [
+    ("/artists/top-growth", ""),
+    ("/artists/top-growth", "period=24%20hours"),
+    ("/artists/top-popularity-growth", "period=7 days"),
+    ("/artist/x/latest", ""),
+    ("/artist/x/metrics", ""),
+    ("/artist/x/growth", "from=2026-01-01"),
+    ("/artists/batch", "ids=a,b&period=30 days"),
+])
+def test_rolling_etag_moves_with_the_clock(clock, path, query):
+    before = api._etag_for(_request(path, query))
+    clock[0] += api.ETAG_CLOCK_SECONDS
+    assert api._etag_for(_request(path, query)) != before
+
+
+@pytest.mark.parametrize("path, query", [
+    ("/artists/top-growth", "period=all"),
+    ("/artists/top-growth", "mode=breakout"),
+    ("/artist/x/metrics", "period=ALL&max_points=200"),
+    ("/artist/x/growth", "from=2026-01-01&to=2026-01-31"),
+])
+def test_fixed_etag_only_follows_the_generation(clock, monkeypatch, path, query):
+    before = api._etag_for(_request(path, query))
+    clock[0] += api.ETAG_CLOCK_SECONDS
+    assert api._etag_for(_request(path, query)) == before
+    monkeypatch.setattr(api, "generation", 8)
+    assert api._etag_for(_request(path, query)) != before
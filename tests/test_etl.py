@@ -0,0 +1,27 @@
+import time
+import asyncio
+
+from etl import in_thread
+
+
+def test_cancelled_writer_waits_for_its_thread():
+    events = []
+
+    def write():
+        time.sleep(0.2)
+        events.append("write returned")
+
+    async def run():
+        async def fail():
+            await asyncio.sleep(0.02)
+            raise RuntimeError("fetch failed")
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(in_thread(write))
+                tg.create_task(fail())
+        except ExceptionGroup:
+            events.append("rollback")
+
+    asyncio.run(run())
+    assert events == ["write returned", "rollback"]
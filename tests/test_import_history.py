@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from import_history import parse_ts
+
+MARCH_1 = datetime(2021, 3, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("value", [
+    "2021-03-01T00:00:00Z",
+    "2021-03-01",
+    "20210301",
+    "1614556800",
+    " 1614556800.0 ",
+    1614556800,
+    1614556800.0,
+    datetime(2021, 3, 1),
+])
+def test_parse_ts(value):
+    assert parse_ts(value) == MARCH_1
+
+
+@pytest.mark.parametrize("value", ["2021", "1614", "-1614556800", "", True])
+def test_parse_ts_rejects_ambiguous_values(value):
+    with pytest.raises(ValueError):
+        parse_ts(value)
@@ -0,0 +1,76 @@
+"""
+When /artists/top-growth is answered from a leaderboards.py snapshot, and when
+it falls back to the live paths. The pool and the growth engine are replaced
+with in-memory stand-ins, so nothing here touches Postgres.
+"""
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+
+client = TestClient(api.app)
+
+SNAPSHOT_ROWS = [{"id": "a", "name": "A", "delta": 30}, {"id": "b", "name": "B", "delta": 20}]
+LIVE_ROWS     = [{"id": "b", "name": "B", "delta": 25}, {"id": "a", "name": "A", "delta": 24}]
+
+
+class _Conn:
+    def __init__(self, row):
+        self.row = row
+
+    async def fetchrow(self, *args):
+        return self.row
+
+
+class _Pool:
+    def __init__(self, row):
+        self.conn = _Conn(row)
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """Serve one stored snapshot computed `age` ago at `generation`."""
+    def _serve(age: timedelta, generation: int = 7):
+        row = {
+            "generation":  generation,
+            "version":     5,
+            "rows":        json.dumps(SNAPSHOT_ROWS),
+            "computed_at": datetime.now(timezone.utc) - age,
+        }
+        monkeypatch.setattr(api, "pool", _Pool(row))
+        monkeypatch.setattr(api, "generation", 7)
+        monkeypatch.setattr(api.growth_engine, "top_growth", lambda *args: [dict(r) for r in LIVE_ROWS])
+        api.leaderboard_cache.clear()
+    yield _serve
+    api.leaderboard_cache.clear()
+
+
+def test_fresh_snapshot_is_served_with_version(serve):
+    serve(timedelta(minutes=5))
+    r = client.get("/artists/top-growth?period=24 hours&limit=1")
+    assert r.status_code == 200
+    assert r.json() == SNAPSHOT_ROWS[:1]
+    assert r.headers[api.LEADERBOARD_VERSION_HEADER] == "5"
+
+
+def test_old_snapshot_falls_back_to_live_ranking(serve):
+    serve(timedelta(seconds=api.SNAPSHOT_MAX_AGE_SECONDS + 60))
+    r = client.get("/artists/top-growth?period=24 hours&limit=2")
+    assert r.status_code == 200
+    assert r.json() == LIVE_ROWS
+    assert api.LEADERBOARD_VERSION_HEADER not in r.headers
+
+
+def test_snapshot_from_another_generation_falls_back(serve):
+    serve(timedelta(minutes=5), generation=6)
+    r = client.get("/artists/top-growth?period=24 hours&limit=2")
+    assert r.json() == LIVE_ROWS
+    assert api.LEADERBOARD_VERSION_HEADER not in r.headers
@@ -0,0 +1,37 @@
+"""
+The SSE leaderboard streams must reject bad parameters with a 400 before the
+stream starts, exactly like the endpoints they mirror. The app is never
+started, so nothing here touches Postgres.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+
+client = TestClient(api.app)
+
+INVALID_TOP_GROWTH = [
+    "limit=0",
+    "limit=500",
+    "mode=bogus",
+    "sort_by=bogus",
+    "sort_by=change",
+    "period=bogus",
+    "source=Not-A-Source",
+]
+
+@pytest.mark.parametrize("query", INVALID_TOP_GROWTH)
+def test_top_growth_stream_rejects(query):
+    r = client.get(f"/artists/top-growth/stream?{query}")
+    assert r.status_code == 400
+    assert r.json() == client.get(f"/artists/top-growth?{query}").json()
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=500", "period=bogus", "source=Not-A-Source"])
+def test_top_popularity_growth_stream_rejects(query):
+    r = client.get(f"/artists/top-popularity-growth/stream?{query}")
+    assert r.status_code == 400
+    assert r.json() == client.get(f"/artists/top-popularity-growth?{query}").json()
+
+def test_stream_rejects_before_subscribing():
+    client.get("/artists/top-growth/stream?mode=bogus")
+    assert api.leaderboard_hub.stats() == {"topics": 0, "subscriptions": 0}
@@ -0,0 +1,43 @@
+"""
+Rollup rebuilds against a real Postgres (see the db_conn fixture).
+"""
+from datetime import datetime, timedelta, timezone
+
+
+def _snapshot(conn, table):
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3, 4")
+        return cur.fetchall()
+
+
+def test_rebuild_after_compaction_keeps_compacted_days(db_conn):
+    from compact import compact
+    from etl import upsert_metrics
+    from rollups import rebuild_rollups
+
+    conn = db_conn
+    # Four snapshots a day for 60 days, starting 400 days ago: all of it is
+    # past both the daily and the weekly compaction horizon.
+    start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=400)
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO artists (id, name) VALUES ('t1', 'Test')")
+        cur.execute(
+            "SELECT ensure_metrics_partitions(%s, 0, %s)", (start, start + timedelta(days=60))
+        )
+    conn.commit()
+    val = 1000
+    for i in range(60 * 4):
+        val += 10
+        upsert_metrics(conn, [("t1", "spotify", "followers", val)], snapshot_ts=start + timedelta(hours=6 * i))
+
+    daily_before  = _snapshot(conn, "metrics_daily")
+    latest_before = _snapshot(conn, "metrics_latest")
+
+    deleted = compact(conn, daily_after_days=90, weekly_after_days=365)
+    assert deleted["intraday"] and deleted["intraweek"]
+
+    rebuild_rollups(conn)
+
+    assert len(daily_before) == 60
+    assert _snapshot(conn, "metrics_daily") == daily_before
+    assert _snapshot(conn, "metrics_latest") == latest_before
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from "react";
 import styles from "./ArtistDetail.module.css";
-import { fetchArtists, fetchLatest, fetchArtistGrowth } from "./api"; // fetchLatest now takes (artistId, period)
+import { fetchArtistsBatch } from "./api";
 import KpiCard from "./KpiCard";
 import {
   LineChart,
@@ -27,6 +27,9 @@ function toKpiProps(metricData) {
   };
 }
 
+// Upper bound on chart points; the API buckets longer series server-side.
+const MAX_CHART_POINTS = 200;
+
 // Config-driven KPI cards: add a row here to surface another metric
 // (e.g. Monthly Listeners) without touching the render logic below.
 const KPI_METRICS = [
@@ -47,20 +50,16 @@ export default function ArtistDetail({
 
   useEffect(() => {
     setLoading(true);
-    Promise.all([
-      fetchArtists(),
-      fetchLatest(artistId, period),   // ← pass period here
-      fetchArtistGrowth(artistId, period)
-    ]).then(([allArtists, metrics, growthData]) => {
-      const art = allArtists.find(a => a.id === artistId);
+    fetchArtistsBatch([artistId], period, MAX_CHART_POINTS).then(batch => {
+      const art = batch[artistId];
       setName(art?.name || artistId);
 
-      const series = metrics.map(d => ({
+      const series = (art?.metrics || []).map(d => ({
         time: new Date(d.ts).toLocaleString(),  // full date+time formatting
         followers: d.val
       }));
       setData(series);
-      setGrowth(growthData || {});
+      setGrowth(art?.growth || {});
       setLoading(false);
     });
   }, [artistId, period]);
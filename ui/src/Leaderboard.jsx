@@ -1,17 +1,32 @@
 // src/Leaderboard.jsx
 
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import styles from "./Leaderboard.module.css";
-import { fetchTopGrowth, fetchTopPopularityGrowth } from "./api";
+import { fetchTopGrowth, fetchTopPopularityGrowth, subscribeLeaderboard } from "./api";
 import ArtistDetail from "./ArtistDetail";
 
+// Applies a leaderboard stream event to the last known raw rows: a snapshot
+// replaces them, a diff patches entered/updated rows, drops exited ones and
+// re-ranks moved ones.
+function applyLeaderboardEvent(rows, type, payload) {
+  if (type === "snapshot") return payload.rows;
+
+  const byId = new Map(rows.map(row => [row.id, row]));
+  payload.exited.forEach(id => byId.delete(id));
+  payload.moved.forEach(({ id, to }) => {
+    if (byId.has(id)) byId.set(id, { ...byId.get(id), rank: to });
+  });
+  [...payload.entered, ...payload.updated].forEach(row => byId.set(row.id, row));
+  return [...byId.values()].sort((a, b) => a.rank - b.rank);
+}
+
 export default function Leaderboard({
   period,
   periodLabel,
   limit = 10,
   refreshInterval,
 }) {
-  const [viewMode, setViewMode]   = useState("all");        // "all" | "discovery"
+  const [viewMode, setViewMode]   = useState("all");        // "all" | "discovery" | "breakout"
   const [sortMode, setSortMode]   = useState("followers");   // "followers" | "popularity"
   const [growthMode, setGrowthMode] = useState("absolute"); // "absolute" | "percent"
   const [leaders, setLeaders]     = useState([]);
@@ -19,6 +34,52 @@ export default function Leaderboard({
   const [error, setError]         = useState(null);
   const [selected, setSelected]   = useState(null);
 
+  const rawRows = useRef([]);
+
+  // Which stream/endpoint backs the current toggles.
+  function currentQuery() {
+    if (viewMode === "discovery") {
+      return ["top-growth", { period, limit, sort_by: "percent", mode: "discovery" }];
+    }
+    if (viewMode === "breakout") {
+      return ["top-growth", { period, limit, mode: "breakout" }];
+    }
+    if (sortMode === "popularity") {
+      return ["top-popularity-growth", { period, limit }];
+    }
+    return ["top-growth", { period, limit, sort_by: growthMode, mode: "all" }];
+  }
+
+  function normalize(data) {
+    if (viewMode === "breakout") {
+      return data.map(({ id, name, velocity, zscore, latest_value }) => ({
+        id,
+        name,
+        delta: velocity,
+        percentDelta: null,
+        zscore,
+        latestValue: latest_value,
+      }));
+    }
+    return (sortMode === "popularity" && viewMode === "all")
+      ? data.map(({ id, name, delta, earliest_popularity, latest_popularity }) => ({
+          id,
+          name,
+          delta,
+          percentDelta: null,
+          latestValue: latest_popularity,
+          baselineValue: earliest_popularity,
+        }))
+      : data.map(({ id, name, absolute_delta, percent_delta, latest_value, baseline_value }) => ({
+          id,
+          name,
+          delta: absolute_delta,
+          percentDelta: percent_delta,
+          latestValue: latest_value,
+          baselineValue: baseline_value,
+        }));
+  }
+
   function loadData() {
     setLoading(true);
     setError(null);
@@ -26,6 +87,8 @@ export default function Leaderboard({
     let fetcher;
     if (viewMode === "discovery") {
       fetcher = fetchTopGrowth(period, limit, "percent", "discovery");
+    } else if (viewMode === "breakout") {
+      fetcher = fetchTopGrowth(period, limit, "absolute", "breakout");
     } else if (sortMode === "popularity") {
       fetcher = fetchTopPopularityGrowth(period, limit);
     } else {
@@ -34,24 +97,8 @@ export default function Leaderboard({
 
     return fetcher
       .then(data => {
-        const normalized = (sortMode === "popularity" && viewMode === "all")
-          ? data.map(({ id, name, delta, earliest_popularity, latest_popularity }) => ({
-              id,
-              name,
-              delta,
-              percentDelta: null,
-              latestValue: latest_popularity,
-              baselineValue: earliest_popularity,
-            }))
-          : data.map(({ id, name, absolute_delta, percent_delta, latest_value, baseline_value }) => ({
-              id,
-              name,
-              delta: absolute_delta,
-              percentDelta: percent_delta,
-              latestValue: latest_value,
-              baselineValue: baseline_value,
-            }));
-        setLeaders(normalized);
+        rawRows.current = data;
+        setLeaders(normalize(data));
         setLoading(false);
       })
       .catch(err => {
@@ -66,8 +113,20 @@ export default function Leaderboard({
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [period, limit, viewMode, sortMode, growthMode]);
 
+  // Live updates: prefer the server's SSE push channel, which only sends
+  // when an ETL batch changes the rankings; fall back to polling.
   useEffect(() => {
     if (!refreshInterval) return;
+
+    if (typeof EventSource !== "undefined") {
+      const [kind, query] = currentQuery();
+      const source = subscribeLeaderboard(kind, query, (type, payload) => {
+        rawRows.current = applyLeaderboardEvent(rawRows.current, type, payload);
+        setLeaders(normalize(rawRows.current));
+      });
+      return () => source.close();
+    }
+
     const intervalId = setInterval(loadData, refreshInterval);
     return () => clearInterval(intervalId);
     // eslint-disable-next-line react-hooks/exhaustive-deps
@@ -90,11 +149,13 @@ export default function Leaderboard({
   }
 
   const isDiscovery  = viewMode === "discovery";
-  const isPopularity = !isDiscovery && sortMode === "popularity";
-  const isPercent    = !isDiscovery && !isPopularity && growthMode === "percent";
+  const isBreakout   = viewMode === "breakout";
+  const isPopularity = viewMode === "all" && sortMode === "popularity";
+  const isPercent    = viewMode === "all" && !isPopularity && growthMode === "percent";
 
   const followerColLabel = isPopularity ? "Score" : "Followers";
-  const deltaColLabel    = isPopularity ? "Popularity Δ"
+  const deltaColLabel    = isBreakout ? "Velocity · z-score"
+    : isPopularity ? "Popularity Δ"
     : isPercent || isDiscovery ? "Δ %"
     : "Δ Followers";
 
@@ -103,7 +164,12 @@ export default function Leaderboard({
     return isPopularity ? String(val) : val.toLocaleString();
   }
 
-  function formatDelta(delta, percentDelta) {
+  function formatDelta(delta, percentDelta, zscore) {
+    if (isBreakout) {
+      if (delta == null) return "—";
+      const velocity = `${delta > 0 ? "+" : ""}${Math.round(delta).toLocaleString()}/day`;
+      return zscore == null ? velocity : `${velocity} · z ${Number(zscore).toFixed(1)}`;
+    }
     if (isPopularity) {
       return delta > 0 ? `+${delta}` : String(delta);
     }
@@ -115,16 +181,17 @@ export default function Leaderboard({
   }
 
   const headingLabel = isDiscovery ? "Discovery"
+    : isBreakout ? "Breakout"
     : isPopularity ? "Popularity"
     : "Growth";
 
   return (
     <div className={styles.container}>
 
-      {/* Top-level: All Artists | Discovery */}
+      {/* Top-level: All Artists | Discovery | Breakout */}
       <div className={styles.toggleRow}>
         <button
-          className={`${styles.toggleBtn} ${!isDiscovery ? styles.toggleBtnActive : ""}`}
+          className={`${styles.toggleBtn} ${viewMode === "all" ? styles.toggleBtnActive : ""}`}
           onClick={() => setViewMode("all")}
         >
           All Artists
@@ -135,10 +202,16 @@ export default function Leaderboard({
         >
           Discovery
         </button>
+        <button
+          className={`${styles.toggleBtn} ${isBreakout ? styles.toggleBtnActive : ""}`}
+          onClick={() => setViewMode("breakout")}
+        >
+          Breakout
+        </button>
       </div>
 
-      {/* Sort sub-options — hidden in Discovery mode */}
-      {!isDiscovery && (
+      {/* Sort sub-options — only for All Artists */}
+      {viewMode === "all" && (
         <>
           <div className={styles.toggleRow}>
             <button
@@ -175,10 +248,13 @@ export default function Leaderboard({
       )}
 
       <h2 className={styles.heading}>
-        Top {limit} {headingLabel} ({periodLabel})
+        Top {limit} {headingLabel}{!isBreakout && ` (${periodLabel})`}
         {isDiscovery && (
           <span className={styles.discoveryHint}> · 5k–250k followers</span>
         )}
+        {isBreakout && (
+          <span className={styles.discoveryHint}> · growth vs. own history</span>
+        )}
       </h2>
 
       <table className={styles.table}>
@@ -190,7 +266,7 @@ export default function Leaderboard({
           </tr>
         </thead>
         <tbody>
-          {leaders.map(({ id, name, delta, percentDelta, latestValue }) => (
+          {leaders.map(({ id, name, delta, percentDelta, zscore, latestValue }) => (
             <tr
               key={id}
               onClick={() => setSelected(id)}
@@ -202,7 +278,7 @@ export default function Leaderboard({
               </td>
               <td className={styles.td} style={{ textAlign: "right" }}>
                 <span style={{ color: "var(--color-accent-cyan)" }}>Δ</span>{" "}
-                {formatDelta(delta, percentDelta)}
+                {formatDelta(delta, percentDelta, zscore)}
               </td>
             </tr>
           ))}
@@ -10,14 +10,30 @@ export function fetchArtists() {
   return fetch(`${API}/artists`).then((r) => r.json());
 }
 
+/**
+ * Get name, follower series and growth KPIs for several artists in one
+ * round trip, keyed by artist id.
+ *
+ * @param {string[]} ids
+ * @param {string} period     e.g. "24 hours", "7 days", "all"
+ * @param {number} maxPoints  optional cap on points per series (server-side downsampling)
+ */
+export function fetchArtistsBatch(ids, period = "24 hours", maxPoints) {
+  const params = new URLSearchParams({ ids: ids.join(","), period });
+  if (maxPoints) params.set("max_points", maxPoints);
+  return fetch(`${API}/artists/batch?${params}`).then((r) => r.json());
+}
+
 /**
  * Get follower metrics for one artist over a given period.
  *
  * @param {string} aid
- * @param {string} period  e.g. "24 hours", "7 days", "all"
+ * @param {string} period     e.g. "24 hours", "7 days", "all"
+ * @param {number} maxPoints  optional cap on points returned (server-side downsampling)
  */
-export function fetchLatest(aid, period = "24 hours") {
+export function fetchLatest(aid, period = "24 hours", maxPoints) {
   const params = new URLSearchParams({ period });
+  if (maxPoints) params.set("max_points", maxPoints);
   return fetch(`${API}/artist/${aid}/metrics?${params}`).then((r) => r.json());
 }
 
@@ -37,7 +53,8 @@ export function fetchArtistGrowth(aid, period = "24 hours") {
  * Get top‐growth leaderboard (by follower delta)
  *
  * @param {string} sortBy  "absolute" | "percent"
- * @param {string} mode    "all" | "discovery"
+ * @param {string} mode    "all" | "discovery" | "breakout" (ranked by velocity &
+ *                         z-score against each artist's own history; ignores period)
  */
 export function fetchTopGrowth(period = "7 days", limit = 10, sortBy = "absolute", mode = "all") {
   const params = new URLSearchParams({ period, limit, sort_by: sortBy, mode });
@@ -51,3 +68,21 @@ export function fetchTopPopularityGrowth(period = "7 days", limit = 10) {
   const params = new URLSearchParams({ period, limit });
   return fetch(`${API}/artists/top-popularity-growth?${params}`).then((r) => r.json());
 }
+
+/**
+ * Subscribe to live leaderboard updates over Server-Sent Events.
+ * `onEvent(type, payload)` receives a "snapshot" ({rows}) on connect and a
+ * "diff" ({entered, exited, moved, updated}) whenever the rankings change.
+ * Returns the EventSource; call .close() to unsubscribe.
+ *
+ * @param {string} kind  "top-growth" | "top-popularity-growth"
+ * @param {object} query e.g. { period, limit, sort_by, mode }
+ */
+export function subscribeLeaderboard(kind, query, onEvent) {
+  const params = new URLSearchParams(query);
+  const source = new EventSource(`${API}/artists/${kind}/stream?${params}`);
+  ["snapshot", "diff"].forEach((type) =>
+    source.addEventListener(type, (e) => onEvent(type, JSON.parse(e.data)))
+  );
+  return source;
+}